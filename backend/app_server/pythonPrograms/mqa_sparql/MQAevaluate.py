@@ -6,10 +6,11 @@ Last update: 2020-04-22
 Evaluation of catalog RDF DCAT-AP metadata according to Metadata Quality Assessment methodology (https://www.europeandataportal.eu/mqa/methodology?locale=en)
 """
 
-from SPARQLWrapper import SPARQLWrapper, JSON
+from SPARQLWrapper import SPARQLWrapper, JSON, XML, POOLED
 import urllib.request
 from pyshacl import validate
 import rdflib
+import math
 
 FINDABILITY = 'Findability'
 
@@ -31,6 +32,12 @@ FROM_VOCABULARY = ' from vocabulary'
 
 TIMEOUT = 5
 
+Z_95 = 1.96
+
+DESCRIPTION_DEPTH = 2
+
+SH = rdflib.Namespace('http://www.w3.org/ns/shacl#')
+
 def make_request(url):
     request = urllib.request.Request(url)
     # Make the HTTP request.
@@ -47,6 +54,94 @@ def load_vocabulary(vocabulary_file, field = 0):
                     vocabulary.append(words[field])
     return vocabulary
 
+def proportion_interval(successes, sample_size, population, z = Z_95):
+    '''
+    Wilson score interval for a proportion estimated from a sample drawn without replacement.
+    The finite population correction shrinks the interval to zero when the whole population is sampled.
+    Returns (proportion, lower bound, upper bound).
+    '''
+    if sample_size == 0:
+        return 0.0, 0.0, 1.0
+    p = successes / sample_size
+    if population > 1:
+        z = z * math.sqrt(max(0, population - sample_size) / (population - 1))
+    denominator = 1 + z * z / sample_size
+    centre = (p + z * z / (2 * sample_size)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / sample_size + z * z / (4 * sample_size * sample_size)) / denominator
+    return p, max(0.0, centre - margin), min(1.0, centre + margin)
+
+def sparql_string(value):
+    '''
+    SPARQL string literal of value, with quotes, backslashes and line breaks escaped
+    '''
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+    return '"%s"' % escaped
+
+def url_sample_query(property, seed, size):
+    '''
+    Query of a sample of size (distribution, URL) pairs, ordered endpoint-side by the hash of their IRIs and seed
+    '''
+    return """
+            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+            PREFIX dct: <http://purl.org/dc/terms/>
+            PREFIX dcat: <http://www.w3.org/ns/dcat#>
+            SELECT ?resource ?value
+            WHERE {
+                ?resource a dcat:Distribution .
+                ?resource %s ?value
+            }
+            ORDER BY MD5(CONCAT(STR(?resource), STR(?value), %s))
+            LIMIT %d
+            """ % (property, sparql_string(seed), size)
+
+def dataset_sample_query(seed, size):
+    '''
+    Query of a sample of size datasets, ordered endpoint-side by the hash of their IRIs and seed
+    '''
+    return """
+            PREFIX dcat: <http://www.w3.org/ns/dcat#>
+            SELECT ?dataset
+            WHERE {
+                ?dataset a dcat:Dataset .
+                FILTER(isIRI(?dataset))
+            }
+            ORDER BY MD5(CONCAT(STR(?dataset), %s))
+            LIMIT %d
+            """ % (sparql_string(seed), size)
+
+def description_query(datasets):
+    '''
+    Query of the descriptions of the datasets: their triples and those of the resources they link to (DESCRIPTION_DEPTH = 2)
+    '''
+    return """
+            CONSTRUCT { ?dataset ?p ?o . ?o ?p2 ?o2 }
+            WHERE {
+                VALUES ?dataset { %s }
+                ?dataset ?p ?o .
+                OPTIONAL { ?o ?p2 ?o2 }
+            }
+            """ % ' '.join(dataset.n3() for dataset in datasets)
+
+def describe(graph, node, depth = DESCRIPTION_DEPTH):
+    '''
+    Triples describing node and, up to depth levels, the resources it links to (distributions, publishers, contact points...)
+    '''
+    triples = []
+    visited = set()
+    frontier = [node]
+    for level in range(depth):
+        next_frontier = []
+        for subject in frontier:
+            if subject in visited:
+                continue
+            visited.add(subject)
+            for s, p, o in graph.triples((subject, None, None)):
+                triples.append((s, p, o))
+                if not isinstance(o, rdflib.Literal):
+                    next_frontier.append(o)
+        frontier = next_frontier
+    return triples, visited
+
 def exact(vocabulary, word):
     for value in vocabulary:
         if value == word:
@@ -69,12 +164,20 @@ def contains_word_vocabulary(vocabulary, word):
 
 class MQAevaluate:
 
-    def __init__(self, url, user = None, passwd = None, catalog_rdf_file = None, shapes_turtle_file = None):
-        self.sparql = SPARQLWrapper(url)
+    def __init__(self, url, user = None, passwd = None, catalog_rdf_file = None, shapes_turtle_file = None, sample_size = None, sample_seed = 'mqa'):
+        '''
+        If sample_size is given, the expensive indicators (URL reachability and SHACL compliance) are evaluated
+        on a uniform random sample of that size: URL reachability is reported as an estimate with a 95% confidence
+        interval, and DCAT-AP compliance as in the exact mode (see interoperability_DCAT_AP_compliance).
+        The sample is drawn by hashing the IRIs with sample_seed, so it is stable between runs with the same seed.
+        '''
+        self.sparql = SPARQLWrapper(url, transport = POOLED)
         if user is not None:
             self.sparql.setCredentials(user, passwd)
         self.catalog = catalog_rdf_file
         self.shapes = shapes_turtle_file
+        self.sampleSize = sample_size
+        self.sampleSeed = sample_seed
         self.datasetCount = self.count_entities(DATASET)
         self.distributionCount = self.count_entities(DISTRIBUTION)
         self.totalPoints = 0
@@ -101,6 +204,36 @@ class MQAevaluate:
         # print(results_text)
         return conforms
 
+    def shacl_sample(self):
+        '''
+        Validates only the descriptions of a sample of the datasets, which are read from the endpoint
+        (the catalog file is not loaded).
+        A dataset conforms if neither the dataset nor any resource in its description is the focus node of a violation.
+        Returns the number of conforming datasets in the sample and the sample size.
+        '''
+        sg = rdflib.Graph()
+        sg.parse(source=self.shapes, format='turtle')
+        self.sparql.setQuery(dataset_sample_query(self.sampleSeed, self.sampleSize))
+        self.sparql.setReturnFormat(JSON)
+        results = self.sparql.query().convert()
+        datasets = [rdflib.URIRef(row["dataset"]["value"]) for row in results["results"]["bindings"]]
+        if len(datasets) == 0:
+            return 0, 0
+
+        self.sparql.setQuery(description_query(datasets))
+        self.sparql.setReturnFormat(XML)
+        sample_graph = self.sparql.query().convert()
+        descriptions = [describe(sample_graph, dataset)[1] for dataset in datasets]
+
+        r = validate(sample_graph, shacl_graph=sg, inference='rdfs', abort_on_error=True)
+        conforms, results_graph, results_text = r
+        failing = set(results_graph.objects(None, SH.focusNode))
+        count = 0
+        for nodes in descriptions:
+            if failing.isdisjoint(nodes):
+                count += 1
+        return count, len(descriptions)
+
     def count_entities(self, entity):
         self.sparql.setQuery("""
                    PREFIX dct:<http://purl.org/dc/terms/>
@@ -111,12 +244,8 @@ class MQAevaluate:
                         ?resource rdf:type """+ entity +""" .
                     }
                     """)
-        self.sparql.setReturnFormat(JSON)
-        results = self.sparql.query().convert()
-        for row in results["results"]["bindings"]:
-            """values"""
-            count = int(row["values"]["value"])
-        return count
+        values = self.sparql.queryColumns()['values']
+        return int(values[0]) if len(values) > 0 else 0
 
     def count_entity_property(self, entity, property):
         self.sparql.setQuery("""
@@ -130,12 +259,8 @@ class MQAevaluate:
                     }
                     """)
 
-        self.sparql.setReturnFormat(JSON)
-        results = self.sparql.query().convert()
-        for row in results["results"]["bindings"]:
-            """values"""
-            count = int(row["values"]["value"])
-        return count
+        values = self.sparql.queryColumns()['values']
+        return int(values[0]) if len(values) > 0 else 0
 
     def count_formats_from_vocabulary(self, vocabulary):
         self.sparql.setQuery("""
@@ -152,12 +277,9 @@ class MQAevaluate:
             GROUP BY ?value
             """)
         self.sparql.setReturnFormat(JSON)
-        results = self.sparql.query().convert()
         count = 0
-        for row in results["results"]["bindings"]:
-            """value, count"""
-            format = row["value"]["value"]
-            partialCount = int(row["count"]["value"])
+        for format, partialCount in self.sparql.query().iter_bindings(plain = True, variables = ['value', 'count']):
+            partialCount = int(partialCount)
             if exact(vocabulary,format):
                 count += partialCount
         return count
@@ -176,12 +298,9 @@ class MQAevaluate:
             GROUP BY ?value
             """)
         self.sparql.setReturnFormat(JSON)
-        results = self.sparql.query().convert()
         count = 0
-        for row in results["results"]["bindings"]:
-            """value, count"""
-            value = row["value"]["value"]
-            partialCount = int(row["count"]["value"])
+        for value, partialCount in self.sparql.query().iter_bindings(plain = True, variables = ['value', 'count']):
+            partialCount = int(partialCount)
             if contains_vocabulary_word(vocabulary,value):
                 count += partialCount
         return count
@@ -200,12 +319,9 @@ class MQAevaluate:
             GROUP BY ?value
             """)
         self.sparql.setReturnFormat(JSON)
-        results = self.sparql.query().convert()
         count = 0
-        for row in results["results"]["bindings"]:
-            """value, count"""
-            value = row["value"]["value"]
-            partialCount = int(row["count"]["value"])
+        for value, partialCount in self.sparql.query().iter_bindings(plain = True, variables = ['value', 'count']):
+            partialCount = int(partialCount)
             # print(license, partialCount)
             if contains_word_vocabulary(vocabulary, value):
                 count += partialCount
@@ -228,15 +344,14 @@ class MQAevaluate:
             GROUP BY ?value
             """)
         self.sparql.setReturnFormat(JSON)
-        results = self.sparql.query().convert()
+        # Read all the rows before checking the URLs, so that the response is not kept open during the checks
+        rows = list(self.sparql.query().iter_bindings(plain = True, variables = ['value', 'count']))
         count = 0
 
         error_file_name = 'errores_'+property.replace(":","_") + ".txt"
         with open(error_file_name, "w", encoding="utf-8") as text_file:
-            for row in results["results"]["bindings"]:
-                """value, count"""
-                url = row["value"]["value"]
-                partialCount = int(row["count"]["value"])
+            for url, partialCount in rows:
+                partialCount = int(partialCount)
                 try:
                     make_request(url)
                     count += partialCount
@@ -245,6 +360,51 @@ class MQAevaluate:
                     #print(url + " not reached")
         return count
 
+    def count_entity_property_values(self, entity, property):
+        self.sparql.setQuery("""
+                   PREFIX dct:<http://purl.org/dc/terms/>
+                   PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+                   PREFIX dcat: <http://www.w3.org/ns/dcat#>
+                    SELECT  (count(*) as ?values)  WHERE {
+                        ?resource rdf:type """+ entity + """ .
+                        ?resource """ + property +""" ?value .
+                    }
+                    """)
+        values = self.sparql.queryColumns()['values']
+        return int(values[0]) if len(values) > 0 else 0
+
+    def estimate_urls_with_200_code(self, property):
+        '''
+        Estimates count_urls_with_200_code checking only a sample of the (distribution, URL) pairs.
+        The endpoint orders the pairs by the hash of their IRIs, which gives a uniform random sample without transferring the population.
+        Returns the estimated count and the bounds of its confidence interval.
+        '''
+        population = self.count_entity_property_values(DISTRIBUTION, property)
+        self.sparql.setQuery(url_sample_query(property, self.sampleSeed, self.sampleSize))
+        self.sparql.setReturnFormat(JSON)
+        results = self.sparql.query().convert()
+        successes = 0
+        sample_size = 0
+        reached = {}
+
+        error_file_name = 'errores_'+property.replace(":","_") + ".txt"
+        with open(error_file_name, "w", encoding="utf-8") as text_file:
+            for row in results["results"]["bindings"]:
+                """resource, value"""
+                url = row["value"]["value"]
+                sample_size += 1
+                if url not in reached:
+                    try:
+                        make_request(url)
+                        reached[url] = True
+                    except:
+                        reached[url] = False
+                        text_file.write(url + '\t' + row["resource"]["value"] + '\n')
+                if reached[url]:
+                    successes += 1
+        p, low, high = proportion_interval(successes, sample_size, population)
+        return p * population, low * population, high * population
+
     def print(self, dimension, property, count, population, weight):
         percentage = count / population
         if count > 0:
@@ -254,6 +414,11 @@ class MQAevaluate:
             partialPoints = 0
         print(dimension, property, count, population, percentage, partialPoints)
 
+    def print_estimate(self, dimension, property, estimate, population, weight):
+        count, low, high = estimate
+        self.print(dimension, property, count, population, weight)
+        print(dimension, property, '95% CI', low, high, low / population, high / population)
+
     def findability_keywords_available(self):
         dimension = FINDABILITY
         entity = DATASET
@@ -290,8 +455,12 @@ class MQAevaluate:
         dimension = ACCESIBILITY
         entity = DISTRIBUTION
         property = 'dcat:accessURL'
-        count = self.count_urls_with_200_code(property)
         population = self.distributionCount
+        if self.sampleSize is not None:
+            estimate = self.estimate_urls_with_200_code(property)
+            self.print_estimate(dimension, property + CODE_200, estimate, population, 50)
+            return
+        count = self.count_urls_with_200_code(property)
         self.print(dimension, property + CODE_200, count, population, 50)
 
     def accesibility_downloadURL_available(self):
@@ -306,8 +475,12 @@ class MQAevaluate:
         dimension = ACCESIBILITY
         entity = DISTRIBUTION
         property = 'dcat:downloadURL'
-        count = self.count_urls_with_200_code(property)
         population = self.distributionCount
+        if self.sampleSize is not None:
+            estimate = self.estimate_urls_with_200_code(property)
+            self.print_estimate(dimension, property + CODE_200, estimate, population, 30)
+            return
+        count = self.count_urls_with_200_code(property)
         self.print(dimension, property + CODE_200, count, population, 30)
 
     def interoperability_format_available(self):
@@ -363,9 +536,24 @@ class MQAevaluate:
         self.print(dimension, property + ' machine-readable', count, population, 20)
 
     def interoperability_DCAT_AP_compliance(self):
+        '''
+        The indicator is all or nothing: all the datasets count if the whole catalog conforms, none otherwise.
+        In sampled mode, a failing dataset in the sample shows the catalog does not conform; if the whole sample
+        conforms, the catalog is taken to conform, which is only certain when the sample covers every dataset.
+        The fraction of conforming datasets in the sample is printed too, for information: it is a different
+        metric, and gives no points.
+        '''
         dimension = INTEROPERABILITY
         entity = DATASET
         property = 'dct:format'
+        population = self.datasetCount
+        if self.shapes is not None and self.sampleSize is not None:
+            successes, sample_size = self.shacl_sample()
+            count = self.datasetCount if successes == sample_size else 0
+            self.print(dimension, 'DCAT-AP compliance', count, population, 30)
+            p, low, high = proportion_interval(successes, sample_size, population)
+            print(dimension, 'DCAT-AP conforming datasets (sample)', successes, sample_size, p, '95% CI', low, high)
+            return
         if self.catalog is not None and self.shapes is not None:
             conforms = self.shacl()
             if conforms:
@@ -374,7 +562,6 @@ class MQAevaluate:
                 count = 0
         else:
             count = -1
-        population = self.datasetCount
         self.print(dimension, 'DCAT-AP compliance', count, population, 30)
 
     def reusability_license_available(self):
@@ -0,0 +1,75 @@
+"""
+Tests of the queries of the sampled mode of MQAevaluate.
+Run from the mqa_sparql directory: python -m unittest discover tests
+"""
+
+import unittest
+
+import rdflib
+from rdflib.plugins.sparql import prepareQuery
+
+from MQAevaluate import sparql_string, url_sample_query, dataset_sample_query, description_query, describe
+
+DCAT = rdflib.Namespace('http://www.w3.org/ns/dcat#')
+DCT = rdflib.Namespace('http://purl.org/dc/terms/')
+EX = rdflib.Namespace('http://example.org/')
+
+SEEDS = ['mqa', '', 'a "quoted" seed', 'back\\slash', 'line\nbreak', "it's"]
+
+
+def catalog():
+    graph = rdflib.Graph()
+    for i in range(20):
+        dataset = EX['dataset%d' % i]
+        distribution = EX['distribution%d' % i]
+        graph.add((dataset, rdflib.RDF.type, DCAT.Dataset))
+        graph.add((dataset, DCT.title, rdflib.Literal('Dataset %d' % i)))
+        graph.add((dataset, DCAT.distribution, distribution))
+        graph.add((distribution, rdflib.RDF.type, DCAT.Distribution))
+        graph.add((distribution, DCAT.accessURL, rdflib.URIRef('http://example.org/data/%d' % i)))
+        graph.add((distribution, DCT['format'], EX['format%d' % (i % 3)]))
+        graph.add((EX['format%d' % (i % 3)], rdflib.RDF.value, rdflib.Literal('text/csv')))
+    return graph
+
+
+class TestSampleQueries(unittest.TestCase):
+
+    def test_sparql_string(self):
+        for seed in SEEDS:
+            query = prepareQuery('SELECT (%s AS ?seed) WHERE {}' % sparql_string(seed))
+            result = list(rdflib.Graph().query(query))
+            self.assertEqual(str(result[0][0]), seed)
+
+    def test_queries_parse(self):
+        for seed in SEEDS:
+            prepareQuery(url_sample_query('dcat:accessURL', seed, 10))
+            prepareQuery(dataset_sample_query(seed, 10))
+        prepareQuery(description_query([EX.dataset1, EX.dataset2]))
+
+    def test_url_sample(self):
+        graph = catalog()
+        sample = list(graph.query(url_sample_query('dcat:accessURL', 'mqa', 5)))
+        self.assertEqual(len(sample), 5)
+        # the sample is determined by the seed
+        self.assertEqual(sample, list(graph.query(url_sample_query('dcat:accessURL', 'mqa', 5))))
+        samples = set(tuple(graph.query(url_sample_query('dcat:accessURL', seed, 5))) for seed in SEEDS)
+        self.assertGreater(len(samples), 1)
+
+    def test_dataset_sample(self):
+        graph = catalog()
+        datasets = [row[0] for row in graph.query(dataset_sample_query('mqa', 4))]
+        self.assertEqual(len(datasets), 4)
+        self.assertTrue(all((dataset, rdflib.RDF.type, DCAT.Dataset) in graph for dataset in datasets))
+
+    def test_description_query(self):
+        graph = catalog()
+        datasets = [EX.dataset1, EX.dataset7]
+        constructed = set(graph.query(description_query(datasets)))
+        described = set()
+        for dataset in datasets:
+            described.update(describe(graph, dataset)[0])
+        self.assertEqual(constructed, described)
+
+
+if __name__ == '__main__':
+    unittest.main()
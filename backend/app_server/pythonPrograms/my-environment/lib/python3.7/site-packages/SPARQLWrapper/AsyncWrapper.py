@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+
+"""
+Non-blocking access to a SPARQL endpoint, built on :mod:`asyncio` streams.
+
+:class:`AsyncSPARQLWrapper` has the same query-building API as :class:`SPARQLWrapper<SPARQLWrapper.Wrapper.SPARQLWrapper>`
+(:meth:`setQuery<SPARQLWrapper.Wrapper.SPARQLWrapper.setQuery>`, :meth:`setReturnFormat<SPARQLWrapper.Wrapper.SPARQLWrapper.setReturnFormat>`,
+:meth:`addParameter<SPARQLWrapper.Wrapper.SPARQLWrapper.addParameter>`, :meth:`setCredentials<SPARQLWrapper.Wrapper.SPARQLWrapper.setCredentials>`...),
+but :meth:`AsyncSPARQLWrapper.query` returns an awaitable. The request is built when :meth:`AsyncSPARQLWrapper.query` is called,
+so the same instance can be reconfigured to issue many concurrent queries on one event loop::
+
+    sparql = AsyncSPARQLWrapper("http://example.org/sparql", returnFormat=JSON)
+    pending = []
+    for q in queries:
+        sparql.setQuery(q)
+        pending.append(sparql.queryAndConvert())
+    results = await asyncio.gather(*pending)
+    await sparql.close()
+
+..
+  Developers involved:
+
+  * Ivan Herman <http://www.ivan-herman.net>
+  * Sergio Fernández <http://www.wikier.org>
+  * Carlos Tejo Alonso <http://www.dayures.net>
+  * Alexey Zakhlestin <https://indeyets.ru/>
+
+  Organizations involved:
+
+  * `World Wide Web Consortium <http://www.w3.org>`_
+  * `Foundation CTIC <http://www.fundacionctic.org/>`_
+
+  :license: `W3C® Software notice and license <http://www.w3.org/Consortium/Legal/copyright-software>`_
+"""
+
+import asyncio
+import http.client
+import io
+import ssl
+import urllib.error
+import urllib.parse
+import zlib
+
+from SPARQLWrapper import __agent__
+from .Wrapper import SPARQLWrapper, QueryResult, XML, DIGEST, POST
+from .ConnectionPool import DEFAULT_POOL_SIZE, MAX_REDIRECTS, _REDIRECT_CODES, _IDEMPOTENT_METHODS, _DeflateDecoder
+
+DEFAULT_MAX_CONNECTIONS = 100
+"""Default maximum number of simultaneous requests of an :class:`AsyncSPARQLWrapper` instance."""
+
+
+class AsyncResponse(io.BytesIO):
+    """
+    HTTP response of an :class:`AsyncSPARQLWrapper` request. The body has been completely read (and decoded, if it was
+    compressed), so it is an in-memory file-like object with the methods and attributes of the responses of
+    :func:`urllib.request.urlopen` used by :class:`QueryResult<SPARQLWrapper.Wrapper.QueryResult>`.
+
+    :ivar url: The URL of the resource retrieved.
+    :vartype url: string
+    :ivar code: The HTTP status code.
+    :vartype code: int
+    :ivar headers: The HTTP response headers.
+    :vartype headers: :class:`http.client.HTTPMessage`
+    """
+
+    def __init__(self, url, code, reason, headers, body):
+        io.BytesIO.__init__(self, body)
+        self.url = url
+        self.code = self.status = code
+        self.reason = reason
+        self.headers = headers
+
+    def info(self):
+        return self.headers
+
+    def geturl(self):
+        return self.url
+
+    def getcode(self):
+        return self.code
+
+
+class AsyncSPARQLWrapper(SPARQLWrapper):
+    """
+    Subclass of :class:`~SPARQLWrapper.Wrapper.SPARQLWrapper` whose :meth:`query` and :meth:`queryAndConvert` methods
+    are coroutines. Only the standard library is used: requests are written and responses read with :mod:`asyncio`
+    streams, over persistent connections that are kept per host and reused.
+
+    .. note::
+      :data:`DIGEST<SPARQLWrapper.Wrapper.DIGEST>` authentication is not supported; :data:`BASIC<SPARQLWrapper.Wrapper.BASIC>` is.
+
+    :ivar maxConnections: Maximum number of simultaneous requests.
+    :vartype maxConnections: int
+    :ivar poolSize: Maximum number of idle connections kept per host.
+    :vartype poolSize: int
+    :ivar sslContext: The SSL context used for HTTPS connections.
+    :vartype sslContext: :class:`ssl.SSLContext`
+    """
+
+    def __init__(self, endpoint, updateEndpoint=None, returnFormat=XML, defaultGraph=None, agent=__agent__,
+                 maxConnections=DEFAULT_MAX_CONNECTIONS, poolSize=DEFAULT_POOL_SIZE, sslContext=None):
+        """
+        See :meth:`SPARQLWrapper.__init__<SPARQLWrapper.Wrapper.SPARQLWrapper.__init__>` for the common parameters.
+
+        :param maxConnections: Maximum number of simultaneous requests; further requests wait for a free slot. The **default** value is :data:`DEFAULT_MAX_CONNECTIONS`.
+        :type maxConnections: int
+        :param poolSize: Maximum number of idle connections kept per host. The **default** value is :data:`DEFAULT_POOL_SIZE<SPARQLWrapper.ConnectionPool.DEFAULT_POOL_SIZE>`.
+        :type poolSize: int
+        :param sslContext: The SSL context used for HTTPS connections. The **default** value is ``None``, the default context of the :mod:`ssl` module.
+        :type sslContext: :class:`ssl.SSLContext`
+        """
+        super(AsyncSPARQLWrapper, self).__init__(endpoint, updateEndpoint=updateEndpoint, returnFormat=returnFormat,
+                                                 defaultGraph=defaultGraph, agent=agent)
+        self.maxConnections = maxConnections
+        self.poolSize = poolSize
+        self.sslContext = sslContext
+        self._idle = {}
+        self._semaphore = None
+        self._loop = None
+
+    def query(self):
+        """
+            Execute the query asynchronously. The request is built from the current settings when this method is called,
+            so the instance can be modified before the returned awaitable is done.
+
+            :return: an awaitable whose result is the query result.
+            :rtype: awaitable of :class:`QueryResult<SPARQLWrapper.Wrapper.QueryResult>`
+            :raises NotImplementedError: If :data:`DIGEST<SPARQLWrapper.Wrapper.DIGEST>` authentication is set.
+        """
+        if self.user and self.passwd and self.http_auth == DIGEST:
+            raise NotImplementedError("DIGEST authentication is not supported by AsyncSPARQLWrapper")
+        return self._asyncQuery(self._createRequest(), self.returnFormat, self.timeout)
+
+    def queryAndConvert(self):
+        """Macro like method: issue a query asynchronously and return the converted results.
+
+        :return: an awaitable whose result is the converted query result.
+        """
+        return self._asyncQueryAndConvert(self.query())
+
+    async def _asyncQueryAndConvert(self, pending):
+        res = await pending
+        return res.convert()
+
+    def _bindLoop(self):
+        """Internal method returning the semaphore of the running event loop. The semaphore and the idle connections
+        are bound to the loop they were created in, so they are replaced when the instance is used in another loop
+        (e.g. by a second :func:`asyncio.run`).
+        """
+        loop = asyncio.get_event_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.maxConnections)
+            self._idle = {}
+        return self._semaphore
+
+    async def _asyncQuery(self, request, returnFormat, timeout):
+        async with self._bindLoop():
+            if timeout:
+                response = await asyncio.wait_for(self._urlopen(request), timeout)
+            else:
+                response = await self._urlopen(request)
+        if response.code >= 400:
+            raise self._convertHTTPError(urllib.error.HTTPError(response.url, response.code, response.reason, response.headers, response))
+        return QueryResult((response, returnFormat))
+
+    async def _urlopen(self, request):
+        """Internal method to send a request, following redirections."""
+        url = request.get_full_url()
+        method = request.get_method()
+        data = request.data
+        headers = dict(request.header_items())
+        headers.setdefault("Accept-encoding", "gzip, deflate")
+
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await self._send(url, method, data, headers)
+            if response.code not in _REDIRECT_CODES or not response.headers.get("Location"):
+                return response
+            url = urllib.parse.urljoin(url, response.headers["Location"])
+            if response.code == 303 or (response.code in (301, 302) and method == POST):
+                method, data = "GET", None
+                headers.pop("Content-type", None)
+                headers.pop("Content-encoding", None)
+        raise urllib.error.HTTPError(url, response.code, "too many redirections", response.headers, response)
+
+    async def _send(self, url, method, data, headers):
+        """
+        Internal method to send one request. A ``GET`` or ``HEAD`` request that fails on a reused connection is sent
+        again on the next idle connection, or on a new one. Other methods (SPARQL updates are ``POST`` requests) are
+        never sent twice: a failure once the request is written is raised as :class:`urllib.error.URLError`, as the
+        endpoint may already have run it.
+        """
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise urllib.error.URLError("unsupported URL scheme '%s'" % parts.scheme)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        lines = ["%s %s HTTP/1.1" % (method, path), "Host: %s" % parts.netloc.rpartition("@")[2]]
+        lines.extend("%s: %s" % (name, value) for name, value in headers.items())
+        if data is not None:
+            lines.append("Content-Length: %d" % len(data))
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        idempotent = method in _IDEMPOTENT_METHODS
+        while True:
+            connection, reused = await self._acquire(key)
+            reader, writer = connection
+            try:
+                writer.write(head)
+                if data is not None:
+                    writer.write(data)
+                await writer.drain()
+                code, reason, responseHeaders, body, keepAlive = await self._readResponse(reader, method)
+            except (ConnectionError, asyncio.IncompleteReadError, http.client.BadStatusLine) as e:
+                writer.close()
+                if reused and idempotent:
+                    continue
+                raise urllib.error.URLError(e)
+            except BaseException:
+                writer.close()
+                raise
+            if keepAlive:
+                self._release(key, connection)
+            else:
+                writer.close()
+            return AsyncResponse(url, code, reason, responseHeaders, self._decode(responseHeaders, body))
+
+    async def _acquire(self, key):
+        """Internal method returning an idle connection for ``key`` (and ``True``), or a new one (and ``False``)."""
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof():
+                return (reader, writer), True
+            writer.close()
+        scheme, host, port = key
+        if scheme == "https":
+            if self.sslContext is None:
+                self.sslContext = ssl._create_default_https_context()
+            connection = await asyncio.open_connection(host, port, ssl=self.sslContext)
+        else:
+            connection = await asyncio.open_connection(host, port)
+        return connection, False
+
+    def _release(self, key, connection):
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self.poolSize:
+            idle.append(connection)
+        else:
+            connection[1].close()
+
+    async def _readResponse(self, reader, method):
+        """Internal method to read an HTTP/1.x response: status, headers and the whole body."""
+        statusLine = await reader.readline()
+        if not statusLine:
+            raise ConnectionResetError("connection closed by the endpoint")
+        try:
+            version, code, reason = (statusLine.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+            code = int(code)
+        except ValueError:
+            raise http.client.BadStatusLine(statusLine)
+
+        headerLines = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            headerLines.append(line.decode("latin-1"))
+        headers = http.client.parse_headers(io.BytesIO("".join(headerLines).encode("latin-1") + b"\r\n"))
+
+        keepAlive = version == "HTTP/1.1" and "close" not in (headers.get("Connection") or "").lower()
+        if method == "HEAD" or code in (204, 304) or 100 <= code < 200:
+            body = b""
+        elif "chunked" in (headers.get("Transfer-Encoding") or "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            body = b"".join(chunks)
+        elif headers.get("Content-Length") is not None:
+            body = await reader.readexactly(int(headers["Content-Length"]))
+        else:
+            body = await reader.read()
+            keepAlive = False
+        return code, reason, headers, body, keepAlive
+
+    def _decode(self, headers, body):
+        """Internal method to decode a ``gzip`` or ``deflate`` compressed body."""
+        encoding = (headers.get("Content-Encoding") or "").strip().lower()
+        if encoding in ("gzip", "x-gzip"):
+            decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            decoder = _DeflateDecoder()
+        else:
+            return body
+        return decoder.decompress(body) + decoder.flush()
+
+    async def close(self):
+        """Close the idle connections of this instance."""
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for reader, writer in connections:
+                writer.close()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+"""
+Columnar decoding of `SPARQL 1.1 Query Results CSV and TSV <https://www.w3.org/TR/sparql11-results-csv-tsv/>`_ documents.
+
+The values of every variable are collected in a column. Columns whose values are all integers are stored in an
+``array('q')`` (8 bytes per value, no Python object per row); the rest are lists of plain strings, with ``None``
+for unbound values. The response body is split directly as bytes: integer fields are parsed without decoding
+the body to a string, and only the fields of string columns are decoded.
+
+..
+  Developers involved:
+
+  * Ivan Herman <http://www.ivan-herman.net>
+  * Sergio Fernández <http://www.wikier.org>
+  * Carlos Tejo Alonso <http://www.dayures.net>
+  * Alexey Zakhlestin <https://indeyets.ru/>
+
+  Organizations involved:
+
+  * `World Wide Web Consortium <http://www.w3.org>`_
+  * `Foundation CTIC <http://www.fundacionctic.org/>`_
+
+  :license: `W3C® Software notice and license <http://www.w3.org/Consortium/Legal/copyright-software>`_
+"""
+
+from array import array
+import csv
+import io
+import re
+
+_INTEGER = re.compile(r"[+-]?[0-9]+\Z")
+_INTEGER_BYTES = re.compile(br"[+-]?[0-9]+\Z")
+# A TSV field: an IRI, a blank node, a literal (with its optional language tag or datatype) or a bare Turtle number/boolean.
+_TSV_LITERAL = re.compile(r'"((?:[^"\\]|\\.)*)"(?:@[A-Za-z0-9-]+|\^\^<[^>]*>)?\Z')
+_TSV_ESCAPE = re.compile(r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)')
+_TSV_ESCAPES = {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f", '"': '"', "'": "'", "\\": "\\"}
+
+
+class ColumnarResult(object):
+    """
+    SELECT query result decoded into columns.
+
+    :ivar variables: The variables of the result, in order.
+    :vartype variables: list
+    :ivar columns: The column of every variable: an ``array('q')`` for integer columns, otherwise a list of strings (``None`` when unbound).
+    :vartype columns: dict
+    """
+
+    def __init__(self, variables, columns):
+        """
+        :param variables: The variables of the result, in order.
+        :type variables: list
+        :param columns: The columns, in the same order as the variables.
+        :type columns: list
+        """
+        self.variables = variables
+        self.columns = dict(zip(variables, columns))
+
+    def __len__(self):
+        if not self.variables:
+            return 0
+        return len(self.columns[self.variables[0]])
+
+    def __getitem__(self, variable):
+        return self.columns[variable]
+
+    def __contains__(self, variable):
+        return variable in self.columns
+
+    def rows(self):
+        """Iterate over the rows of the result as tuples, in the order of :attr:`variables`.
+
+        :return: iterator over the rows.
+        """
+        return zip(*[self.columns[variable] for variable in self.variables])
+
+    def __repr__(self):
+        return "<%s: %d rows of %s>" % (self.__class__.__name__, len(self), ", ".join(self.variables))
+
+
+def _column(values, pattern):
+    """Internal function to convert the raw values of a variable into an ``array('q')`` if they are all integers,
+    or into a list of strings otherwise."""
+    if values and all(value is not None and pattern.match(value) for value in values):
+        try:
+            return array("q", [int(value) for value in values])
+        except OverflowError:
+            pass
+    return [value.decode("utf-8") if isinstance(value, bytes) else value for value in values]
+
+
+def _fields(data, separator):
+    """Internal function splitting a CSV/TSV body into lines of fields, dropping the optional final line break."""
+    lines = data.split(b"\n")
+    if lines and lines[-1] in (b"", b"\r"):
+        lines.pop()
+    return [line[:-1].split(separator) if line.endswith(b"\r") else line.split(separator) for line in lines]
+
+
+def _transpose(rows, width):
+    columns = [[] for _ in range(width)]
+    for row in rows:
+        if len(row) != width:
+            raise ValueError("expected %d fields per row, found %d" % (width, len(row)))
+        for column, value in zip(columns, row):
+            column.append(value)
+    return columns
+
+
+def parseCSV(data):
+    """Decode a SPARQL CSV results document into columns. Empty fields are taken as unbound values.
+
+    :param data: The CSV document.
+    :type data: bytes
+    :rtype: :class:`ColumnarResult`
+    """
+    if b'"' in data:
+        # quoted fields may contain separators and line breaks: use the csv module
+        reader = csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+        # an empty line is a row with one unbound value, as in _fields
+        rows = [row or [""] for row in reader]
+        pattern = _INTEGER
+    else:
+        rows = _fields(data, b",")
+        pattern = _INTEGER_BYTES
+    if not rows:
+        return ColumnarResult([], [])
+    variables = [variable.decode("utf-8") if isinstance(variable, bytes) else variable for variable in rows[0]]
+    columns = _transpose(rows[1:], len(variables))
+    return ColumnarResult(variables, [_column([value or None for value in column], pattern) for column in columns])
+
+
+def columnsFromRows(variables, rows):
+    """Build a :class:`ColumnarResult` from rows of plain string values (``None`` when unbound), like the ones
+    returned by :meth:`QueryResult.iter_bindings(plain=True)<SPARQLWrapper.Wrapper.QueryResult.iter_bindings>`.
+
+    :param variables: The variables, in the order of the values of the rows.
+    :type variables: list
+    :param rows: The rows.
+    :rtype: :class:`ColumnarResult`
+    """
+    columns = _transpose(rows, len(variables))
+    return ColumnarResult(list(variables), [_column(column, _INTEGER) for column in columns])
+
+
+def _unescape(match):
+    escape = match.group(1)
+    if escape[0] in "uU":
+        return chr(int(escape[1:], 16))
+    return _TSV_ESCAPES.get(escape, escape)
+
+
+def _tsvTerm(field):
+    """Internal function returning the plain value of an RDF term in TSV (Turtle) syntax; ``None`` if unbound."""
+    if not field:
+        return None
+    field = field.decode("utf-8")
+    first = field[0]
+    if first == "<":
+        return field[1:-1]
+    if first == "_":
+        return field[2:]
+    if first == '"':
+        match = _TSV_LITERAL.match(field)
+        if match:
+            lexical = match.group(1)
+            return _TSV_ESCAPE.sub(_unescape, lexical) if "\\" in lexical else lexical
+    return field
+
+
+def parseTSV(data):
+    """Decode a SPARQL TSV results document into columns. RDF terms are reduced to their plain values, like the
+    ``value`` of the JSON results: IRIs without brackets, blank node labels without ``_:`` and lexical forms of literals.
+
+    :param data: The TSV document.
+    :type data: bytes
+    :rtype: :class:`ColumnarResult`
+    """
+    # tabs and line breaks are always escaped inside TSV terms, so the body can be split directly
+    rows = _fields(data, b"\t")
+    if not rows:
+        return ColumnarResult([], [])
+    variables = [variable.decode("utf-8").lstrip("?$") for variable in rows[0]]
+    columns = _transpose(rows[1:], len(variables))
+    return ColumnarResult(variables, [_column([_tsvTerm(value) for value in column], _INTEGER) for column in columns])
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+
+"""
+A pool of persistent (keep-alive) HTTP connections, used by :class:`SPARQLWrapper<SPARQLWrapper.Wrapper.SPARQLWrapper>`
+when the :data:`POOLED<SPARQLWrapper.Wrapper.POOLED>` transport is selected.
+
+Idle connections are kept per ``(scheme, host, port)`` and reused by subsequent requests, so a sequence of
+queries to the same endpoint pays the TCP (and TLS) setup only once. TLS sessions are also remembered per host,
+so that new connections to a host can resume the previous session instead of doing a full handshake.
+Responses compressed with ``gzip`` or ``deflate`` are transparently decoded.
+
+..
+  Developers involved:
+
+  * Ivan Herman <http://www.ivan-herman.net>
+  * Sergio Fernández <http://www.wikier.org>
+  * Carlos Tejo Alonso <http://www.dayures.net>
+  * Alexey Zakhlestin <https://indeyets.ru/>
+
+  Organizations involved:
+
+  * `World Wide Web Consortium <http://www.w3.org>`_
+  * `Foundation CTIC <http://www.fundacionctic.org/>`_
+
+  :license: `W3C® Software notice and license <http://www.w3.org/Consortium/Legal/copyright-software>`_
+"""
+
+import http.client
+import select
+import socket
+import ssl
+import threading
+import urllib.error
+import urllib.parse
+import zlib
+
+DEFAULT_POOL_SIZE = 10
+"""Default maximum number of idle connections kept per host."""
+
+MAX_REDIRECTS = 10
+"""Maximum number of redirections followed for a single request."""
+
+_CHUNK_SIZE = 64 * 1024
+_REDIRECT_CODES = (301, 302, 303, 307, 308)
+# Errors that a reused connection raises when the server has silently closed it while it was idle.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
+# Methods that can be sent again when a reused connection fails: the server may already have run the failed request.
+_IDEMPOTENT_METHODS = ("GET", "HEAD")
+
+
+def _dropped(connection):
+    """Internal function telling whether the server has closed an idle connection (its socket is readable)."""
+    try:
+        return bool(select.select([connection.sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    """
+    HTTPS connection that resumes the last TLS session negotiated with the same host.
+    """
+
+    def __init__(self, host, port=None, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, context=None, session=None):
+        http.client.HTTPSConnection.__init__(self, host, port, timeout=timeout, context=context)
+        self.tlsSession = session
+
+    def connect(self):
+        http.client.HTTPConnection.connect(self)
+        self.sock = self._context.wrap_socket(self.sock, server_hostname=self.host, session=self.tlsSession)
+
+
+class PooledResponse(object):
+    """
+    File-like HTTP response read from a pooled connection. It offers the same interface used from the
+    responses returned by :func:`urllib.request.urlopen` (``read``, ``readline``, iteration, ``info``, ``geturl``,
+    ``code`` and ``url``), decoding ``gzip``/``deflate`` content on the fly.
+
+    The connection goes back to the pool as soon as the body has been completely read. If the response is
+    closed before that, the connection is discarded.
+
+    :ivar url: The URL of the resource retrieved.
+    :vartype url: string
+    :ivar code: The HTTP status code.
+    :vartype code: int
+    :ivar headers: The HTTP response headers.
+    :vartype headers: :class:`http.client.HTTPMessage`
+    """
+
+    def __init__(self, pool, key, connection, response, url):
+        """
+        :param pool: The pool the connection is returned to.
+        :type pool: :class:`ConnectionPool`
+        :param key: The ``(scheme, host, port)`` key of the connection.
+        :type key: tuple
+        :param connection: The connection used to make the request.
+        :type connection: :class:`http.client.HTTPConnection`
+        :param response: The response read from the connection.
+        :type response: :class:`http.client.HTTPResponse`
+        :param url: The URL of the request.
+        :type url: string
+        """
+        self._pool = pool
+        self._key = key
+        self._connection = connection
+        self._response = response
+        # decoded bytes not read yet: self._buffer[self._pos:]
+        self._buffer = bytearray()
+        self._pos = 0
+        self._eof = False
+        self.url = url
+        self.code = self.status = response.status
+        self.reason = response.reason
+        self.headers = response.msg
+
+        encoding = (response.getheader("Content-Encoding") or "").strip().lower()
+        if encoding in ("gzip", "x-gzip"):
+            self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self._decoder = _DeflateDecoder()
+        else:
+            self._decoder = None
+
+    def info(self):
+        """Return the meta-information (headers) of the HTTP response.
+
+        :return: the HTTP response headers.
+        :rtype: :class:`http.client.HTTPMessage`
+        """
+        return self.headers
+
+    def geturl(self):
+        """Return the URL of the resource retrieved.
+
+        :return: the URL of the resource retrieved.
+        :rtype: string
+        """
+        return self.url
+
+    def getcode(self):
+        """Return the HTTP status code of the response.
+
+        :return: the HTTP status code.
+        :rtype: int
+        """
+        return self.code
+
+    def _fill(self, size):
+        """Internal method to read from the connection until ``size`` decoded bytes are buffered, or the body ends.
+        A negative ``size`` reads the whole body.
+        """
+        while not self._eof and (size < 0 or len(self._buffer) - self._pos < size):
+            chunk = self._response.read(_CHUNK_SIZE)
+            if chunk:
+                self._buffer += self._decoder.decompress(chunk) if self._decoder else chunk
+            else:
+                if self._decoder:
+                    self._buffer += self._decoder.flush()
+                self._eof = True
+                self._release()
+
+    def _take(self, end):
+        """Internal method to return the buffered bytes up to the offset ``end`` of the buffer, and consume them.
+        The consumed bytes are dropped from the buffer when they are at least half of it, so each byte is moved
+        a bounded number of times.
+        """
+        data = bytes(self._buffer[self._pos:end])
+        self._pos = end
+        if self._pos >= len(self._buffer) - self._pos:
+            del self._buffer[:self._pos]
+            self._pos = 0
+        return data
+
+    def read(self, amt=None):
+        """Read and return up to ``amt`` bytes of the (decoded) body; the whole body if ``amt`` is omitted.
+
+        :rtype: bytes
+        """
+        if amt is None or amt < 0:
+            self._fill(-1)
+            return self._take(len(self._buffer))
+        self._fill(amt)
+        return self._take(min(self._pos + amt, len(self._buffer)))
+
+    def readline(self, limit=-1):
+        """Read and return one line of the (decoded) body.
+
+        :rtype: bytes
+        """
+        start = self._pos
+        end = self._buffer.find(b"\n", start) + 1
+        while not end and not self._eof and (limit < 0 or len(self._buffer) - self._pos < limit):
+            # only the new bytes are searched for the line break
+            start = len(self._buffer)
+            self._fill(start - self._pos + 1)
+            end = self._buffer.find(b"\n", start) + 1
+        if not end:
+            end = len(self._buffer)
+        if 0 <= limit < end - self._pos:
+            end = self._pos + limit
+        return self._take(end)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def close(self):
+        """Close the response. The connection is discarded if the body has not been completely read."""
+        if not self._eof:
+            self._eof = True
+            self._buffer = bytearray()
+            self._pos = 0
+            self._response.close()
+            self._connection.close()
+            self._connection = None
+
+    def _release(self):
+        if self._connection is not None:
+            self._pool._release(self._key, self._connection, self._response.will_close)
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _DeflateDecoder(object):
+    """
+    Decoder for ``deflate`` content. Servers disagree on whether it is a zlib stream or a raw deflate stream,
+    so the first one is tried and, if it fails, the second one.
+    """
+
+    def __init__(self):
+        self._decoder = zlib.decompressobj()
+        self._first = True
+
+    def decompress(self, data):
+        if self._first:
+            self._first = False
+            try:
+                return self._decoder.decompress(data)
+            except zlib.error:
+                self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._decoder.decompress(data)
+
+    def flush(self):
+        return self._decoder.flush()
+
+
+class ConnectionPool(object):
+    """
+    Pool of persistent HTTP(S) connections. It can be shared by several :class:`SPARQLWrapper<SPARQLWrapper.Wrapper.SPARQLWrapper>`
+    instances and threads.
+
+    :ivar maxsize: Maximum number of idle connections kept per host. Connections released when there are already
+     ``maxsize`` idle connections for the host are closed.
+    :vartype maxsize: int
+    :ivar sslContext: The SSL context used for HTTPS connections.
+    :vartype sslContext: :class:`ssl.SSLContext`
+    :ivar compression: Whether ``gzip``/``deflate`` compressed responses are requested.
+    :vartype compression: bool
+    """
+
+    def __init__(self, maxsize=DEFAULT_POOL_SIZE, sslContext=None, compression=True):
+        """
+        :param maxsize: Maximum number of idle connections kept per host. The **default** value is :data:`DEFAULT_POOL_SIZE`.
+        :type maxsize: int
+        :param sslContext: The SSL context used for HTTPS connections. The **default** value is ``None``, the default context of the :mod:`ssl` module.
+        :type sslContext: :class:`ssl.SSLContext`
+        :param compression: Whether ``gzip``/``deflate`` compressed responses are requested. The **default** value is ``True``.
+        :type compression: bool
+        """
+        self.maxsize = maxsize
+        self.sslContext = sslContext
+        self.compression = compression
+        self._idle = {}
+        self._tlsSessions = {}
+        self._lock = threading.Lock()
+
+    def _newConnection(self, key, timeout):
+        scheme, host, port = key
+        if scheme == "https":
+            if self.sslContext is None:
+                self.sslContext = ssl._create_default_https_context()
+            with self._lock:
+                session = self._tlsSessions.get(key)
+            return _HTTPSConnection(host, port, timeout=timeout, context=self.sslContext, session=session)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key, timeout):
+        """Internal method returning an idle connection for ``key`` (and ``True``), or a new one (and ``False``)."""
+        with self._lock:
+            idle = self._idle.get(key)
+            connection = idle.pop() if idle else None
+        if connection is None:
+            return self._newConnection(key, timeout), False
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(socket.getdefaulttimeout() if timeout is socket._GLOBAL_DEFAULT_TIMEOUT else timeout)
+        return connection, True
+
+    def _release(self, key, connection, close):
+        """Internal method to give back a connection whose response has been completely read."""
+        session = getattr(connection.sock, "session", None)
+        with self._lock:
+            if session is not None:
+                self._tlsSessions[key] = session
+            idle = self._idle.setdefault(key, [])
+            if not close and connection.sock is not None and len(idle) < self.maxsize:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def clear(self):
+        """Close all the idle connections of the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def urlopen(self, request, timeout=None):
+        """Send a request through a pooled connection, following redirections.
+        It mimics :func:`urllib.request.urlopen`: HTTP errors are raised as :class:`urllib.error.HTTPError`.
+
+        :param request: The request to send.
+        :type request: :class:`urllib.request.Request`
+        :param timeout: Timeout in seconds. The **default** value is ``None``, the global default timeout.
+        :type timeout: int
+        :return: the response.
+        :rtype: :class:`PooledResponse`
+        :raises urllib.error.HTTPError: If the HTTP return code is ``400`` or greater.
+        :raises urllib.error.URLError: If the endpoint cannot be reached.
+        """
+        if timeout is None:
+            timeout = socket._GLOBAL_DEFAULT_TIMEOUT
+        url = request.get_full_url()
+        method = request.get_method()
+        data = request.data
+        headers = dict(request.header_items())
+        if self.compression and "Accept-encoding" not in headers:
+            headers["Accept-Encoding"] = "gzip, deflate"
+
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._send(url, method, data, headers, timeout)
+            if response.code not in _REDIRECT_CODES or not response.headers.get("Location"):
+                break
+            response.read()
+            url = urllib.parse.urljoin(url, response.headers["Location"])
+            if response.code == 303 or (response.code in (301, 302) and method == "POST"):
+                method, data = "GET", None
+                headers.pop("Content-type", None)
+                headers.pop("Content-encoding", None)
+        else:
+            raise urllib.error.HTTPError(url, response.code, "too many redirections", response.headers, response)
+
+        if response.code >= 400:
+            raise urllib.error.HTTPError(url, response.code, response.reason, response.headers, response)
+        return response
+
+    def _send(self, url, method, data, headers, timeout):
+        """
+        Internal method to send one request. A ``GET`` or ``HEAD`` request that fails on a reused connection is sent
+        again on the next idle connection, or on a new one. Other methods (SPARQL updates are ``POST`` requests) are
+        never sent twice: idle connections the server has closed are discarded before sending, and a failure once the
+        request is sent is raised as :class:`urllib.error.URLError`.
+        """
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise urllib.error.URLError("unsupported URL scheme '%s'" % parts.scheme)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        idempotent = method in _IDEMPOTENT_METHODS
+        while True:
+            connection, reused = self._acquire(key, timeout)
+            if reused and not idempotent and _dropped(connection):
+                connection.close()
+                continue
+            try:
+                connection.request(method, path, body=data, headers=headers)
+                response = connection.getresponse()
+            except _STALE_CONNECTION_ERRORS as e:
+                connection.close()
+                if reused and idempotent:
+                    continue
+                raise urllib.error.URLError(e)
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise urllib.error.URLError(e)
+            return PooledResponse(self, key, connection, response, url)
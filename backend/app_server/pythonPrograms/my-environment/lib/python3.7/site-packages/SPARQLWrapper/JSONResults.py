@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+"""
+Incremental reader of `SPARQL 1.1 Query Results JSON <https://www.w3.org/TR/sparql11-results-json/>`_ documents.
+
+The document is read from the response in chunks and the members of ``results.bindings`` are decoded and
+returned one at a time, so only one binding (plus one chunk of the response) is in memory at any moment,
+instead of the whole body, its decoded string and the full tree of dictionaries.
+
+..
+  Developers involved:
+
+  * Ivan Herman <http://www.ivan-herman.net>
+  * Sergio Fernández <http://www.wikier.org>
+  * Carlos Tejo Alonso <http://www.dayures.net>
+  * Alexey Zakhlestin <https://indeyets.ru/>
+
+  Organizations involved:
+
+  * `World Wide Web Consortium <http://www.w3.org>`_
+  * `Foundation CTIC <http://www.fundacionctic.org/>`_
+
+  :license: `W3C® Software notice and license <http://www.w3.org/Consortium/Legal/copyright-software>`_
+"""
+
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+"""Number of bytes read from the response at a time."""
+
+_WHITESPACE = " \t\r\n"
+
+
+class JSONBindingsReader(object):
+    """
+    Iterator over the bindings of a SPARQL JSON results document read from a file-like object.
+
+    By default every binding is returned as the usual dictionary (``{"var": {"type": ..., "value": ...}}``).
+    With ``plain=True`` each binding is projected to a tuple with the plain string value of every variable
+    (``None`` when unbound), in the order of :attr:`variables`; the bindings are then decoded as lists
+    of pairs, so no dictionary is allocated per row.
+
+    :ivar head: The ``head`` member of the document, once it has been read (it usually precedes the results).
+    :vartype head: dict
+    :ivar variables: The variables of the projection; the ``head.vars`` of the document unless given.
+    :vartype variables: list
+    :ivar boolean: The result of an ``ASK`` query, once it has been read; otherwise ``None``.
+    :vartype boolean: bool
+    """
+
+    def __init__(self, stream, plain=False, variables=None):
+        """
+        :param stream: The file-like object the document is read from (e.g. an HTTP response).
+        :param plain: Whether the bindings are projected to tuples of plain strings. The **default** value is ``False``.
+        :type plain: bool
+        :param variables: The variables (and their order) of the projection. The **default** value is ``None``, the ``head.vars`` of the document.
+        :type variables: list
+        """
+        self.head = None
+        self.variables = variables
+        self.boolean = None
+        self.plain = plain
+        self._stream = stream
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._json = json.JSONDecoder()
+        self._rowJSON = json.JSONDecoder(object_pairs_hook=list) if plain else self._json
+        self._index = None
+
+    def _read(self):
+        """Internal method to append the next chunk of the response to the buffer, dropping what has already been parsed."""
+        chunk = self._stream.read(CHUNK_SIZE)
+        self._eof = not chunk
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(chunk, final=self._eof)
+        self._pos = 0
+
+    def _peek(self):
+        """Internal method returning the next non-whitespace character, without consuming it."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if self._eof:
+                raise ValueError("unexpected end of the JSON results document")
+            self._read()
+
+    def _next(self, expected):
+        """Internal method to consume the next non-whitespace character, which must be one of ``expected``."""
+        char = self._peek()
+        if char not in expected:
+            raise ValueError("expected one of '%s' at char %d of the JSON results document, found '%s'" % (expected, self._pos, char))
+        self._pos += 1
+        return char
+
+    def _value(self, decoder):
+        """Internal method to decode the next JSON value, reading as many chunks as needed."""
+        self._peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self._buffer, self._pos)
+                # a number at the end of the buffer may continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except ValueError:
+                if self._eof:
+                    raise
+            self._read()
+
+    def _members(self):
+        """Internal generator returning the keys of the object being read; the caller must consume each value."""
+        self._next("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value(self._json)
+            self._next(":")
+            yield key
+            if self._next(",}") == "}":
+                return
+
+    def _project(self, row):
+        """Internal method converting a binding, decoded as a list of pairs, into a tuple of plain values."""
+        if self._index is None:
+            if self.variables is None:
+                raise ValueError("the variables are unknown because the results precede the head of the document; set them explicitly")
+            self._index = dict((var, i) for i, var in enumerate(self.variables))
+        values = [None] * len(self._index)
+        for var, term in row:
+            i = self._index.get(var)
+            if i is not None:
+                for key, value in term:
+                    if key == "value":
+                        values[i] = value
+        return tuple(values)
+
+    def __iter__(self):
+        for key in self._members():
+            if key == "results":
+                for resultsKey in self._members():
+                    if resultsKey != "bindings":
+                        self._value(self._json)
+                        continue
+                    self._next("[")
+                    if self._peek() == "]":
+                        self._pos += 1
+                        continue
+                    while True:
+                        row = self._value(self._rowJSON)
+                        yield self._project(row) if self.plain else row
+                        if self._next(",]") == "]":
+                            break
+            else:
+                value = self._value(self._json)
+                if key == "head":
+                    self.head = value
+                    if self.variables is None:
+                        self.variables = value.get("vars")
+                elif key == "boolean":
+                    self.boolean = value
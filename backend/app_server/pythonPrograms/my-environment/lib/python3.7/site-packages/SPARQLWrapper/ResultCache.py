@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cache of query responses for :class:`SPARQLWrapper<SPARQLWrapper.Wrapper.SPARQLWrapper>`.
+
+Responses are keyed by endpoint, HTTP method, encoded parameters (the URL and the body of the request), ``Accept``
+and ``Authorization`` headers, so byte-identical queries share an entry. Entries live in an in-memory LRU tier and,
+optionally, in an on-disk tier that survives the process. While an entry is fresh (within its TTL) it is returned
+without contacting the endpoint; once it is stale, it is revalidated with a conditional request if the endpoint
+supplied validators (``ETag`` or ``Last-Modified``), so an unchanged result costs a ``304 Not Modified`` instead of
+the whole body.
+
+..
+  Developers involved:
+
+  * Ivan Herman <http://www.ivan-herman.net>
+  * Sergio Fernández <http://www.wikier.org>
+  * Carlos Tejo Alonso <http://www.dayures.net>
+  * Alexey Zakhlestin <https://indeyets.ru/>
+
+  Organizations involved:
+
+  * `World Wide Web Consortium <http://www.w3.org>`_
+  * `Foundation CTIC <http://www.fundacionctic.org/>`_
+
+  :license: `W3C® Software notice and license <http://www.w3.org/Consortium/Legal/copyright-software>`_
+"""
+
+import collections
+import hashlib
+import http.client
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+DEFAULT_TTL = 300
+"""Default time to live (in seconds) of the cached responses."""
+
+DEFAULT_MAX_ENTRIES = 256
+"""Default maximum number of responses in the in-memory tier."""
+
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+"""Default maximum size (in bytes) of the files of the on-disk tier."""
+
+# the files of the on-disk tier: the key of the entry and a suffix, so other files of the directory are left alone
+_SUFFIX = ".sparqlcache"
+_FILE_NAME = re.compile(r"[0-9a-f]{64}(?:\.sparqlcache|\w+\.sparqlcache\.tmp)\Z")
+_MAX_AGE = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+# headers describing the transfer of the original body, not the (already decoded) cached one
+_TRANSFER_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive")
+
+
+class CachedResponse(io.BytesIO):
+    """
+    Response served from a :class:`ResultCache`. It is an in-memory file-like object with the methods and attributes of
+    the responses of :func:`urllib.request.urlopen` used by :class:`QueryResult<SPARQLWrapper.Wrapper.QueryResult>`.
+    """
+
+    def __init__(self, entry):
+        io.BytesIO.__init__(self, entry.body)
+        self.url = entry.url
+        self.code = self.status = entry.code
+        self.headers = http.client.HTTPMessage()
+        for name, value in entry.headers:
+            self.headers[name] = value
+
+    def info(self):
+        return self.headers
+
+    def geturl(self):
+        return self.url
+
+    def getcode(self):
+        return self.code
+
+
+class CacheEntry(object):
+    """
+    A cached response.
+
+    :ivar url: The URL of the response.
+    :ivar code: The HTTP status code.
+    :ivar headers: The HTTP headers, as a list of ``(name, value)`` pairs.
+    :ivar body: The body of the response.
+    :ivar expires: When the entry becomes stale, in seconds since the epoch.
+    """
+
+    def __init__(self, url, code, headers, body, expires):
+        self.url = url
+        self.code = code
+        self.headers = headers
+        self.body = body
+        self.expires = expires
+
+    def header(self, name):
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    def isFresh(self):
+        return time.time() < self.expires
+
+    def validators(self):
+        """Return the conditional request headers for revalidating this entry (empty if the endpoint gave no validators)."""
+        conditions = {}
+        if self.header("ETag"):
+            conditions["If-None-Match"] = self.header("ETag")
+        if self.header("Last-Modified"):
+            conditions["If-Modified-Since"] = self.header("Last-Modified")
+        return conditions
+
+
+class ResultCache(object):
+    """
+    Two-tier (memory and, optionally, disk) cache of query responses. An instance can be shared by several
+    :class:`SPARQLWrapper<SPARQLWrapper.Wrapper.SPARQLWrapper>` instances and threads.
+
+    Only the files named after a cache key with the ``.sparqlcache`` suffix belong to the on-disk tier. When they grow
+    over ``maxDiskBytes``, the least recently used ones are removed until they fill three quarters of it.
+
+    The counters can be used to tune the TTL and sizes:
+
+    :ivar hits: Number of queries answered by a fresh entry, without contacting the endpoint.
+    :vartype hits: int
+    :ivar diskHits: Number of :attr:`hits` (or revalidated entries) found in the disk tier but not in the memory tier.
+    :vartype diskHits: int
+    :ivar revalidations: Number of stale entries the endpoint confirmed as unchanged (``304 Not Modified``).
+    :vartype revalidations: int
+    :ivar misses: Number of queries that had to fetch a new response.
+    :vartype misses: int
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, maxEntries=DEFAULT_MAX_ENTRIES, directory=None, maxDiskBytes=DEFAULT_MAX_DISK_BYTES):
+        """
+        :param ttl: Time to live (in seconds) of the responses, unless the endpoint sets a ``Cache-Control: max-age``. The **default** value is :data:`DEFAULT_TTL`.
+        :type ttl: int
+        :param maxEntries: Maximum number of responses in the in-memory tier; the least recently used is evicted first. The **default** value is :data:`DEFAULT_MAX_ENTRIES`.
+        :type maxEntries: int
+        :param directory: Directory of the on-disk tier. The **default** value is ``None``, no disk tier.
+        :type directory: string
+        :param maxDiskBytes: Maximum size (in bytes) of the files of the on-disk tier. The **default** value is :data:`DEFAULT_MAX_DISK_BYTES`.
+        :type maxDiskBytes: int
+        """
+        self.ttl = ttl
+        self.maxEntries = maxEntries
+        self.directory = directory
+        self.maxDiskBytes = maxDiskBytes
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.hits = 0
+        self.diskHits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._diskBytes = sum(size for _, size, _ in self._files()) if directory is not None else 0
+
+    @staticmethod
+    def key(request):
+        """Return the cache key of a request: a digest of its method, URL, body, ``Accept`` and ``Authorization`` headers.
+
+        :param request: The request.
+        :type request: :class:`urllib.request.Request`
+        :rtype: string
+        """
+        digest = hashlib.sha256()
+        for part in (request.get_method(), request.get_full_url(), request.get_header("Accept", ""), request.get_header("Authorization", "")):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(request.data or b"")
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the entry (fresh or stale) of a key, or ``None``.
+
+        :rtype: :class:`CacheEntry`
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self._load(key)
+        if entry is not None:
+            with self._lock:
+                self.diskHits += 1
+            self._remember(key, entry)
+        return entry
+
+    def count(self, counter):
+        """Add one to a counter (``"hits"``, ``"revalidations"`` or ``"misses"``).
+
+        :param counter: The name of the counter.
+        :type counter: string
+        """
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def put(self, key, url, code, headers, body):
+        """Store a response, unless the endpoint forbids it with ``Cache-Control: no-store``.
+
+        :return: the new entry, or ``None`` if the response was not stored.
+        :rtype: :class:`CacheEntry`
+        """
+        headers = [(name, value) for name, value in headers if name.lower() not in _TRANSFER_HEADERS]
+        entry = CacheEntry(url, code, headers, body, 0)
+        cacheControl = entry.header("Cache-Control") or ""
+        if "no-store" in cacheControl.lower():
+            return None
+        self.refresh(key, entry, headers)
+        return entry
+
+    def refresh(self, key, entry, headers=()):
+        """Make an entry fresh again for another TTL, e.g. after the endpoint answered ``304 Not Modified``.
+        The new headers (validators, ``Cache-Control``...) replace the stored ones."""
+        headers = [(name, value) for name, value in headers if name.lower() not in _TRANSFER_HEADERS]
+        replaced = dict((name.lower(), value) for name, value in headers)
+        if replaced:
+            entry.headers = [(name, value) for name, value in entry.headers if name.lower() not in replaced] + headers
+        maxAge = _MAX_AGE.search(entry.header("Cache-Control") or "")
+        entry.expires = time.time() + (int(maxAge.group(1)) if maxAge else self.ttl)
+        self._remember(key, entry)
+        self._store(key, entry)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxEntries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def _files(self):
+        """Internal method returning the ``(modification time, size, path)`` of the files of the disk tier."""
+        files = []
+        for name in os.listdir(self.directory):
+            if _FILE_NAME.match(name):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _load(self, key):
+        """Internal method to read an entry from the disk tier. The file is touched, as the disk tier evicts the
+        least recently used files first."""
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                meta = json.loads(f.readline().decode("utf-8"))
+                body = f.read()
+            os.utime(path)
+        except (IOError, OSError, ValueError):
+            return None
+        return CacheEntry(meta["url"], meta["code"], [tuple(header) for header in meta["headers"]], body, meta["expires"])
+
+    def _store(self, key, entry):
+        """Internal method to write an entry to the disk tier; the file is replaced atomically."""
+        if self.directory is None:
+            return
+        meta = {"url": entry.url, "code": entry.code, "headers": entry.headers, "expires": entry.expires}
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=key, suffix=_SUFFIX + ".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(meta).encode("utf-8") + b"\n")
+                f.write(entry.body)
+                size = f.tell()
+            os.replace(tmp, self._path(key))
+        except (IOError, OSError):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        with self._lock:
+            # a replaced file is counted twice until the next pruning, which measures the files again
+            self._diskBytes += size
+            prune = self._diskBytes > self.maxDiskBytes
+        if prune:
+            self._prune()
+
+    def _prune(self):
+        """Internal method to remove the least recently used files of the disk tier until they fill three quarters of
+        :attr:`maxDiskBytes`."""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        limit = self.maxDiskBytes * 3 // 4
+        for _, size, path in files:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        with self._lock:
+            self._diskBytes = total
+
+    def clear(self):
+        """Remove all the entries, from both tiers, and reset the counters. Only the files of the disk tier are
+        removed from its directory."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.diskHits = self.revalidations = self.misses = 0
+            self._diskBytes = 0
+        if self.directory is not None:
+            for _, _, path in self._files():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        """Return the counters of the cache.
+
+        :return: ``hits``, ``diskHits``, ``revalidations``, ``misses`` and ``entries`` (in memory).
+        :rtype: dict
+        """
+        with self._lock:
+            return {"hits": self.hits, "diskHits": self.diskHits, "revalidations": self.revalidations,
+                    "misses": self.misses, "entries": len(self._entries)}
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+"""
+Splitting of queries with large inline data (``VALUES`` blocks) into several smaller queries.
+
+Queries with hundreds of IRIs in a ``VALUES`` block easily exceed the limits of the endpoints. :func:`splitValues`
+returns copies of the query that differ only in the rows of the largest ``VALUES`` block, so each copy stays within a
+number of rows and/or a length. The union of the solutions of the copies is the solution of the original query as
+long as the rows contribute independently to the results: this is **not** the case for queries that aggregate
+(``GROUP BY``, ``COUNT``...), sort, slice (``LIMIT``/``OFFSET``) or remove duplicates (``DISTINCT``) across rows,
+whose partial results must be combined by the caller.
+
+..
+  Developers involved:
+
+  * Ivan Herman <http://www.ivan-herman.net>
+  * Sergio Fernández <http://www.wikier.org>
+  * Carlos Tejo Alonso <http://www.dayures.net>
+  * Alexey Zakhlestin <https://indeyets.ru/>
+
+  Organizations involved:
+
+  * `World Wide Web Consortium <http://www.w3.org>`_
+  * `Foundation CTIC <http://www.fundacionctic.org/>`_
+
+  :license: `W3C® Software notice and license <http://www.w3.org/Consortium/Legal/copyright-software>`_
+"""
+
+import re
+
+# strings and IRIs may contain braces, so they are matched as a whole while looking for the end of a block
+_TOKEN = re.compile(r'''
+    (?: "{3}(?:[^"\\]|\\.|"(?!""))*"{3} | '{3}(?:[^'\\]|\\.|'(?!''))*'{3}
+        | "(?:[^"\\\n]|\\.)*" | '(?:[^'\\\n]|\\.)*' )
+      (?: @[A-Za-z0-9-]+ | \^\^(?:<[^<>"{}|^`\\\s]*>|[^\s(){}]*) )?
+    | <[^<>"{}|^`\\\s]*>
+    | \#[^\n]*
+    | [(){}]
+    | [^\s(){}"'<#]+
+''', re.VERBOSE)
+_VALUES = re.compile(r"\bVALUES\s*(?P<variables>[?$]\w+|\((?:\s*[?$]\w+)*\s*\))\s*\{", re.IGNORECASE)
+
+
+def _rows(query, start):
+    """Internal function returning the rows of the ``VALUES`` block whose content starts at ``start``, and the position of its closing brace."""
+    rows = []
+    row = None
+    pos = start
+    while True:
+        match = _TOKEN.search(query, pos)
+        if match is None:
+            raise ValueError("unterminated VALUES block at char %d" % start)
+        token = match.group(0)
+        pos = match.end()
+        if token.startswith("#"):
+            continue
+        if token == "}":
+            if row is not None:
+                raise ValueError("unterminated row in the VALUES block at char %d" % start)
+            return rows, match.start()
+        if token == "(":
+            row = []
+        elif token == ")":
+            rows.append("(" + " ".join(row) + ")")
+            row = None
+        elif row is not None:
+            row.append(token)
+        else:
+            rows.append(token)
+
+
+def _blocks(query):
+    """Internal function returning the ``VALUES`` blocks of a query as ``(variables, rows, start, end)`` tuples."""
+    blocks = []
+    pos = 0
+    while True:
+        match = _VALUES.search(query, pos)
+        if match is None:
+            return blocks
+        # skip matches inside strings, IRIs or comments
+        token = _TOKEN.search(query, pos)
+        while token is not None and token.end() <= match.start():
+            token = _TOKEN.search(query, token.end())
+        if token is not None and token.start() < match.start():
+            pos = token.end()
+            continue
+        rows, end = _rows(query, match.end())
+        blocks.append((match.group("variables"), rows, match.start(), end + 1))
+        pos = end + 1
+
+
+def splitValues(query, maxRows=None, maxLength=None):
+    """Split a query on the rows of its largest ``VALUES`` block.
+
+    The query is returned unchanged (as the only element) if it has no ``VALUES`` block or it is already within the limits.
+    See the module documentation for the queries whose results can simply be concatenated.
+
+    :param query: The SPARQL query.
+    :type query: string
+    :param maxRows: Maximum number of rows of the block in each query. The **default** value is ``None``, no limit.
+    :type maxRows: int
+    :param maxLength: Maximum length (in characters) of each query; a single row is never split, so a query may be longer if one row does not fit. The **default** value is ``None``, no limit.
+    :type maxLength: int
+    :return: the queries.
+    :rtype: list
+    :raises ValueError: If a ``VALUES`` block is malformed.
+    """
+    blocks = _blocks(query)
+    if not blocks:
+        return [query]
+    variables, rows, start, end = max(blocks, key=lambda block: len(block[1]))
+    head = query[:start] + "VALUES " + variables + " { "
+    tail = " }" + query[end:]
+
+    queries = []
+    chunk = []
+    length = len(head) + len(tail)
+    for row in rows:
+        if chunk and ((maxRows is not None and len(chunk) >= maxRows) or
+                      (maxLength is not None and length + len(row) + 1 > maxLength)):
+            queries.append(head + " ".join(chunk) + tail)
+            chunk = []
+            length = len(head) + len(tail)
+        chunk.append(row)
+        length += len(row) + 1
+    queries.append(head + " ".join(chunk) + tail)
+    if len(queries) == 1:
+        return [query]
+    return queries
@@ -29,9 +29,15 @@ import base64
 import re
 import sys
 import warnings
+import zlib
 
 import json
 from .KeyCaseInsensitiveDict import KeyCaseInsensitiveDict
+from .ConnectionPool import ConnectionPool
+from .JSONResults import JSONBindingsReader
+from .XMLResults import XMLBindingsReader
+from .CSVResults import parseCSV, parseTSV, columnsFromRows
+from .ResultCache import ResultCache, CacheEntry, CachedResponse
 from .SPARQLExceptions import QueryBadFormed, EndPointNotFound, EndPointInternalError, Unauthorized, URITooLong
 from SPARQLWrapper import __agent__
 
@@ -381,6 +387,13 @@ DIGEST = "DIGEST"
 """to be used to set ``DIGEST`` HTTP Authentication method."""
 _allowedAuth = [BASIC, DIGEST]
 
+# Possible HTTP transports
+URLLIB = "urllib"
+"""to be used to open a new :mod:`urllib` connection for each request. **This is the default**."""
+POOLED = "pooled"
+"""to be used to reuse persistent (keep-alive) connections from a :class:`ConnectionPool<SPARQLWrapper.ConnectionPool.ConnectionPool>`."""
+_allowedTransports = [URLLIB, POOLED]
+
 # Possible SPARQL/SPARUL query type (aka SPARQL Query forms)
 SELECT     = "SELECT"
 """to be used to set the query type to ``SELECT``. This is, usually, determined automatically."""
@@ -418,6 +431,11 @@ POSTDIRECTLY = "postdirectly"
 """to be used to set **POST directly** as the encoding method for the request. This is, usually, determined automatically."""
 _REQUEST_METHODS = [URLENCODED, POSTDIRECTLY]
 
+MAX_URL_LENGTH = 2048
+"""Default maximum length of the URL of a ``GET`` request; longer queries are sent by ``POST``. Many servers and proxies reject longer URLs (``414 URI Too Long``)."""
+COMPRESSION_THRESHOLD = 64 * 1024
+"""Default size (in bytes) of the request bodies above which they are compressed, once request compression is enabled."""
+
 # Possible output format (mime types) that can be converted by the local script. Unfortunately,
 # it does not work by simply setting the return format, because there is still a certain level of confusion
 # among implementations.
@@ -488,6 +506,16 @@ class SPARQLWrapper(object):
     :vartype customHttpHeaders: dict
     :ivar timeout: The timeout (in seconds) to use for querying the endpoint.
     :vartype timeout: int
+    :ivar transport: The HTTP transport. The **default** value is :data:`URLLIB`. Possible values are :data:`URLLIB` or :data:`POOLED`.
+    :vartype transport: string
+    :ivar connectionPool: The pool of persistent connections used by the :data:`POOLED` transport, or ``None``.
+    :vartype connectionPool: :class:`ConnectionPool<SPARQLWrapper.ConnectionPool.ConnectionPool>`
+    :ivar maxURLLength: Maximum length of the URL of a :data:`GET` query; longer queries are sent by :data:`POST`. ``None`` means no limit. The **default** value is :data:`MAX_URL_LENGTH`.
+    :vartype maxURLLength: int
+    :ivar compressionThreshold: Size (in bytes) of the request bodies above which they are sent ``gzip`` compressed. ``None`` (the **default**) means that requests are never compressed.
+    :vartype compressionThreshold: int
+    :ivar resultCache: The cache of query responses, or ``None`` (the **default**) if the responses are not cached. Update operations are never cached.
+    :vartype resultCache: :class:`ResultCache<SPARQLWrapper.ResultCache.ResultCache>`
     :ivar queryString: The SPARQL query text.
     :vartype queryString: string
     :ivar queryType: The type of SPARQL query (aka SPARQL query form), like :data:`CONSTRUCT`, :data:`SELECT`, :data:`ASK`, :data:`DESCRIBE`, :data:`INSERT`, :data:`DELETE`, :data:`CREATE`, :data:`CLEAR`, :data:`DROP`, :data:`LOAD`, :data:`COPY`, :data:`MOVE` or :data:`ADD` (constants in this module).
@@ -512,14 +540,21 @@ class SPARQLWrapper(object):
     :vartype pattern: :class:`re.RegexObject`, a compiled regular expression. See the :mod:`re` module of Python
     :cvar comments_pattern: regular expression used to remove comments from a query.
     :vartype comments_pattern: :class:`re.RegexObject`, a compiled regular expression. See the :mod:`re` module of Python
+    :cvar projection_pattern: regular expression used to extract the projection of a :data:`SELECT` query (without base/prefixes).
+    :vartype projection_pattern: :class:`re.RegexObject`, a compiled regular expression. See the :mod:`re` module of Python
+    :cvar aggregate_pattern: regular expression used to determine whether a projected expression is an aggregate whose value is always a simple literal.
+    :vartype aggregate_pattern: :class:`re.RegexObject`, a compiled regular expression. See the :mod:`re` module of Python
 
     """
     prefix_pattern = re.compile(r"((?P<base>(\s*BASE\s*<.*?>)\s*)|(?P<prefixes>(\s*PREFIX\s+.+:\s*<.*?>)\s*))*")
     # Maybe the future name could be queryType_pattern
     pattern = re.compile(r"(?P<queryType>(CONSTRUCT|SELECT|ASK|DESCRIBE|INSERT|DELETE|CREATE|CLEAR|DROP|LOAD|COPY|MOVE|ADD))", re.VERBOSE | re.IGNORECASE)
     comments_pattern = re.compile(r"(^|\n)\s*#.*?\n")
+    projection_pattern = re.compile(r"SELECT\s+(?:DISTINCT\s+|REDUCED\s+)?(?P<projection>.*?)\s*(?:FROM\b|WHERE\b|\{)", re.IGNORECASE | re.DOTALL)
+    aggregate_pattern = re.compile(r"\s*(COUNT|SUM|AVG|GROUP_CONCAT)\s*\(", re.IGNORECASE)
 
-    def __init__(self, endpoint, updateEndpoint=None, returnFormat=XML, defaultGraph=None, agent=__agent__):
+    def __init__(self, endpoint, updateEndpoint=None, returnFormat=XML, defaultGraph=None, agent=__agent__, transport=URLLIB, connectionPool=None,
+                 resultCache=None):
         """
         Class encapsulating a full SPARQL call.
 
@@ -535,6 +570,16 @@ class SPARQLWrapper(object):
         :type defaultGraph: string
         :param agent: The User-Agent for the HTTP request header. The **default** value is an autogenerated string using the SPARQLWrapper version number.
         :type agent: string
+        :param transport: The HTTP transport. With :data:`URLLIB` a new connection is opened for every request; with :data:`POOLED` \
+        connections are kept alive and reused, and responses are requested compressed. The **default** value is :data:`URLLIB`.
+        :type transport: string
+        :param connectionPool: The pool used by the :data:`POOLED` transport. It can be shared among several instances. \
+        The **default** value is ``None``, a new pool with the default settings.
+        :type connectionPool: :class:`ConnectionPool<SPARQLWrapper.ConnectionPool.ConnectionPool>`
+        :param resultCache: The cache of query responses. It can be shared among several instances. \
+        The **default** value is ``None``, no caching.
+        :type resultCache: :class:`ResultCache<SPARQLWrapper.ResultCache.ResultCache>`
+        :raises ValueError: If the :attr:`transport` parameter has not one of the valid values: :data:`URLLIB` or :data:`POOLED`.
         """
         self.endpoint = endpoint
         self.updateEndpoint = updateEndpoint if updateEndpoint else endpoint
@@ -546,6 +591,16 @@ class SPARQLWrapper(object):
         self.onlyConneg = False # Only Content Negotiation
         self.customHttpHeaders = {}
 
+        if transport not in _allowedTransports:
+            raise ValueError("Value should be one of %s" % ", ".join(_allowedTransports))
+        self.transport = transport
+        self.connectionPool = connectionPool
+        if self.transport == POOLED and self.connectionPool is None:
+            self.connectionPool = ConnectionPool()
+        self.resultCache = resultCache
+        self.maxURLLength = MAX_URL_LENGTH
+        self.compressionThreshold = None
+
         if returnFormat in _allowedFormats:
             self._defaultReturnFormat = returnFormat
         else:
@@ -852,6 +907,37 @@ class SPARQLWrapper(object):
             warnings.warn("unknown query type '%s'" % r_queryType, RuntimeWarning)
             return SELECT
 
+    def _isAggregateQuery(self):
+        """
+            Internal method to determine whether the query is a :data:`SELECT` query that only projects aggregates whose values
+            are simple literals (``COUNT``, ``SUM``, ``AVG`` and ``GROUP_CONCAT``), e.g. ``SELECT (COUNT(?s) AS ?n) WHERE {...}``.
+
+            :return: ``True`` if all the projected variables are such aggregates.
+            :rtype: bool
+        """
+        if self.queryType != SELECT:
+            return False
+        query = re.sub(self.prefix_pattern, "", self._cleanComments(self.queryString).strip())
+        match = self.projection_pattern.search(query)
+        if not match:
+            return False
+        projection = match.group("projection")
+        depth = 0
+        expressions = 0
+        for i, char in enumerate(projection):
+            if char == "(":
+                if depth == 0:
+                    if not self.aggregate_pattern.match(projection, i + 1):
+                        return False
+                    expressions += 1
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif depth == 0 and not char.isspace():
+                # a plain variable or '*'
+                return False
+        return expressions > 0
+
     def setMethod(self, method):
         """Set the invocation method. By default, this is :data:`GET`, but can be set to :data:`POST`.
 
@@ -861,23 +947,53 @@ class SPARQLWrapper(object):
         if method in _allowedRequests:
             self.method = method
 
-    def setUseKeepAlive(self):
-        """Make :mod:`urllib2` use keep-alive.
+    def setUseKeepAlive(self, connectionPool=None):
+        """Use keep-alive, i.e., switch to the :data:`POOLED` transport.
+
+        .. versionchanged:: 1.8.5
+           The built-in :class:`ConnectionPool<SPARQLWrapper.ConnectionPool.ConnectionPool>` is used instead of the external ``keepalive`` module.
 
-        :raises ImportError: when could not be imported ``keepalive.HTTPHandler``.
+        :param connectionPool: The pool of connections to use. The **default** value is ``None``, the current pool or a new one with the default settings.
+        :type connectionPool: :class:`ConnectionPool<SPARQLWrapper.ConnectionPool.ConnectionPool>`
         """
-        try:
-            from keepalive import HTTPHandler
+        self.transport = POOLED
+        if connectionPool is not None:
+            self.connectionPool = connectionPool
+        elif self.connectionPool is None:
+            self.connectionPool = ConnectionPool()
 
-            if urllib.request._opener and any(isinstance(h, HTTPHandler) for h in urllib.request._opener.handlers):
-                # already installed
-                return
+    def setMaxURLLength(self, maxURLLength):
+        """Set the maximum length of the URL of a :data:`GET` query. Queries whose URL would be longer are sent by
+        :data:`POST` instead, so the method set with :func:`setMethod` is kept for small queries (which can be cached
+        by HTTP caches) and large ones do not fail with :class:`URITooLong<SPARQLWrapper.SPARQLExceptions.URITooLong>`.
 
-            keepalive_handler = HTTPHandler()
-            opener = urllib.request.build_opener(keepalive_handler)
-            urllib.request.install_opener(opener)
-        except ImportError:
-            warnings.warn("keepalive support not available, so the execution of this method has no effect")
+        .. versionadded:: 1.8.5
+
+        :param maxURLLength: The maximum length, or ``None`` to always honour the :data:`GET` method.
+        :type maxURLLength: int
+        """
+        self.maxURLLength = maxURLLength
+
+    def setRequestCompression(self, threshold=COMPRESSION_THRESHOLD):
+        """Compress (``Content-Encoding: gzip``) the bodies of the :data:`POST` requests larger than a threshold.
+        The endpoint (or the server in front of it) must accept compressed requests.
+
+        .. versionadded:: 1.8.5
+
+        :param threshold: The size (in bytes) above which bodies are compressed, or ``None`` to disable the compression. The **default** value is :data:`COMPRESSION_THRESHOLD`.
+        :type threshold: int
+        """
+        self.compressionThreshold = threshold
+
+    def setResultCache(self, resultCache):
+        """Set the cache of query responses, or disable caching with ``None``.
+
+        .. versionadded:: 1.8.5
+
+        :param resultCache: The cache. It can be shared among several instances.
+        :type resultCache: :class:`ResultCache<SPARQLWrapper.ResultCache.ResultCache>`
+        """
+        self.resultCache = resultCache
 
     def isSparqlUpdateRequest(self):
         """ Returns ``True`` if SPARQLWrapper is configured for executing SPARQL Update request.
@@ -1016,7 +1132,12 @@ class SPARQLWrapper(object):
             #protocol details at http://www.w3.org/TR/sparql11-protocol/#query-operation
             uri = self.endpoint
 
-            if self.method == POST:
+            if self.method == GET:
+                url = uri + "?" + self._getRequestEncodedParameters(("query", self.queryString))
+                if self.maxURLLength is None or len(url) <= self.maxURLLength:
+                    request = urllib.request.Request(url)
+
+            if request is None:  # POST, or a GET query too long for the URL
                 if self.requestMethod == POSTDIRECTLY:
                     request = urllib.request.Request(uri + "?" + self._getRequestEncodedParameters())
                     request.add_header("Content-Type", "application/sparql-query")
@@ -1025,8 +1146,12 @@ class SPARQLWrapper(object):
                     request = urllib.request.Request(uri)
                     request.add_header("Content-Type", "application/x-www-form-urlencoded")
                     request.data = self._getRequestEncodedParameters(("query", self.queryString)).encode('ascii')
-            else:  # GET
-                request = urllib.request.Request(uri + "?" + self._getRequestEncodedParameters(("query", self.queryString)))
+
+        if request.data is not None and self.compressionThreshold is not None and len(request.data) > self.compressionThreshold:
+            # gzip.compress would embed the current time: a fixed header keeps equal queries byte-identical
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            request.data = compressor.compress(request.data) + compressor.flush()
+            request.add_header("Content-Encoding", "gzip")
 
         request.add_header("User-Agent", self.agent)
         request.add_header("Accept", self._getAcceptHeader())
@@ -1064,27 +1189,105 @@ class SPARQLWrapper(object):
         :raises EndPointInternalError: If the HTTP return code is ``500``.
         :raises urllib2.HTTPError: If the HTTP return code is different to ``400``, ``401``, ``404``, ``414``, ``500``.
         """
-        request = self._createRequest()
+        return self._openRequest(self._createRequest(), not self.isSparqlUpdateRequest()), self.returnFormat
 
+    def _openRequest(self, request, cacheable=True):
+        """Internal method to send a request built by :meth:`_createRequest`, through the :attr:`resultCache` if it is set.
+        It only reads the settings of the instance, so requests built beforehand can be sent from other threads.
+
+        :param request: The request.
+        :param cacheable: Whether the response can be cached, i.e., the request is a query (not an update).
+        :type cacheable: bool
+        :return: the response.
+        :raises QueryBadFormed: If the HTTP return code is ``400``.
+        :raises Unauthorized: If the HTTP return code is ``401``.
+        :raises EndPointNotFound: If the HTTP return code is ``404``.
+        :raises URITooLong: If the HTTP return code is ``414``.
+        :raises EndPointInternalError: If the HTTP return code is ``500``.
+        :raises urllib2.HTTPError: If the HTTP return code is different to ``400``, ``401``, ``404``, ``414``, ``500``.
+        """
         try:
-            if self.timeout:
-                response = urlopener(request, timeout=self.timeout)
-            else:
-                response = urlopener(request)
-            return response, self.returnFormat
+            if cacheable and self.resultCache is not None:
+                return self._cachedQuery(request)
+            return self._urlopen(request)
         except urllib.error.HTTPError as e:
-            if e.code == 400:
-                raise QueryBadFormed(e.read())
-            elif e.code == 404:
-                raise EndPointNotFound(e.read())
-            elif e.code == 401:
-                raise Unauthorized(e.read())
-            elif e.code == 414:
-                raise URITooLong(e.read())
-            elif e.code == 500:
-                raise EndPointInternalError(e.read())
-            else:
-                raise e
+            raise self._convertHTTPError(e)
+
+    def _urlopen(self, request):
+        """Internal method to send a request with the current transport.
+
+        :raises urllib2.HTTPError: If the HTTP return code is an error.
+        """
+        # DIGEST authentication is done by the urllib opener installed in _createRequest
+        if self.transport == POOLED and not (self.user and self.passwd and self.http_auth == DIGEST):
+            return self.connectionPool.urlopen(request, timeout=self.timeout)
+        elif self.timeout:
+            return urlopener(request, timeout=self.timeout)
+        else:
+            return urlopener(request)
+
+    def _cachedQuery(self, request):
+        """Internal method to answer a query from :attr:`resultCache`. A fresh entry is returned as is; a stale entry
+        is revalidated with a conditional request when the endpoint gave validators (``ETag``, ``Last-Modified``);
+        otherwise the response is fetched, read completely and stored.
+
+        :return: the cached response.
+        :rtype: :class:`CachedResponse<SPARQLWrapper.ResultCache.CachedResponse>`
+        """
+        cache = self.resultCache
+        key = cache.key(request)
+        entry = cache.get(key)
+        if entry is not None and entry.isFresh():
+            cache.count("hits")
+            return CachedResponse(entry)
+
+        if entry is not None:
+            for name, value in entry.validators().items():
+                request.add_header(name, value)
+        try:
+            response = self._urlopen(request)
+            code = response.getcode()
+        except urllib.error.HTTPError as e:
+            # urllib reports 304 Not Modified as an error
+            if e.code != 304 or entry is None:
+                raise
+            response, code = e, 304
+        try:
+            if code == 304 and entry is not None:
+                cache.count("revalidations")
+                cache.refresh(key, entry, response.info().items())
+                return CachedResponse(entry)
+            cache.count("misses")
+            body = response.read()
+            headers = response.info().items()
+            entry = cache.put(key, response.geturl(), code, headers, body)
+            if entry is None:
+                entry = CacheEntry(response.geturl(), code, headers, body, 0)
+            return CachedResponse(entry)
+        finally:
+            response.close()
+
+    def _convertHTTPError(self, e):
+        """Internal method to map an HTTP error to the corresponding SPARQLWrapper exception.
+
+        :param e: The HTTP error.
+        :type e: :class:`urllib2.HTTPError`
+        :return: :class:`QueryBadFormed` (``400``), :class:`Unauthorized` (``401``), :class:`EndPointNotFound` (``404``), \
+        :class:`URITooLong` (``414``), :class:`EndPointInternalError` (``500``) or the error itself for any other code.
+        :rtype: :class:`Exception`
+        """
+        if e.code == 400:
+            return QueryBadFormed(e.read())
+        elif e.code == 404:
+            return EndPointNotFound(e.read())
+        elif e.code == 401:
+            return Unauthorized(e.read())
+        elif e.code == 414:
+            return URITooLong(e.read())
+        elif e.code == 500:
+            return EndPointInternalError(e.read())
+        else:
+            return e
 
     def query(self):
         """
@@ -1114,6 +1317,25 @@ class SPARQLWrapper(object):
         res = self.query()
         return res.convert()
 
+    def queryColumns(self):
+        """Macro like method: issue a :data:`SELECT` query and return the result decoded into columns.
+        The return format is chosen automatically: :data:`CSV`, the most compact one, if the query only projects aggregates
+        whose values are simple literals (e.g. counts); otherwise :data:`TSV`, which keeps unbound values apart from empty strings.
+        The return format set in the instance is not modified.
+
+        .. versionadded:: 1.8.5
+
+        :return: the query result in columns.
+        :rtype: :class:`ColumnarResult<SPARQLWrapper.CSVResults.ColumnarResult>`
+        """
+        returnFormat = self.returnFormat
+        self.returnFormat = CSV if self._isAggregateQuery() else TSV
+        try:
+            res = self.query()
+        finally:
+            self.returnFormat = returnFormat
+        return res.convertColumns()
+
     def __str__(self):
         """This method returns the string representation of a :class:`SPARQLWrapper` object.
 
@@ -1200,10 +1422,33 @@ class QueryResult(object):
         """
         return json.loads(self.response.read().decode("utf-8"))
 
+    def iter_bindings(self, plain=False, variables=None):
+        """
+        Iterate over the bindings of a JSON or XML result while it is read from the response, instead of converting
+        the whole document with :meth:`convert`. Only one binding is kept in memory at a time.
+
+        .. versionadded:: 1.8.5
+
+        :param plain: If ``True``, each binding is a tuple with the plain string values of the variables (``None`` when unbound); \
+        otherwise it is a dictionary like the ones in ``convert()["results"]["bindings"]``. The **default** value is ``False``.
+        :type plain: bool
+        :param variables: The variables (and their order) of the tuples when ``plain`` is ``True``. The **default** value is ``None``, the variables of the result head.
+        :type variables: list
+        :return: iterator over the bindings.
+        :raises ValueError: If the response format is neither :data:`JSON` nor :data:`XML`.
+        """
+        responseFormat = self._get_responseFormat()
+        if responseFormat == JSON:
+            return iter(JSONBindingsReader(self.response, plain=plain, variables=variables))
+        if responseFormat == XML:
+            return iter(XMLBindingsReader(self.response, plain=plain, variables=variables))
+        raise ValueError("Format return was %s, but JSON or XML was expected." % responseFormat)
+
     def _convertXML(self):
         """
         Convert an XML result into a Python dom tree. This method can be overwritten in a
-        subclass for a different conversion method.
+        subclass for a different conversion method. The whole document is kept in memory:
+        use :meth:`iter_bindings` to go through large results.
 
         :return: converted result.
         :rtype: :class:`xml.dom.minidom.Document`
@@ -1259,6 +1504,28 @@ class QueryResult(object):
         """
         return self.response.read()
 
+    def convertColumns(self):
+        """
+        Decode a :data:`CSV`, :data:`TSV` or :data:`JSON` SELECT result into columns: ``array('q')`` for the variables whose
+        values are all integers, lists of plain strings for the rest.
+
+        .. versionadded:: 1.8.5
+
+        :return: the result in columns.
+        :rtype: :class:`ColumnarResult<SPARQLWrapper.CSVResults.ColumnarResult>`
+        :raises ValueError: If the response format is not :data:`CSV`, :data:`TSV` or :data:`JSON`.
+        """
+        responseFormat = self._get_responseFormat()
+        if responseFormat == CSV:
+            return parseCSV(self.response.read())
+        elif responseFormat == TSV:
+            return parseTSV(self.response.read())
+        elif responseFormat == JSON:
+            reader = JSONBindingsReader(self.response, plain=True)
+            rows = list(reader)
+            return columnsFromRows(reader.variables or [], rows)
+        raise ValueError("Format return was %s, but CSV, TSV or JSON was expected." % responseFormat)
+
     def _convertJSONLD(self):
         """
         Convert a RDF JSON-LD result into an RDFLib Graph. This method can be overwritten
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+Incremental reader of `SPARQL Query Results XML <https://www.w3.org/TR/rdf-sparql-XMLres/>`_ documents.
+
+The document is parsed with :func:`xml.etree.ElementTree.iterparse` and every ``result`` element is converted and
+discarded as soon as it has been read, so the memory used does not depend on the number of results (as opposed to
+the :mod:`xml.dom.minidom` tree built by :meth:`QueryResult.convert()<SPARQLWrapper.Wrapper.QueryResult.convert>`).
+
+..
+  Developers involved:
+
+  * Ivan Herman <http://www.ivan-herman.net>
+  * Sergio Fernández <http://www.wikier.org>
+  * Carlos Tejo Alonso <http://www.dayures.net>
+  * Alexey Zakhlestin <https://indeyets.ru/>
+
+  Organizations involved:
+
+  * `World Wide Web Consortium <http://www.w3.org>`_
+  * `Foundation CTIC <http://www.fundacionctic.org/>`_
+
+  :license: `W3C® Software notice and license <http://www.w3.org/Consortium/Legal/copyright-software>`_
+"""
+
+from xml.etree.ElementTree import iterparse
+
+_NS = "{http://www.w3.org/2005/sparql-results#}"
+_HEAD = _NS + "head"
+_VARIABLE = _NS + "variable"
+_LINK = _NS + "link"
+_RESULTS = _NS + "results"
+_RESULT = _NS + "result"
+_BOOLEAN = _NS + "boolean"
+_URI = _NS + "uri"
+_LITERAL = _NS + "literal"
+_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+
+class XMLBindingsReader(object):
+    """
+    Iterator over the bindings of a SPARQL XML results document read from a file-like object. It has the same
+    interface as :class:`JSONBindingsReader<SPARQLWrapper.JSONResults.JSONBindingsReader>`: by default every binding
+    is returned as a dictionary in the form of the JSON results (``{"var": {"type": ..., "value": ...}}``), and with
+    ``plain=True`` as a tuple with the plain string value of every variable (``None`` when unbound).
+
+    :ivar head: The ``head`` of the document (``{"vars": [...], "link": [...]}``), once it has been read.
+    :vartype head: dict
+    :ivar variables: The variables of the projection; the variables of the head unless given.
+    :vartype variables: list
+    :ivar boolean: The result of an ``ASK`` query, once it has been read; otherwise ``None``.
+    :vartype boolean: bool
+    """
+
+    def __init__(self, stream, plain=False, variables=None):
+        """
+        :param stream: The file-like object the document is read from (e.g. an HTTP response).
+        :param plain: Whether the bindings are projected to tuples of plain strings. The **default** value is ``False``.
+        :type plain: bool
+        :param variables: The variables (and their order) of the projection. The **default** value is ``None``, the variables of the head.
+        :type variables: list
+        """
+        self.head = None
+        self.variables = variables
+        self.boolean = None
+        self.plain = plain
+        self._stream = stream
+        self._index = None
+
+    def _term(self, node):
+        """Internal method converting a term element into its JSON results form."""
+        value = node.text or ""
+        if node.tag == _URI:
+            return {"type": "uri", "value": value}
+        if node.tag == _LITERAL:
+            term = {"type": "literal", "value": value}
+            if node.get("datatype") is not None:
+                term["datatype"] = node.get("datatype")
+            elif node.get(_LANG) is not None:
+                term["xml:lang"] = node.get(_LANG)
+            return term
+        return {"type": "bnode", "value": value}
+
+    def _binding(self, result):
+        """Internal method converting a ``result`` element into a dictionary or, if :attr:`plain`, a tuple."""
+        if self.plain:
+            if self._index is None:
+                if self.variables is None:
+                    raise ValueError("the variables are unknown because the results precede the head of the document; set them explicitly")
+                self._index = dict((var, i) for i, var in enumerate(self.variables))
+            values = [None] * len(self._index)
+            for binding in result:
+                i = self._index.get(binding.get("name"))
+                if i is not None and len(binding):
+                    values[i] = binding[0].text or ""
+            return tuple(values)
+        return dict((binding.get("name"), self._term(binding[0])) for binding in result if len(binding))
+
+    def __iter__(self):
+        results = None
+        for event, element in iterparse(self._stream, events=("start", "end")):
+            if event == "start":
+                if element.tag == _RESULTS:
+                    results = element
+                continue
+            if element.tag == _RESULT:
+                row = self._binding(element)
+                # drop the element from the tree so that the memory does not grow with the number of results
+                if results is not None:
+                    results.remove(element)
+                else:
+                    element.clear()
+                yield row
+            elif element.tag == _HEAD:
+                self.head = {
+                    "vars": [variable.get("name") for variable in element.iter(_VARIABLE)],
+                    "link": [link.get("href") for link in element.iter(_LINK)],
+                }
+                if self.variables is None:
+                    self.variables = self.head["vars"]
+            elif element.tag == _BOOLEAN:
+                self.boolean = (element.text or "").strip() == "true"
@@ -36,5 +36,10 @@ from .Wrapper import GET, POST
 from .Wrapper import SELECT, CONSTRUCT, ASK, DESCRIBE, INSERT, DELETE
 from .Wrapper import URLENCODED, POSTDIRECTLY
 from .Wrapper import BASIC, DIGEST
+from .Wrapper import URLLIB, POOLED
+from .ConnectionPool import ConnectionPool
+from .ResultCache import ResultCache
+from .ValuesSplitter import splitValues
 
 from .SmartWrapper import SPARQLWrapper2
+from .AsyncWrapper import AsyncSPARQLWrapper
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests of :class:`AsyncSPARQLWrapper<SPARQLWrapper.AsyncWrapper.AsyncSPARQLWrapper>` against a stub endpoint served by
+:mod:`asyncio` in the event loop of the test.
+"""
+
+import asyncio
+import gzip
+import json
+import unittest
+import urllib.error
+import urllib.parse
+
+from SPARQLWrapper import GET, JSON, POST
+from SPARQLWrapper.AsyncWrapper import AsyncSPARQLWrapper
+from SPARQLWrapper.SPARQLExceptions import EndPointNotFound
+
+
+class StubEndpoint(object):
+    """
+    HTTP/1.1 endpoint answering every query with a JSON result binding ``?query`` to the query received.
+    The path selects the behaviour: ``/sparql``, ``/gzip`` (gzip compressed body), ``/chunked`` (chunked body),
+    ``/redirect`` (303 to ``/sparql``), ``/drop`` (the connection is closed without an answer, as by an endpoint that
+    ran the request and then went away) and anything else (404). ``delay`` seconds are waited before every answer.
+    """
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.connections = 0
+        self.requests = []
+        self.active = 0
+        self.maxActive = 0
+
+    async def start(self, port=0):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def url(self, path="/sparql"):
+        return "http://127.0.0.1:%d%s" % (self.port, path)
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                requestLine = await reader.readline()
+                if not requestLine:
+                    break
+                method, target, version = requestLine.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, value = line.decode("latin-1").split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests.append((method, target, body))
+                self.active += 1
+                self.maxActive = max(self.maxActive, self.active)
+                await asyncio.sleep(self.delay)
+                self.active -= 1
+                if target.startswith("/drop"):
+                    break
+                writer.write(self.respond(method, target, body))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def respond(self, method, target, body):
+        path, _, query = target.partition("?")
+        if path == "/redirect":
+            return b"HTTP/1.1 303 See Other\r\nLocation: /sparql?" + query.encode("latin-1") + b"\r\nContent-Length: 0\r\n\r\n"
+        if path not in ("/sparql", "/gzip", "/chunked"):
+            return b"HTTP/1.1 404 Not Found\r\nContent-Length: 9\r\n\r\nNot found"
+        form = urllib.parse.parse_qs(body.decode("utf-8") if method == "POST" else query)
+        result = {"head": {"vars": ["query"]},
+                  "results": {"bindings": [{"query": {"type": "literal", "value": form["query"][0]}}]}}
+        content = json.dumps(result).encode("utf-8")
+        head = "HTTP/1.1 200 OK\r\nContent-Type: application/sparql-results+json\r\n"
+        if path == "/gzip":
+            content = gzip.compress(content)
+            head += "Content-Encoding: gzip\r\n"
+        if path == "/chunked":
+            half = len(content) // 2
+            chunks = b"".join(b"%x\r\n%s\r\n" % (len(part), part) for part in (content[:half], content[half:]))
+            return (head + "Transfer-Encoding: chunked\r\n\r\n").encode("latin-1") + chunks + b"0\r\n\r\n"
+        return (head + "Content-Length: %d\r\n\r\n" % len(content)).encode("latin-1") + content
+
+
+def queried(result):
+    return result["results"]["bindings"][0]["query"]["value"]
+
+
+class TestAsyncSPARQLWrapper(unittest.TestCase):
+
+    def run_with(self, endpoint, test):
+        async def main():
+            await endpoint.start(getattr(endpoint, "port", 0))
+            try:
+                return await test()
+            finally:
+                await endpoint.stop()
+        return asyncio.run(main())
+
+    def test_concurrent_queries(self):
+        endpoint = StubEndpoint(delay=0.01)
+        queries = ["SELECT * WHERE { ?s ?p %d }" % i for i in range(200)]
+
+        async def test():
+            sparql = AsyncSPARQLWrapper(endpoint.url(), returnFormat=JSON, maxConnections=20, poolSize=20)
+            pending = []
+            for query in queries:
+                sparql.setQuery(query)
+                pending.append(sparql.queryAndConvert())
+            results = await asyncio.gather(*pending)
+            await sparql.close()
+            return results
+
+        results = self.run_with(endpoint, test)
+        self.assertEqual([queried(result) for result in results], queries)
+        self.assertLessEqual(endpoint.maxActive, 20)
+        # the connections are kept alive and reused
+        self.assertLessEqual(endpoint.connections, 20)
+
+    def test_post_and_encodings(self):
+        endpoint = StubEndpoint()
+        query = "SELECT * WHERE { ?s ?p \"é\" }"
+
+        async def test():
+            results = []
+            for path in ("/sparql", "/gzip", "/chunked", "/redirect"):
+                sparql = AsyncSPARQLWrapper(endpoint.url(path), returnFormat=JSON)
+                sparql.setQuery(query)
+                results.append(await sparql.queryAndConvert())
+                # a 303 after a POST is followed with a GET, without the query
+                if path != "/redirect":
+                    sparql.setMethod(POST)
+                    results.append(await sparql.queryAndConvert())
+                await sparql.close()
+            return results
+
+        results = self.run_with(endpoint, test)
+        self.assertEqual([queried(result) for result in results], [query] * 7)
+        self.assertIn("POST", [method for method, target, body in endpoint.requests])
+
+    def test_not_found(self):
+        endpoint = StubEndpoint()
+
+        async def test():
+            sparql = AsyncSPARQLWrapper(endpoint.url("/missing"), returnFormat=JSON)
+            sparql.setQuery("ASK {}")
+            try:
+                await sparql.query()
+            finally:
+                await sparql.close()
+
+        self.assertRaises(EndPointNotFound, self.run_with, endpoint, test)
+
+    def test_update_not_resent(self):
+        endpoint = StubEndpoint()
+
+        async def test(method):
+            sparql = AsyncSPARQLWrapper(endpoint.url(), returnFormat=JSON)
+            sparql.setMethod(method)
+            sparql.setQuery("ASK {}")
+            # the next request goes on the connection kept alive by this one
+            await sparql.query()
+            sparql.endpoint = endpoint.url("/drop")
+            try:
+                await sparql.query()
+            finally:
+                await sparql.close()
+
+        def sent(method):
+            return [target for m, target, body in endpoint.requests if m == method and target.startswith("/drop")]
+
+        # a POST may have been run by the endpoint: it is sent once
+        self.assertRaises(urllib.error.URLError, self.run_with, endpoint, lambda: test(POST))
+        self.assertEqual(len(sent("POST")), 1)
+        # a GET that failed on a reused connection is sent again on a new one
+        self.assertRaises(urllib.error.URLError, self.run_with, endpoint, lambda: test(GET))
+        self.assertEqual(len(sent("GET")), 2)
+
+    def test_several_event_loops(self):
+        endpoint = StubEndpoint(delay=0.01)
+        sparql = AsyncSPARQLWrapper("http://127.0.0.1/", returnFormat=JSON, maxConnections=2)
+
+        async def test():
+            sparql.endpoint = endpoint.url()
+            pending = []
+            for i in range(10):
+                sparql.setQuery("ASK { ?s ?p %d }" % i)
+                pending.append(sparql.queryAndConvert())
+            return await asyncio.gather(*pending)
+
+        # the semaphore and the idle connections of the first loop must not be used in the second one
+        for run in range(2):
+            results = self.run_with(endpoint, test)
+            self.assertEqual(len(results), 10)
+            self.assertLessEqual(endpoint.maxActive, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -132,6 +132,12 @@ register(
 register(
     'IOMemory', Store,
     'rdflib.plugins.memory', 'IOMemory')
+register(
+    'CompactMemory', Store,
+    'rdflib.plugins.compactmemory', 'CompactMemory')
+register(
+    'MappedStore', Store,
+    'rdflib.plugins.mappedstore', 'MappedStore')
 register(
     'Auditable', Store,
     'rdflib.plugins.stores.auditable', 'AuditableStore')
@@ -215,13 +221,13 @@ register(
     'rdflib.plugins.parsers.notation3', 'N3Parser')
 register(
     'text/turtle', Parser,
-    'rdflib.plugins.parsers.notation3', 'TurtleParser')
+    'rdflib.plugins.parsers.turtle', 'TurtleParser')
 register(
     'turtle', Parser,
-    'rdflib.plugins.parsers.notation3', 'TurtleParser')
+    'rdflib.plugins.parsers.turtle', 'TurtleParser')
 register(
     'ttl', Parser,
-    'rdflib.plugins.parsers.notation3', 'TurtleParser')
+    'rdflib.plugins.parsers.turtle', 'TurtleParser')
 register(
     'application/n-triples', Parser,
     'rdflib.plugins.parsers.nt', 'NTParser')
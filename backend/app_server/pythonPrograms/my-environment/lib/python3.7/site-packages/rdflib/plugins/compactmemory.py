@@ -0,0 +1,355 @@
+"""
+A compact, array-backed, context-aware in-memory store.
+
+Triples are dictionary-encoded as in :class:`~rdflib.plugins.memory.IOMemory`,
+but instead of dicts of sets of tuples, the encoded quads (subject,
+predicate, object, context) are kept in three sorted ``array('q')``
+permutations -- SPOC, POSC and OSPC -- i.e. 3 x 4 x 8 = 96 bytes per quad,
+plus the dictionary of distinct nodes. Triple patterns are answered with
+binary-search range scans over the permutation whose prefix is bound.
+
+New and removed quads are buffered and merged into the sorted arrays when
+the buffers grow (relative to the size of the store), or before a read if
+they hold more than READ_MERGE quads, so loads are amortized and reads
+interleaved with a few updates stay cheap. The store is best suited to
+load-then-query workloads, like validating a large catalog.
+"""
+
+from array import array
+from bisect import bisect_left
+from heapq import merge
+from itertools import chain, groupby
+from collections import Counter
+
+from rdflib.store import Store
+
+__all__ = ['CompactMemory']
+
+# buffered quads above which a read merges the buffers first
+READ_MERGE = 1024
+# buffered quads above which an add merges, at least (the threshold also
+# grows with the size of the store, so merges stay amortized)
+WRITE_MERGE = 65536
+
+
+def _spoc(q):
+    return q
+
+
+def _posc(q):
+    return (q[1], q[2], q[0], q[3])
+
+
+def _ospc(q):
+    return (q[2], q[0], q[1], q[3])
+
+
+def _from_posc(r):
+    return (r[2], r[0], r[1], r[3])
+
+
+def _from_ospc(r):
+    return (r[1], r[2], r[0], r[3])
+
+
+class _Rows(object):
+    """a read-only sequence view of the quads of a permutation array,
+    for bisect"""
+
+    def __init__(self, quads):
+        self.quads = quads
+
+    def __len__(self):
+        return len(self.quads) // 4
+
+    def __getitem__(self, i):
+        return tuple(self.quads[4 * i:4 * i + 4])
+
+
+class _Permutation(object):
+    """one sorted permutation of the quads"""
+
+    def __init__(self, to_key, from_key):
+        self.to_key = to_key
+        self.from_key = from_key
+        self.quads = array('q')
+
+    def scan(self, prefix):
+        """return an iterator over the (permuted) quads starting with
+        prefix"""
+        quads = self.quads
+        if not prefix:
+            return zip(*[iter(quads)] * 4)
+        rows = _Rows(quads)
+        upper = prefix[:-1] + (prefix[-1] + 1,)
+        lo = bisect_left(rows, prefix)
+        hi = bisect_left(rows, upper, lo)
+        return zip(*[iter(quads[4 * lo:4 * hi])] * 4)
+
+    def __contains__(self, key):
+        rows = _Rows(self.quads)
+        i = bisect_left(rows, key)
+        return i < len(rows) and rows[i] == key
+
+    def merge(self, added, removed):
+        """merge the added quads and drop the removed ones, both given in
+        SPOC order"""
+        key = self.to_key
+        rows = zip(*[iter(self.quads)] * 4)
+        if removed:
+            removed = set(key(q) for q in removed)
+            rows = (r for r in rows if r not in removed)
+        rows = merge(rows, sorted(key(q) for q in added))
+        # duplicates are adjacent once merged
+        self.quads = array(
+            'q', chain.from_iterable(r for r, _ in groupby(rows)))
+
+
+class CompactMemory(Store):
+    """\
+    An array-backed context-aware in-memory store, see the module
+    documentation. It is registered as the 'CompactMemory' store plugin::
+
+        g = Graph('CompactMemory')
+
+    Quoted (formula) triples are not supported: the store declares itself
+    formula aware because the Turtle/N3 parser requires it, but adding a
+    quoted triple (only N3 formulae produce them) raises
+    NotImplementedError.
+    """
+    context_aware = True
+    formula_aware = True
+    graph_aware = True
+
+    # The variable name conventions of IOMemory are used, plus:
+    #
+    # quad = (sid, pid, oid, cid)            encoded quad, in SPOC order
+    # row                                    encoded quad in the order of
+    #                                        a permutation
+
+    def __init__(self, configuration=None, identifier=None):
+        super(CompactMemory, self).__init__(configuration)
+        self.identifier = identifier
+        self.__namespace = {}
+        self.__prefix = {}
+
+        # dense integer keys; 0 is the None context
+        self.__obj2int = {None: 0}
+        self.__int2obj = [None]
+
+        self.__spoc = _Permutation(_spoc, _spoc)
+        self.__posc = _Permutation(_posc, _from_posc)
+        self.__ospc = _Permutation(_ospc, _from_ospc)
+
+        # buffered changes, as SPOC quads
+        self.__added = set()
+        self.__removed = set()
+
+        # all contexts used in store (unencoded)
+        self.__all_contexts = set()
+        # cached counts of triples, by cid (None: distinct triples)
+        self.__counts = None
+
+    def bind(self, prefix, namespace):
+        self.__prefix[namespace] = prefix
+        self.__namespace[prefix] = namespace
+
+    def namespace(self, prefix):
+        return self.__namespace.get(prefix, None)
+
+    def prefix(self, namespace):
+        return self.__prefix.get(namespace, None)
+
+    def namespaces(self):
+        for prefix, namespace in self.__namespace.items():
+            yield prefix, namespace
+
+    def add(self, triple, context, quoted=False):
+        Store.add(self, triple, context, quoted)
+        if quoted:
+            raise NotImplementedError(
+                "CompactMemory does not support quoted triples")
+        quad = self.__encodeQuad(triple, context)
+        self.__removed.discard(quad)
+        self.__added.add(quad)
+        self.__counts = None
+        self.__maybe_merge()
+
+    def addN(self, quads):
+        """bulk load: the quads are only buffered, and merged when the
+        buffer is large enough"""
+        encode = self.__encodeQuad
+        added = self.__added
+        removed = self.__removed
+        for subject, predicate, object_, context in quads:
+            quad = encode((subject, predicate, object_), context)
+            if removed:
+                removed.discard(quad)
+            added.add(quad)
+        self.__counts = None
+        self.__maybe_merge()
+
+    def remove(self, triplepat, context=None):
+        quads = list(self.__match(triplepat, context))
+        for quad in quads:
+            self.__added.discard(quad)
+            self.__removed.add(quad)
+        if quads:
+            self.__counts = None
+        self.__maybe_merge()
+
+        if triplepat == (None, None, None) and \
+                context in self.__all_contexts and \
+                not self.graph_aware:
+            # remove the whole context
+            self.__all_contexts.remove(context)
+
+    def triples(self, triplein, context=None):
+        if context is not None:
+            if context == self:
+                context = None
+        return self.__triples(self.__match(triplein, context, union=True),
+                              context)
+
+    def __triples(self, quads, context):
+        """group the quads of each triple and decode them"""
+        int2obj = self.__int2obj
+        for enctriple, group in groupby(quads, key=lambda q: q[:3]):
+            cids = [q[3] for q in group]
+            triple = (int2obj[enctriple[0]], int2obj[enctriple[1]],
+                      int2obj[enctriple[2]])
+            yield triple, (int2obj[cid] for cid in cids if cid)
+
+    def __match(self, triplein, context, union=False):
+        """return an iterator over the quads matching a pattern; in union
+        mode (for triples()), all the quads of the matching triples are
+        returned, adjacent, to report their contexts"""
+        obj2int = self.__obj2int
+        if context not in obj2int:
+            return iter(())
+        cid = obj2int[context]
+        subject, predicate, object_ = triplein
+        try:
+            sid = obj2int[subject] if subject is not None else None
+            pid = obj2int[predicate] if predicate is not None else None
+            oid = obj2int[object_] if object_ is not None else None
+        except KeyError:
+            # a node unknown to the store cannot match anything
+            return iter(())
+
+        if len(self.__added) + len(self.__removed) > READ_MERGE:
+            self.__merge()
+
+        if sid is not None:
+            if oid is not None and pid is None:
+                perm, prefix = self.__ospc, (oid, sid)
+            else:
+                perm = self.__spoc
+                prefix = (sid,) if pid is None else \
+                    (sid, pid) if oid is None else (sid, pid, oid)
+        elif pid is not None:
+            perm = self.__posc
+            prefix = (pid,) if oid is None else (pid, oid)
+        elif oid is not None:
+            perm, prefix = self.__ospc, (oid,)
+        else:
+            perm, prefix = self.__spoc, ()
+
+        quads = perm.scan(prefix)
+        if perm is not self.__spoc:
+            quads = (perm.from_key(r) for r in quads)
+        if self.__removed:
+            removed = frozenset(self.__removed)
+            quads = (q for q in quads if q not in removed)
+        if self.__added:
+            # the few buffered quads are matched linearly, and kept in the
+            # order of the permutation so that the quads of a triple stay
+            # adjacent
+            spoc = self.__spoc
+            key = perm.to_key
+            added = sorted(
+                (q for q in self.__added
+                 if (sid is None or q[0] == sid) and
+                 (pid is None or q[1] == pid) and
+                 (oid is None or q[2] == oid) and q not in spoc),
+                key=key)
+            if added:
+                quads = (perm.from_key(r) for r in merge(
+                    (key(q) for q in quads), (key(q) for q in added)))
+
+        if cid:
+            if union:
+                quads = self.__in_context(quads, cid)
+            else:
+                quads = (q for q in quads if q[3] == cid)
+        return quads
+
+    def __in_context(self, quads, cid):
+        """keep the quads of the triples in the context cid"""
+        for enctriple, group in groupby(quads, key=lambda q: q[:3]):
+            group = list(group)
+            if any(q[3] == cid for q in group):
+                for q in group:
+                    yield q
+
+    def contexts(self, triple=None):
+        if triple is None or triple == (None, None, None):
+            return (context for context in self.__all_contexts)
+        for triple, contexts in self.triples(triple):
+            return contexts
+        return iter(())
+
+    def __len__(self, context=None):
+        if context not in self.__obj2int:
+            return 0
+        self.__merge()
+        if self.__counts is None:
+            quads = self.__spoc.quads
+            counts = Counter(quads[3::4])
+            counts[None] = sum(1 for _ in groupby(
+                zip(quads[0::4], quads[1::4], quads[2::4])))
+            self.__counts = counts
+        cid = self.__obj2int[context]
+        return self.__counts[cid or None]
+
+    def add_graph(self, graph):
+        self.__all_contexts.add(graph)
+
+    def remove_graph(self, graph):
+        self.remove((None, None, None), graph)
+        self.__all_contexts.discard(graph)
+
+    def __encodeQuad(self, triple, context):
+        """encode a triple and its context, storing new nodes"""
+        obj2int = self.__obj2int
+        int2obj = self.__int2obj
+        quad = []
+        for obj in (triple[0], triple[1], triple[2], context):
+            try:
+                quad.append(obj2int[obj])
+            except KeyError:
+                obj2int[obj] = len(int2obj)
+                quad.append(len(int2obj))
+                int2obj.append(obj)
+        if context is not None:
+            self.__all_contexts.add(context)
+        return tuple(quad)
+
+    def __maybe_merge(self):
+        """merge if the buffers are large, relative to the store (a quarter
+        of the quads), so that every quad is merged a bounded number of
+        times on average"""
+        if len(self.__added) + len(self.__removed) > \
+                max(WRITE_MERGE, len(self.__spoc.quads) // 16):
+            self.__merge()
+
+    def __merge(self):
+        """merge the buffered changes into the sorted permutations"""
+        if not self.__added and not self.__removed:
+            return
+        added, removed = self.__added, self.__removed
+        for perm in (self.__spoc, self.__posc, self.__ospc):
+            perm.merge(added, removed)
+        self.__added = set()
+        self.__removed = set()
+        self.__counts = None
@@ -0,0 +1,450 @@
+"""
+A read-only store backed by memory-mapped files.
+
+A store is a directory built once, with :func:`build` or
+:func:`build_ntriples`, holding:
+
+* ``terms`` and ``offsets``: the dictionary of the distinct nodes, each
+  encoded as bytes, sorted, so the id of a node is its rank and a node is
+  looked up by binary search; ``offsets`` is an ``array('q')`` of the
+  start of every node in ``terms`` (plus the end of the last one),
+* ``spo``, ``pos`` and ``osp``: the triples, as ids, in three sorted
+  ``array('q')`` permutations (3 x 8 bytes per triple each),
+* ``meta.json``: the counts, the byte order and the namespace bindings.
+
+Opening a store only maps the files, so it takes milliseconds whatever
+the size of the graph, and the pages are loaded on demand. The mappings
+are read-only, so all the processes that open the same store share one
+copy of it in the page cache::
+
+    build_ntriples('catalog.store', 'catalog.nt')
+    ...
+    g = Graph('MappedStore')
+    g.open('catalog.store')
+
+The store has no contexts and cannot be modified: a changed graph is
+rebuilt into a new directory.
+"""
+
+import json
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left
+
+from rdflib.store import Store, NO_STORE, VALID_STORE
+from rdflib.term import URIRef, BNode, Literal
+
+__all__ = ['MappedStore', 'build', 'build_ntriples']
+
+FORMAT_VERSION = 1
+# number of decoded nodes kept by an open store
+TERM_CACHE = 65536
+
+_URIREF = b'U'
+_BNODE = b'B'
+_LITERAL = b'L'
+
+
+def _encode(node):
+    """encode a node as the bytes of the dictionary; literals are
+    'L' + language + NUL + datatype + NUL + lexical form"""
+    if isinstance(node, Literal):
+        return b''.join((_LITERAL, (node.language or '').encode('utf-8'),
+                         b'\0', (node.datatype or '').encode('utf-8'),
+                         b'\0', str(node).encode('utf-8')))
+    if isinstance(node, URIRef):
+        return _URIREF + node.encode('utf-8')
+    if isinstance(node, BNode):
+        return _BNODE + node.encode('utf-8')
+    raise TypeError("MappedStore cannot store %r" % (node,))
+
+
+def _decode(data):
+    kind = data[:1]
+    if kind == _URIREF:
+        return URIRef(data[1:].decode('utf-8'))
+    if kind == _BNODE:
+        return BNode(data[1:].decode('utf-8'))
+    language, datatype, lexical = data[1:].split(b'\0', 2)
+    return Literal(lexical.decode('utf-8'),
+                   lang=language.decode('utf-8') or None,
+                   datatype=datatype and URIRef(datatype.decode('utf-8')) or
+                   None)
+
+
+def _ntriples(data, ascii):
+    """the N-Triples form of an encoded node, as bytes"""
+    kind = data[:1]
+    if kind == _URIREF:
+        text = b'<' + data[1:] + b'>'
+    elif kind == _BNODE:
+        text = b'_:' + data[1:]
+    else:
+        language, datatype, lexical = data[1:].split(b'\0', 2)
+        text = b'"' + lexical.replace(b'\\', b'\\\\')\
+            .replace(b'\n', b'\\n')\
+            .replace(b'"', b'\\"')\
+            .replace(b'\r', b'\\r') + b'"'
+        if language:
+            text += b'@' + language
+        elif datatype:
+            text += b'^^<' + datatype + b'>'
+    if ascii and not text.isascii():
+        text = text.decode('utf-8').encode('ascii', '_rdflib_nt_escape')
+    return text
+
+
+def _write_array(path, values):
+    with open(path, 'wb') as f:
+        values.tofile(f)
+
+
+def build(path, triples, namespaces=()):
+    """\
+    Build a store in the directory path (created if needed) from an
+    iterable of triples, e.g. a Graph. Duplicate triples are dropped.
+
+    namespaces is an iterable of (prefix, namespace) bindings saved with
+    the store, e.g. graph.namespaces().
+
+    The build is done in memory: it holds a dict of all the distinct
+    nodes and the ids of all the triples (then their sorted permutations),
+    so the graph must fit in memory; only the opened store does not.
+    """
+    obj2int = {}
+    rows = array('q')
+    for triple in triples:
+        for node in triple:
+            try:
+                rows.append(obj2int[node])
+            except KeyError:
+                obj2int[node] = len(obj2int)
+                rows.append(len(obj2int) - 1)
+
+    # the ids of the store are the ranks of the encoded nodes
+    encoded = sorted((_encode(node), i) for node, i in obj2int.items())
+    del obj2int
+    rank = array('q', [0]) * len(encoded)
+    offsets = array('q', [0])
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    with open(os.path.join(path, 'terms'), 'wb') as f:
+        for id_, (data, i) in enumerate(encoded):
+            rank[i] = id_
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+    del encoded
+    _write_array(os.path.join(path, 'offsets'), offsets)
+
+    spo = sorted(set(zip(*[(rank[i] for i in rows)] * 3)))
+    del rows
+    for name, key in (('spo', None),
+                      ('pos', lambda t: (t[1], t[2], t[0])),
+                      ('osp', lambda t: (t[2], t[0], t[1]))):
+        permuted = spo if key is None else sorted(key(t) for t in spo)
+        _write_array(os.path.join(path, name),
+                     array('q', (id_ for t in permuted for id_ in t)))
+
+    # written last: a directory without it is not a (complete) store
+    meta = {'version': FORMAT_VERSION,
+            'byteorder': sys.byteorder,
+            'terms': len(rank),
+            'triples': len(spo),
+            'namespaces': dict((prefix, str(namespace))
+                               for prefix, namespace in namespaces)}
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+
+class _Triples(object):
+    """sink of the N-Triples parser"""
+
+    def __init__(self):
+        self.collected = []
+
+    def triple(self, s, p, o):
+        self.collected.append((s, p, o))
+
+    def triples(self, triples):
+        self.collected.extend(triples)
+
+
+def build_ntriples(path, source):
+    """\
+    Build a store in the directory path from an N-Triples file (a file
+    name or a binary file object).
+    """
+    from rdflib.plugins.parsers.ntriples import NTriplesParser
+    sink = _Triples()
+    if hasattr(source, 'read'):
+        NTriplesParser(sink).parse(source)
+    else:
+        with open(source, 'rb') as f:
+            NTriplesParser(sink).parse(f)
+    build(path, sink.collected)
+
+
+def _map(path):
+    """map a file read-only (empty files cannot be mapped)"""
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _Rows(object):
+    """a read-only sequence view of the triples of a permutation, for
+    bisect"""
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids) // 3
+
+    def __getitem__(self, i):
+        return tuple(self.ids[3 * i:3 * i + 3])
+
+
+class _Terms(object):
+    """a read-only sequence view of the encoded nodes, for bisect"""
+
+    def __init__(self, terms, offsets):
+        self.terms = terms
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.terms[self.offsets[i]:self.offsets[i + 1]]
+
+
+class _Mapping(object):
+    """\
+    The mapped files of an open store. A store closed while scans of its
+    triples are still running keeps its files mapped (slices of the
+    mappings are in use) until the last scan ends.
+    """
+
+    def __init__(self, path):
+        self.maps = []
+        self.views = []
+        self.scans = 0
+        self.closed = False
+        self.terms = _Terms(self.file(path, 'terms', None),
+                            self.file(path, 'offsets', 'q'))
+        self.spo = self.file(path, 'spo', 'q')
+        self.pos = self.file(path, 'pos', 'q')
+        self.osp = self.file(path, 'osp', 'q')
+        self.cache = {}
+
+    def file(self, path, name, typecode):
+        """map a file of the store, as bytes (slices of the mapping are
+        bytes) or as an array of typecode"""
+        mapped = _map(os.path.join(path, name))
+        if mapped is None:
+            return b'' if typecode is None else array(typecode)
+        self.maps.append(mapped)
+        if typecode is None:
+            return mapped
+        view = memoryview(mapped).cast(typecode)
+        self.views.append(view)
+        return view
+
+    def node(self, id_):
+        cache = self.cache
+        try:
+            return cache[id_]
+        except KeyError:
+            if len(cache) >= TERM_CACHE:
+                cache.clear()
+            node = cache[id_] = _decode(self.terms[id_])
+            return node
+
+    def scan(self, rows, prefix):
+        """iterate over the rows of a permutation starting with prefix"""
+        self.scans += 1
+        try:
+            if prefix:
+                view = _Rows(rows)
+                upper = prefix[:-1] + (prefix[-1] + 1,)
+                lo = bisect_left(view, prefix)
+                hi = bisect_left(view, upper, lo)
+                rows = rows[3 * lo:3 * hi]
+            for row in zip(*[iter(rows)] * 3):
+                yield row
+        finally:
+            rows = None
+            self.scans -= 1
+            if self.closed and not self.scans:
+                self.unmap()
+
+    def close(self):
+        self.closed = True
+        if not self.scans:
+            self.unmap()
+
+    def unmap(self):
+        self.terms = self.spo = self.pos = self.osp = None
+        self.cache = {}
+        # the views must be released before their mappings are closed
+        for view in self.views:
+            view.release()
+        for mapped in self.maps:
+            mapped.close()
+        self.views = []
+        self.maps = []
+
+
+class MappedStore(Store):
+    """\
+    A read-only store of a directory built by :func:`build`, see the module
+    documentation. It is registered as the 'MappedStore' store plugin.
+    """
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(self, configuration=None, identifier=None):
+        self.__open = False
+        self.identifier = identifier
+        self.__namespace = {}
+        self.__prefix = {}
+        super(MappedStore, self).__init__(configuration)
+
+    def open(self, path, create=False):
+        if self.__open:
+            self.close()
+        meta_path = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_path):
+            if not create:
+                return NO_STORE
+            build(path, ())
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError("unsupported MappedStore format version %s"
+                             % meta['version'])
+        if meta['byteorder'] != sys.byteorder:
+            raise ValueError("MappedStore built with another byte order")
+
+        self.__mapping = _Mapping(path)
+        self.__len = meta['triples']
+        for prefix, namespace in meta['namespaces'].items():
+            self.bind(prefix, URIRef(namespace))
+        self.__open = True
+        return VALID_STORE
+
+    def close(self, commit_pending_transaction=False):
+        if not self.__open:
+            return
+        self.__open = False
+        # the files stay mapped while scans are running, see _Mapping
+        self.__mapping.close()
+        self.__mapping = None
+
+    def is_open(self):
+        return self.__open
+
+    def bind(self, prefix, namespace):
+        self.__prefix[namespace] = prefix
+        self.__namespace[prefix] = namespace
+
+    def namespace(self, prefix):
+        return self.__namespace.get(prefix, None)
+
+    def prefix(self, namespace):
+        return self.__prefix.get(namespace, None)
+
+    def namespaces(self):
+        for prefix, namespace in self.__namespace.items():
+            yield prefix, namespace
+
+    def add(self, triple, context=None, quoted=False):
+        raise TypeError('The MappedStore is read only')
+
+    def addN(self, quads):
+        raise TypeError('The MappedStore is read only')
+
+    def remove(self, triple, context=None):
+        raise TypeError('The MappedStore is read only')
+
+    def triples(self, triplein, context=None):
+        mapping = self.__mapping
+        ids = []
+        for node in triplein:
+            if node is None:
+                ids.append(None)
+                continue
+            id_ = self.__lookup(mapping, node)
+            if id_ is None:
+                # a node unknown to the store cannot match anything
+                return
+            ids.append(id_)
+        sid, pid, oid = ids
+
+        if sid is not None:
+            if oid is not None and pid is None:
+                rows, prefix, order = mapping.osp, (oid, sid), (1, 2, 0)
+            else:
+                rows, order = mapping.spo, (0, 1, 2)
+                prefix = (sid,) if pid is None else \
+                    (sid, pid) if oid is None else (sid, pid, oid)
+        elif pid is not None:
+            rows, order = mapping.pos, (2, 0, 1)
+            prefix = (pid,) if oid is None else (pid, oid)
+        elif oid is not None:
+            rows, prefix, order = mapping.osp, (oid,), (1, 2, 0)
+        else:
+            rows, prefix, order = mapping.spo, (), (0, 1, 2)
+
+        node = mapping.node
+        s, p, o = order
+        for row in mapping.scan(rows, prefix):
+            yield (node(row[s]), node(row[p]), node(row[o])), iter(())
+
+    def __lookup(self, mapping, node):
+        """the id of a node, or None if it is not in the store"""
+        try:
+            data = _encode(node)
+        except TypeError:
+            return None
+        terms = mapping.terms
+        i = bisect_left(terms, data)
+        if i < len(terms) and terms[i] == data:
+            return i
+        return None
+
+    def __len__(self, context=None):
+        return self.__len
+
+    def ntriples_lines(self, ascii=False):
+        """\
+        The N-Triples lines (bytes) of the triples, in spo order, made from
+        the encoded nodes without decoding them; used by the N-Triples
+        serializer. The non-ASCII characters are escaped if ascii is true.
+        """
+        # registers the _rdflib_nt_escape error handler
+        import rdflib.plugins.serializers.nt
+        mapping = self.__mapping
+        terms = mapping.terms
+        cache = {}
+
+        def term(id_):
+            try:
+                return cache[id_]
+            except KeyError:
+                if len(cache) >= TERM_CACHE:
+                    cache.clear()
+                data = cache[id_] = _ntriples(terms[id_], ascii)
+                return data
+
+        for s, p, o in mapping.scan(mapping.spo, ()):
+            yield b' '.join((term(s), term(p), term(o), b'.\n'))
+
+    def contexts(self, triple=None):
+        return iter(())
@@ -5,6 +5,10 @@ __all__ = ['Memory', 'IOMemory']
 
 ANY = Any = None
 
+# IOMemory index sets up to this size are copied for queries, larger ones
+# are iterated in place
+SMALL_SET = 64
+
 
 class Memory(Store):
     """\
@@ -177,16 +181,20 @@ class IOMemory(Store):
     Memory usage is low due to several optimizations. RDF nodes are not
     stored directly in the indices; instead, the indices hold integer keys
     and the actual nodes are only stored once in int-to-object and
-    object-to-int mapping dictionaries. A default context is determined
+    object-to-int mapping dictionaries. Keys are assigned sequentially as
+    nodes are added; looking up triples only reads the mappings, so
+    querying for nodes that are not in the store does not grow them.
+    A default context is determined
     based on the first triple that is added to the store, and no context
     information is actually stored for subsequent other triples with the
     same context information.
 
-    Most operations should be quite fast, but a triples() query with two
-    bound parts requires a set intersection operation, which may be slow in
-    some cases. When multiple contexts are used in the same store, filtering
-    based on context has to be done after each query, which may also be
-    slow.
+    Most operations should be quite fast. A triples() query with two bound
+    parts scans the smaller of the two index sets, checking the other part
+    on each triple. Sets are not copied for queries: a set changed while a
+    query iterates it is copied at that point (copy-on-write). When multiple
+    contexts are used in the same store, filtering based on context has to
+    be done after each query, which may be slow.
 
     """
     context_aware = True
@@ -213,6 +221,7 @@ class IOMemory(Store):
         # it easy to test for it in either encoded or unencoded form.
         self.__int2obj = {None: None}  # maps integer keys to objects
         self.__obj2int = {None: None}  # maps objects to integer keys
+        self.__nextid = 1  # next (dense, sequential) integer key
 
         # Indexes for each triple part, and a list of contexts for each triple
         self.__subjectIndex = {}    # key: sid    val: set(enctriples)
@@ -227,6 +236,12 @@ class IOMemory(Store):
         # default context information for triples
         self.__defaultContexts = None
 
+        # Index sets being iterated by triples() generators: id(set) ->
+        # number of generators. Instead of copying sets for every query,
+        # a set that is changed while it is iterated is replaced by a copy
+        # in its index (copy-on-write), so iterators see a snapshot.
+        self.__readers = {}
+
     def bind(self, prefix, namespace):
         self.__prefix[namespace] = prefix
         self.__namespace[prefix] = namespace
@@ -253,22 +268,22 @@ class IOMemory(Store):
         self.__addTripleContext(enctriple, context, quoted)
 
         if sid in self.__subjectIndex:
-            self.__subjectIndex[sid].add(enctriple)
+            self.__writable(self.__subjectIndex, sid).add(enctriple)
         else:
             self.__subjectIndex[sid] = set([enctriple])
 
         if pid in self.__predicateIndex:
-            self.__predicateIndex[pid].add(enctriple)
+            self.__writable(self.__predicateIndex, pid).add(enctriple)
         else:
             self.__predicateIndex[pid] = set([enctriple])
 
         if oid in self.__objectIndex:
-            self.__objectIndex[oid].add(enctriple)
+            self.__writable(self.__objectIndex, oid).add(enctriple)
         else:
             self.__objectIndex[oid] = set([enctriple])
 
     def remove(self, triplepat, context=None):
-        req_cid = self.__obj2id(context)
+        req_cid = self.__obj2int.get(context)
         for triple, contexts in self.triples(triplepat, context):
             enctriple = self.__encodeTriple(triple)
             for cid in self.__getTripleContexts(enctriple):
@@ -281,9 +296,9 @@ class IOMemory(Store):
             if len(self.__getTripleContexts(enctriple)) == 0:
                 # triple has been removed from all contexts
                 sid, pid, oid = enctriple
-                self.__subjectIndex[sid].remove(enctriple)
-                self.__predicateIndex[pid].remove(enctriple)
-                self.__objectIndex[oid].remove(enctriple)
+                self.__writable(self.__subjectIndex, sid).remove(enctriple)
+                self.__writable(self.__predicateIndex, pid).remove(enctriple)
+                self.__writable(self.__objectIndex, oid).remove(enctriple)
 
                 del self.__tripleContexts[enctriple]
 
@@ -305,8 +320,13 @@ class IOMemory(Store):
             if context == self:  # hmm...does this really ever happen?
                 context = None
 
-        cid = self.__obj2id(context)
-        enctriple = self.__encodeTriple(triplein)
+        # nodes unknown to the store cannot match anything
+        if context not in self.__obj2int:
+            return self.__emptygen()
+        cid = self.__obj2int[context]
+        enctriple = self.__lookupTriple(triplein)
+        if enctriple is None:
+            return self.__emptygen()
         sid, pid, oid = enctriple
 
         # all triples case (no triple parts given as pattern)
@@ -324,27 +344,27 @@ class IOMemory(Store):
 
         # remaining cases: one or two out of three given
         sets = []
-        if sid is not None:
-            if sid in self.__subjectIndex:
-                sets.append(self.__subjectIndex[sid])
-            else:
-                return self.__emptygen()
-        if pid is not None:
-            if pid in self.__predicateIndex:
-                sets.append(self.__predicateIndex[pid])
-            else:
-                return self.__emptygen()
-        if oid is not None:
-            if oid in self.__objectIndex:
-                sets.append(self.__objectIndex[oid])
-            else:
-                return self.__emptygen()
-
-        # to get the result, do an intersection of the sets (if necessary)
-        if len(sets) > 1:
-            enctriples = sets[0].intersection(*sets[1:])
+        for index, pos, id in ((self.__subjectIndex, 0, sid),
+                               (self.__predicateIndex, 1, pid),
+                               (self.__objectIndex, 2, oid)):
+            if id is not None:
+                if id in index:
+                    sets.append((len(index[id]), pos, id, index[id]))
+                else:
+                    return self.__emptygen()
+
+        # scan the smallest set; instead of intersecting it with the other
+        # one, check the other given part on the encoded triples directly
+        sets.sort()
+        if sets[0][0] <= SMALL_SET:
+            # copying a few triples is cheaper than registering a scan
+            enctriples = tuple(sets[0][3])
         else:
-            enctriples = sets[0].copy()
+            enctriples = self.__scan(sets[0][3])
+        if len(sets) > 1:
+            _, pos, id, _ = sets[1]
+            enctriples = (enctriple for enctriple in enctriples
+                          if enctriple[pos] == id)
 
         return ((self.__decodeTriple(enctriple), self.__contexts(enctriple))
                 for enctriple in enctriples
@@ -354,7 +374,9 @@ class IOMemory(Store):
         if triple is None or triple is (None,None,None):
             return (context for context in self.__all_contexts)
 
-        enctriple = self.__encodeTriple(triple)
+        enctriple = self.__lookupTriple(triple)
+        if enctriple is None:
+            return self.__emptygen()
         sid, pid, oid = enctriple
         if sid in self.__subjectIndex and enctriple in self.__subjectIndex[sid]:
             return self.__contexts(enctriple)
@@ -362,7 +384,9 @@ class IOMemory(Store):
             return self.__emptygen()
 
     def __len__(self, context=None):
-        cid = self.__obj2id(context)
+        if context not in self.__obj2int:
+            return 0
+        cid = self.__obj2int[context]
         if cid not in self.__contextTriples:
             return 0
         return len(self.__contextTriples[cid])
@@ -412,12 +436,12 @@ class IOMemory(Store):
 
         # if the triple is not quoted add it to the default context
         if not quoted:
-            self.__contextTriples[None].add(enctriple)
+            self.__writable(self.__contextTriples, None).add(enctriple)
 
         # always add the triple to given context, making sure it's initialized
         if cid not in self.__contextTriples:
             self.__contextTriples[cid] = set()
-        self.__contextTriples[cid].add(enctriple)
+        self.__writable(self.__contextTriples, cid).add(enctriple)
 
         # if this is the first ever triple in the store, set default ctx info
         if self.__defaultContexts is None:
@@ -452,24 +476,33 @@ class IOMemory(Store):
             del self.__tripleContexts[enctriple]
         else:
             self.__tripleContexts[enctriple] = ctxs
-        self.__contextTriples[cid].remove(enctriple)
+        self.__writable(self.__contextTriples, cid).remove(enctriple)
 
     def __obj2id(self, obj):
         """encode object, storing it in the encoding map if necessary,
            and return the integer key"""
-        if obj not in self.__obj2int:
-            id = randid()
-            while id in self.__int2obj:
-                id = randid()
+        try:
+            return self.__obj2int[obj]
+        except KeyError:
+            id = self.__nextid
+            self.__nextid += 1
             self.__obj2int[obj] = id
             self.__int2obj[id] = obj
             return id
-        return self.__obj2int[obj]
 
     def __encodeTriple(self, triple):
         """encode a whole triple, returning the encoded triple"""
         return tuple(map(self.__obj2id, triple))
 
+    def __lookupTriple(self, triple):
+        """encode a triple (pattern) without storing new objects in the
+           encoding map; return None if a part is not in the store"""
+        obj2int = self.__obj2int
+        try:
+            return (obj2int[triple[0]], obj2int[triple[1]], obj2int[triple[2]])
+        except KeyError:
+            return None
+
     def __decodeTriple(self, enctriple):
         """decode a whole encoded triple, returning the original
         triple"""
@@ -479,15 +512,47 @@ class IOMemory(Store):
         """return a generator which yields all the triples (unencoded)
            of the given context"""
         if cid not in self.__contextTriples:
-            return
-        for enctriple in self.__contextTriples[cid].copy():
-            yield self.__decodeTriple(enctriple), self.__contexts(enctriple)
+            return self.__emptygen()
+        # the scan is registered now, not when the generator is started
+        return ((self.__decodeTriple(enctriple), self.__contexts(enctriple))
+                for enctriple in self.__scan(self.__contextTriples[cid]))
 
     def __contexts(self, enctriple):
         """return a generator for all the non-quoted contexts
            (unencoded) the encoded triple appears in"""
         return (self.__int2obj.get(cid) for cid in self.__getTripleContexts(enctriple, skipQuoted=True) if cid is not None)
 
+    def __scan(self, enctriples):
+        """return an iterator over an index set, registered as being read
+        from now on, so changes made before it is iterated do not show"""
+        scan = self.__iterate(enctriples)
+        # run the generator up to the registration; as it is started, the
+        # registration is removed when it is closed or collected
+        next(scan)
+        return scan
+
+    def __iterate(self, enctriples):
+        readers = self.__readers
+        key = id(enctriples)
+        readers[key] = readers.get(key, 0) + 1
+        try:
+            yield
+            for enctriple in enctriples:
+                yield enctriple
+        finally:
+            if readers[key] == 1:
+                del readers[key]
+            else:
+                readers[key] -= 1
+
+    def __writable(self, index, key):
+        """return the set index[key] for changing it, replacing it by a
+        copy first if it is being iterated"""
+        enctriples = index[key]
+        if self.__readers and id(enctriples) in self.__readers:
+            enctriples = index[key] = set(enctriples)
+        return enctriples
+
     def __emptygen(self):
         """return an empty generator"""
         if False:
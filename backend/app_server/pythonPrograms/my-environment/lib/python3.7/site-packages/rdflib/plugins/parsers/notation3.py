@@ -42,6 +42,7 @@ from uuid import uuid4
 
 from rdflib.term import URIRef, BNode, Literal, Variable, _XSD_PFX, _unique_id
 from rdflib.graph import QuotedGraph, ConjunctiveGraph, Graph
+from rdflib.termcache import default_cache
 from rdflib import py3compat
 b = py3compat.b
 
@@ -1709,7 +1710,7 @@ class RDFSink(object):
         return Graph(self.graph.store, identifier)
 
     def newSymbol(self, *args):
-        return URIRef(args[0])
+        return default_cache.uriref(args[0])
 
     def newBlankNode(self, arg=None, uri=None, why=None):
         if isinstance(arg, Formula):
@@ -1723,9 +1724,9 @@ class RDFSink(object):
 
     def newLiteral(self, s, dt, lang):
         if dt:
-            return Literal(s, datatype=dt)
+            return default_cache.literal(s, datatype=dt)
         else:
-            return Literal(s, lang=lang)
+            return default_cache.literal(s, lang=lang)
 
     def newList(self, n, f):
         if not n:
@@ -1774,22 +1775,23 @@ class RDFSink(object):
             return URIRef(str(n[1]))
 
         if isinstance(n, bool):
-            s = Literal(str(n).lower(), datatype=BOOLEAN_DATATYPE)
+            s = default_cache.literal(str(n).lower(),
+                                      datatype=BOOLEAN_DATATYPE)
             return s
 
         if isinstance(n, int) or isinstance(n, int):
-            s = Literal(str(n), datatype=INTEGER_DATATYPE)
+            s = default_cache.literal(str(n), datatype=INTEGER_DATATYPE)
             return s
 
         if isinstance(n, Decimal):
             value = str(n)
             if value == '-0':
                 value = '0'
-            s = Literal(value, datatype=DECIMAL_DATATYPE)
+            s = default_cache.literal(value, datatype=DECIMAL_DATATYPE)
             return s
 
         if isinstance(n, float):
-            s = Literal(str(n), datatype=DOUBLE_DATATYPE)
+            s = default_cache.literal(str(n), datatype=DOUBLE_DATATYPE)
             return s
 
         if isinstance(f, Formula):
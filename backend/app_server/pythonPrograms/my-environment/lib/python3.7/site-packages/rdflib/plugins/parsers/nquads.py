@@ -35,14 +35,19 @@ from rdflib.plugins.parsers.ntriples import ParseError
 from rdflib.plugins.parsers.ntriples import r_tail
 from rdflib.plugins.parsers.ntriples import r_wspace
 from rdflib.plugins.parsers.ntriples import r_wspaces
+from rdflib.plugins.parsers.ntriples import fast_line
+from rdflib.plugins.parsers import ntriples
 
 __all__ = ['NQuadsParser']
 
+r_fast_quad = fast_line(r'[ \t]*', quads=True)
+
 
 class NQuadsParser(NTriplesParser):
 
-    def parse(self, inputsource, sink, **kwargs):
-        """Parse f as an N-Triples file."""
+    def parse(self, inputsource, sink, fast=True, **kwargs):
+        """Parse f as an N-Quads file; see NTriplesParser.parse for the fast
+        mode."""
         assert sink.store.context_aware, ("NQuadsParser must be given"
                                           " a context aware store.")
         self.sink = ConjunctiveGraph(store=sink.store, identifier=sink.identifier)
@@ -52,6 +57,10 @@ class NQuadsParser(NTriplesParser):
         if not hasattr(source, 'read'):
             raise ParseError("Item to parse must be a file-like object.")
 
+        if fast and not ntriples.validate:
+            self.parse_fast(source, r_fast_quad, self.sink_quads)
+            return self.sink
+
         source = getreader('utf-8')(source)
 
         self.file = source
@@ -67,6 +76,21 @@ class NQuadsParser(NTriplesParser):
 
         return self.sink
 
+    def sink_quads(self, quads):
+        """add a batch of quads to their contexts"""
+        sink = self.sink
+        contexts = {}
+
+        def context(identifier):
+            if identifier is None:
+                identifier = sink.identifier
+            try:
+                return contexts[identifier]
+            except KeyError:
+                graph = contexts[identifier] = sink.get_context(identifier)
+                return graph
+        sink.addN((s, p, o, context(g)) for s, p, o, g in quads)
+
     def parseline(self):
         self.eat(r_wspace)
         if (not self.line) or self.line.startswith(('#')):
@@ -11,6 +11,10 @@ class NTSink(object):
     def triple(self, s, p, o):
         self.graph.add((s, p, o))
 
+    def triples(self, triples):
+        graph = self.graph
+        graph.addN((s, p, o, graph) for s, p, o in triples)
+
 
 class NTParser(Parser):
     """parser for the ntriples format, often stored with the .nt extension
@@ -20,8 +24,8 @@ class NTParser(Parser):
     def __init__(self):
         super(NTParser, self).__init__()
 
-    def parse(self, source, sink, baseURI=None):
+    def parse(self, source, sink, baseURI=None, fast=True):
         f = source.getByteStream()  # TODO getCharacterStream?
         parser = NTriplesParser(NTSink(sink))
-        parser.parse(f)
+        parser.parse(f, fast=fast)
         f.close()
@@ -0,0 +1,238 @@
+"""
+Parallel loading of N-Triples and N-Quads files.
+
+N-Triples is line based, so a file can be cut at line breaks into byte
+ranges parsed independently. parse_parallel() parses the ranges in a pool
+of processes with the regex of the fast N-Triples parser; every chunk
+comes back dictionary-encoded (the distinct terms of the chunk, as plain
+tuples, and an array of term ids), so little is pickled and rdflib nodes
+are only created, through the term cache, in the loading process, which
+adds the triples to the graph in batches::
+
+    g = Graph('CompactMemory')
+    parse_parallel(g, 'catalog.nt')
+
+Blank node labels are scoped to the document, as with Graph.parse: the
+label L is mapped to the node BNode(prefix + L), where the prefix is
+generated for every load, so the same label gets the same node in every
+chunk without keeping a table of the labels.
+"""
+
+import os
+from array import array
+from collections import deque
+from io import BytesIO
+from multiprocessing import Pool
+
+from rdflib.term import BNode, Literal
+from rdflib.termcache import default_cache
+from rdflib.plugins.parsers import ntriples
+from rdflib.plugins.parsers.ntriples import NTriplesParser, ParseError
+from rdflib.plugins.parsers.ntriples import r_fast_triple, unquote
+from rdflib.plugins.parsers.nquads import NQuadsParser, r_fast_quad
+
+__all__ = ['parse_parallel']
+
+# size of the byte ranges parsed by the workers
+CHUNK_SIZE = 16 * 1024 * 1024
+
+# chunks parsed or being parsed ahead of the loading, per process
+WINDOW = 2
+
+# the term id of the default graph of a quad
+DEFAULT = -1
+
+
+def _chunks(path, chunk_size):
+    """cut the file into (start, end) byte ranges ending at line breaks"""
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, 'rb') as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _key(node):
+    """the picklable key of a node"""
+    if isinstance(node, Literal):
+        return ('L', str(node), node.language,
+                node.datatype and str(node.datatype))
+    if isinstance(node, BNode):
+        return ('B', str(node))
+    return ('U', str(node))
+
+
+class _Labels(dict):
+    """bnode table of the line parser in the workers: a label is kept as
+    the node id, and mapped in the loading process"""
+
+    def get(self, label, default=None):
+        return label
+
+
+class _Recorder(object):
+    """sink of the line parser in the workers"""
+
+    identifier = None
+
+    def __init__(self):
+        self.quads = []
+
+    def triple(self, s, p, o):
+        self.quads.append((s, p, o, None))
+
+    def get_context(self, identifier):
+        recorder = self
+
+        class Context(object):
+            def add(self, triple):
+                recorder.quads.append(triple + (identifier,))
+        return Context()
+
+
+def _parse_chunk(job):
+    """parse a byte range in a worker; return the keys of its terms and the
+    encoded triples (or quads), as an array of term ids"""
+    path, start, end, quads = job
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    keys = []
+    ids = {}
+    rows = array('q')
+
+    def term(key):
+        try:
+            rows.append(ids[key])
+        except KeyError:
+            ids[key] = len(keys)
+            rows.append(len(keys))
+            keys.append(key)
+
+    def iri(value):
+        return ('U', unquote(value) if '\\' in value else value)
+
+    if quads:
+        parser, match = NQuadsParser(), r_fast_quad.match
+    else:
+        parser, match = NTriplesParser(), r_fast_triple.match
+    parser._bnode_ids = _Labels()
+    parser.sink = recorder = _Recorder()
+
+    for number, line in enumerate(parser.lines(BytesIO(data))):
+        m = match(line)
+        if m is None:
+            # comments and blank lines, or an error
+            parser.line = line
+            try:
+                parser.parseline()
+            except ParseError as msg:
+                raise ParseError(
+                    "Invalid line %d of the chunk at byte %d (%s): %r"
+                    % (number + 1, start, msg, line))
+            for quad in recorder.quads:
+                for node in quad[:3]:
+                    term(_key(node))
+                if quads:
+                    if quad[3] is None:
+                        rows.append(DEFAULT)
+                    else:
+                        term(_key(quad[3]))
+            del recorder.quads[:]
+            continue
+        groups = m.groups()
+        s_iri, s_bnode, p, o_iri, o_bnode, lexical, lang, dtype = groups[:8]
+        term(iri(s_iri) if s_iri is not None else ('B', s_bnode))
+        term(iri(p))
+        if o_iri is not None:
+            term(iri(o_iri))
+        elif o_bnode is not None:
+            term(('B', o_bnode))
+        else:
+            term(('L', unquote(lexical) if '\\' in lexical else lexical,
+                  lang, dtype and iri(dtype)[1]))
+        if quads:
+            g_iri, g_bnode = groups[8:]
+            if g_iri is not None:
+                term(iri(g_iri))
+            elif g_bnode is not None:
+                term(('B', g_bnode))
+            else:
+                rows.append(DEFAULT)
+    return keys, rows
+
+
+def parse_parallel(graph, path, format='nt', processes=None,
+                   chunk_size=CHUNK_SIZE):
+    """\
+    Parse the N-Triples (format 'nt') or N-Quads (format 'nquads') file
+    path into graph, using a pool of processes (by default, one per CPU).
+    For N-Quads, graph must be a ConjunctiveGraph (or Dataset), and the
+    quads without a graph term go to its default context.
+
+    The chunks are merged in the order of the file. At most WINDOW chunks
+    per process are parsed ahead of the one being loaded, so a slow graph
+    does not make the parsed chunks pile up in memory. Returns the graph.
+    """
+    if format not in ('nt', 'nquads'):
+        raise ValueError("unsupported format for parallel loading: %r"
+                         % format)
+    quads = format == 'nquads'
+    if quads:
+        assert graph.store.context_aware, (
+            "N-Quads must be loaded into a context aware store.")
+    width = 4 if quads else 3
+    prefix = '%s_' % BNode()
+
+    uriref = default_cache.uriref
+    literal = default_cache.literal
+    contexts = {}
+
+    def node(key):
+        kind = key[0]
+        if kind == 'U':
+            return uriref(key[1])
+        elif kind == 'B':
+            return BNode(prefix + key[1])
+        return literal(key[1], key[2], key[3] and uriref(key[3]))
+
+    def context(key):
+        identifier = graph.identifier if key is None else node(key)
+        try:
+            return contexts[identifier]
+        except KeyError:
+            c = contexts[identifier] = graph.get_context(identifier)
+            return c
+
+    def load(keys, rows):
+        for i in range(0, len(rows), width * ntriples.batch_size):
+            batch = rows[i:i + width * ntriples.batch_size]
+            if quads:
+                graph.addN(
+                    (node(keys[s]), node(keys[p]), node(keys[o]),
+                     context(None if c == DEFAULT else keys[c]))
+                    for s, p, o, c in zip(*[iter(batch)] * 4))
+            else:
+                graph.addN(
+                    (node(keys[s]), node(keys[p]), node(keys[o]), graph)
+                    for s, p, o in zip(*[iter(batch)] * 3))
+
+    processes = processes or os.cpu_count() or 1
+    window = WINDOW * processes
+    pending = deque()
+    with Pool(processes) as pool:
+        for start, end in _chunks(path, chunk_size):
+            if len(pending) >= window:
+                load(*pending.popleft().get())
+            pending.append(pool.apply_async(
+                _parse_chunk, ((path, start, end, quads),)))
+        while pending:
+            load(*pending.popleft().get())
+    return graph
@@ -13,6 +13,7 @@ from rdflib.term import BNode as bNode
 from rdflib.term import Literal
 
 from rdflib.py3compat import cast_bytes, decodeUnicodeEscape
+from rdflib.termcache import default_cache
 
 __all__ = ['unquote', 'uriquote', 'Sink', 'NTriplesParser']
 
@@ -31,6 +32,30 @@ r_literal = re.compile(literal + litinfo)
 bufsiz = 2048
 validate = False
 
+# the fast parser reads larger blocks and hands the triples to the sink
+# in batches
+fast_bufsiz = 65536
+batch_size = 10000
+
+r_eol = re.compile(r'\r\n|\r|\n')
+fast_term = (r'<([^:]+:[^\s"<>]+)>|_:([A-Za-z0-9]*)|' +
+             literal + litinfo)
+
+
+def fast_line(separator, quads=False):
+    """a regex matching a whole (valid) line: the groups are the subject
+    IRI or bnode label, the predicate IRI, the object IRI, bnode label or
+    literal (lexical form, language, datatype), and for quads the graph
+    IRI or bnode label"""
+    pattern = (r'[ \t]*(?:<([^:]+:[^\s"<>]+)>|_:([A-Za-z0-9]*))' +
+               separator + uriref + separator + '(?:' + fast_term + ')')
+    if quads:
+        pattern += (r'(?:' + separator +
+                    r'(?:<([^:]+:[^\s"<>]+)>|_:([A-Za-z0-9]*)))?')
+    return re.compile(pattern + r'[ \t]*\.[ \t]*(?:#.*)?\Z')
+
+r_fast_triple = fast_line(r'[ \t]+')
+
 
 class Node(str):
     pass
@@ -122,11 +147,23 @@ class NTriplesParser(object):
         else:
             self.sink = Sink()
 
-    def parse(self, f):
-        """Parse f as an N-Triples file."""
+    def parse(self, f, fast=True):
+        """Parse f as an N-Triples file.
+
+        Unless fast is False (or the module is in validate mode), whole
+        lines are matched with a single regex, escapes are only decoded if
+        there is a backslash, nodes are interned (rdflib.termcache), and the
+        triples are given in batches to the triples() method of the sink
+        if it has one. Lines the regex does not match (comments, errors)
+        go through the line parser.
+        """
         if not hasattr(f, 'read'):
             raise ParseError("Item to parse must be a file-like object.")
 
+        if fast and not validate:
+            self.parse_fast(f, r_fast_triple, self.sink_triples)
+            return self.sink
+
         # since N-Triples 1.1 files can and should be utf-8 encoded
         f = codecs.getreader('utf-8')(f)
 
@@ -142,6 +179,91 @@ class NTriplesParser(object):
                 raise ParseError("Invalid line: %r" % self.line)
         return self.sink
 
+    def lines(self, f):
+        """the decoded lines of the binary file f"""
+        buffer = b''
+        while True:
+            data = f.read(fast_bufsiz)
+            if not data:
+                break
+            data = buffer + data
+            # the block ends at the last line break; an escape or a
+            # multibyte character cannot contain one
+            end = max(data.rfind(b'\n'), data.rfind(b'\r')) + 1
+            buffer = data[end:]
+            for line in r_eol.split(data[:end].decode('utf-8')):
+                yield line
+        if buffer:
+            yield buffer.decode('utf-8')
+
+    def parse_fast(self, f, pattern, emit):
+        """parse the lines of f matching pattern (see fast_line) into
+        batches of tuples of nodes given to emit, and the others with
+        parseline()"""
+        uriref = default_cache.uriref
+        literal = default_cache.literal
+        bnode_ids = self._bnode_ids
+        match = pattern.match
+
+        def iri(value):
+            return uriref(unquote(value) if '\\' in value else value)
+
+        def bnode(label):
+            try:
+                return bnode_ids[label]
+            except KeyError:
+                node = bnode_ids[label] = bNode()
+                return node
+
+        batch = []
+        for line in self.lines(f):
+            m = match(line)
+            if m is None:
+                # let the line parser skip the line or report the error,
+                # after the triples that precede it
+                if batch:
+                    emit(batch)
+                    batch = []
+                self.line = line
+                try:
+                    self.parseline()
+                except ParseError as msg:
+                    raise ParseError("Invalid line (%s): %r" % (msg, line))
+                continue
+            groups = m.groups()
+            s_iri, s_bnode, p, o_iri, o_bnode, lexical, lang, dtype = \
+                groups[:8]
+            s = iri(s_iri) if s_iri is not None else bnode(s_bnode)
+            if o_iri is not None:
+                o = iri(o_iri)
+            elif o_bnode is not None:
+                o = bnode(o_bnode)
+            else:
+                o = literal(
+                    unquote(lexical) if '\\' in lexical else lexical,
+                    lang, dtype and iri(dtype))
+            if len(groups) > 8:
+                g_iri, g_bnode = groups[8:]
+                g = iri(g_iri) if g_iri is not None else \
+                    bnode(g_bnode) if g_bnode is not None else None
+                batch.append((s, iri(p), o, g))
+            else:
+                batch.append((s, iri(p), o))
+            if len(batch) >= batch_size:
+                emit(batch)
+                batch = []
+        if batch:
+            emit(batch)
+
+    def sink_triples(self, triples):
+        """give a batch of triples to the sink"""
+        add = getattr(self.sink, 'triples', None)
+        if add is not None:
+            add(triples)
+        else:
+            for s, p, o in triples:
+                self.sink.triple(s, p, o)
+
     def parsestring(self, s):
         """Parse s as an N-Triples string."""
         if not isinstance(s, str):
@@ -281,3 +403,22 @@ class NTriplesParser(object):
 #     # for triple in sink:
 #     #     print triple
 #     print 'Length of input:', sink.length
+
+
+def _benchmark(path, store='default'):
+    """time the line parser and the fast parser loading an N-Triples file
+    into a store: python -m rdflib.plugins.parsers.ntriples FILE [STORE]"""
+    import time
+    from rdflib import Graph
+    for fast in (False, True):
+        graph = Graph(store)
+        start = time.time()
+        graph.parse(path, format='nt', fast=fast)
+        elapsed = time.time() - start
+        print('%s parser: %d triples in %.2fs (%d triples/s)' % (
+            'fast' if fast else 'line', len(graph), elapsed,
+            len(graph) / elapsed))
+
+if __name__ == '__main__':
+    import sys
+    _benchmark(*sys.argv[1:3])
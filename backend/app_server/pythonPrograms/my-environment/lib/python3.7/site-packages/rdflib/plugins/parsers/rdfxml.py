@@ -11,6 +11,7 @@ from rdflib.namespace import RDF, is_ncname
 from rdflib.term import URIRef
 from rdflib.term import BNode
 from rdflib.term import Literal
+from rdflib.termcache import default_cache
 from rdflib.exceptions import ParserError, Error
 from rdflib.parser import Parser
 
@@ -19,6 +20,10 @@ __all__ = ['create_parser', 'BagID', 'ElementHandler',
 
 RDFNS = RDF
 
+# nodes are interned, see rdflib.termcache
+uriref = default_cache.uriref
+literal = default_cache.literal
+
 # http://www.w3.org/TR/rdf-syntax-grammar/#eventterm-attribute-URI
 # A mapping from unqualified terms to their qualified version.
 UNQUALIFIED = {"about": RDF.about,
@@ -207,13 +212,13 @@ class RDFXMLHandler(handler.ContentHandler):
         result = urljoin(self.current.base, uri, allow_fragments=1)
         if uri and uri[-1] == "#" and result[-1] != "#":
             result = "%s#" % result
-        return URIRef(result)
+        return uriref(result)
 
     def convert(self, name, qname, attrs):
         if name[0] is None:
-            name = URIRef(name[1])
+            name = uriref(name[1])
         else:
-            name = URIRef("".join(name))
+            name = uriref("".join(name))
         atts = {}
         for (n, v) in list(attrs.items()):  # attrs._attrs.iteritems(): #
             if n[0] is None:
@@ -226,7 +231,7 @@ class RDFXMLHandler(handler.ContentHandler):
                 # if not RDFNS[att] in atts:
                 atts[RDFNS[att]] = v
             else:
-                atts[URIRef(att)] = v
+                atts[uriref(att)] = v
         return name, atts
 
     def document_element_start(self, name, qname, attrs):
@@ -302,7 +307,7 @@ class RDFXMLHandler(handler.ContentHandler):
             if not att.startswith(str(RDFNS)):
                 predicate = absolutize(att)
                 try:
-                    object = Literal(atts[att], language)
+                    object = literal(atts[att], language)
                 except Error as e:
                     self.error(e.msg)
             elif att == RDF.type:  # S2
@@ -316,7 +321,7 @@ class RDFXMLHandler(handler.ContentHandler):
             else:
                 predicate = absolutize(att)
                 try:
-                    object = Literal(atts[att], language)
+                    object = literal(atts[att], language)
                 except Error as e:
                     self.error(e.msg)
             self.store.add((subject, predicate, object))
@@ -438,11 +443,11 @@ class RDFXMLHandler(handler.ContentHandler):
                     predicate = absolutize(att)
 
                 if att == RDF.type:
-                    o = URIRef(atts[att])
+                    o = uriref(atts[att])
                 else:
                     if datatype is not None:
                         language = None
-                    o = Literal(atts[att], language, datatype)
+                    o = literal(atts[att], language, datatype)
 
                 if object is None:
                     object = BNode()
@@ -465,7 +470,7 @@ class RDFXMLHandler(handler.ContentHandler):
             literalLang = current.language
             if current.datatype is not None:
                 literalLang = None
-            current.object = Literal(
+            current.object = literal(
                 current.data, literalLang, current.datatype)
             current.data = None
         if self.next.end == self.list_node_element_end:
@@ -0,0 +1,209 @@
+"""
+Streaming sinks for the parsers.
+
+The RDF/XML, N-Triples and Turtle parsers only add triples to, and bind
+namespaces in, the graph they parse into, so they can write into a sink
+instead: the triples are then handed on in batches as they are parsed,
+and never all held in memory. Sinks hand the batches to a callback
+(CallbackSink), to a queue read by a consumer thread or process
+(QueueSink), or append them to an N-Triples file (NTriplesSpool)::
+
+    def validate(triples):
+        ...
+
+    with CallbackSink(validate) as sink:
+        parse_to_sink(sink, 'catalog.rdf', format='xml')
+
+A bounded queue also bounds the memory used: the parser waits while the
+consumer is behind. The consumer of a QueueSink reads batches until the
+end marker None, which is only sent when the parse completed; if the
+with block ends with an error, a SinkAborted is sent instead::
+
+    while True:
+        batch = queue.get()
+        if batch is None:
+            break
+        if isinstance(batch, SinkAborted):
+            raise batch
+        validate(batch)
+"""
+
+from rdflib import plugin
+from rdflib.graph import Graph
+from rdflib.parser import Parser, create_input_source
+from rdflib.plugins.serializers.nt import _nt_row
+
+__all__ = ['TripleSink', 'CallbackSink', 'QueueSink', 'NTriplesSpool',
+           'SinkAborted', 'parse_to_sink']
+
+# default number of triples in a batch
+BATCH_SIZE = 10000
+
+
+class SinkAborted(Exception):
+    """\
+    sent by a QueueSink instead of the end marker when the parse failed;
+    only the message of the error is kept, so that it can be pickled
+    """
+
+
+class TripleSink(object):
+    """\
+    Base class of the sinks: collects the triples given by a parser and
+    hands them in batches (lists of triples) to emit(), which subclasses
+    implement. close() (or leaving the with block) emits the last batch.
+    If the with block ends with an error, abort() is called instead: the
+    last batch is dropped, since the parse is incomplete.
+
+    The namespace bindings of the document are kept in the namespaces
+    dict.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.batch = []
+        self.namespaces = {}
+        # number of triples emitted
+        self.count = 0
+
+    # the methods of Graph used by the parsers
+
+    def add(self, triple):
+        batch = self.batch
+        batch.append(triple)
+        if len(batch) >= self.batch_size:
+            self.flush()
+
+    def addN(self, quads):
+        for s, p, o, c in quads:
+            self.add((s, p, o))
+
+    def bind(self, prefix, namespace, override=True):
+        if override or prefix not in self.namespaces:
+            self.namespaces[prefix] = namespace
+
+    def absolutize(self, uri, defrag=1):
+        return Graph().absolutize(uri, defrag)
+
+    # the sink interface of NTriplesParser
+
+    def triple(self, s, p, o):
+        self.add((s, p, o))
+
+    def triples(self, triples):
+        for triple in triples:
+            self.add(triple)
+
+    def flush(self):
+        """emit the collected triples, if any"""
+        if self.batch:
+            batch, self.batch = self.batch, []
+            self.count += len(batch)
+            self.emit(batch)
+
+    def emit(self, batch):
+        raise NotImplementedError()
+
+    def close(self):
+        self.flush()
+
+    def abort(self, error):
+        """end the sink after error, without emitting the last batch"""
+        self.batch = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort(exc_value)
+
+
+class CallbackSink(TripleSink):
+    """hands every batch to callback(batch)"""
+
+    def __init__(self, callback, batch_size=BATCH_SIZE):
+        super(CallbackSink, self).__init__(batch_size)
+        self.callback = callback
+
+    def emit(self, batch):
+        self.callback(batch)
+
+
+class QueueSink(TripleSink):
+    """\
+    puts every batch in a queue (e.g. a queue.Queue or a
+    multiprocessing.Queue), followed by None when the sink is closed, or
+    by a SinkAborted when it is aborted
+    """
+
+    def __init__(self, queue, batch_size=BATCH_SIZE):
+        super(QueueSink, self).__init__(batch_size)
+        self.queue = queue
+
+    def emit(self, batch):
+        self.queue.put(batch)
+
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+
+    def abort(self, error):
+        super(QueueSink, self).abort(error)
+        self.queue.put(SinkAborted('%s: %s' % (type(error).__name__, error)))
+
+
+class NTriplesSpool(TripleSink):
+    """\
+    appends the triples to an N-Triples file (UTF-8), given as a file
+    name or a binary file object; a file opened by the sink is closed with
+    it (when it is aborted too, holding the batches emitted before)
+    """
+
+    def __init__(self, destination, batch_size=BATCH_SIZE):
+        super(NTriplesSpool, self).__init__(batch_size)
+        if hasattr(destination, 'write'):
+            self.stream = destination
+            self.own_stream = False
+        else:
+            self.stream = open(destination, 'ab')
+            self.own_stream = True
+
+    def emit(self, batch):
+        self.stream.write(
+            ''.join([_nt_row(triple) for triple in batch]).encode('utf-8'))
+
+    def close(self):
+        self.flush()
+        if self.own_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+    def abort(self, error):
+        super(NTriplesSpool, self).abort(error)
+        if self.own_stream:
+            self.stream.close()
+
+
+def parse_to_sink(sink, source=None, publicID=None, format='xml',
+                  location=None, file=None, data=None, **args):
+    """\
+    Parse a document into a sink, like Graph.parse, for the formats whose
+    parsers only add triples and bind namespaces ('xml', 'nt' and
+    'turtle'). The
+    sink is not closed, so that several documents can be parsed into it.
+    Returns the sink.
+    """
+    source = create_input_source(source=source, publicID=publicID,
+                                 location=location, file=file,
+                                 data=data, format=format)
+    parser = plugin.get(format, Parser)()
+    try:
+        parser.parse(source, sink, **args)
+    finally:
+        if source.auto_close:
+            source.close()
+    return sink
@@ -0,0 +1,197 @@
+"""
+Tests of the streaming sinks of rdflib.plugins.parsers.sinks.
+Run: python -m unittest rdflib.plugins.parsers.tests.test_sinks
+"""
+
+import io
+import os
+import queue
+import shutil
+import tempfile
+import unittest
+
+from rdflib import Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.plugins.parsers.sinks import CallbackSink, QueueSink, \
+    NTriplesSpool, SinkAborted, parse_to_sink
+
+EX = 'http://example.org/'
+
+TURTLE = '''\
+@prefix ex: <http://example.org/> .
+@prefix dct: <http://purl.org/dc/terms/> .
+ex:catalog ex:dataset ex:d0, ex:d1, ex:d2 .
+ex:d0 dct:title "Datos"@es, "tab\\there", "caf\\u00e9" ;
+    ex:size 3 ; ex:issued "2020-01-01"^^<http://www.w3.org/2001/XMLSchema#date> .
+ex:d1 dct:title "line\\nbreak \\"quoted\\" back\\\\slash" ; ex:related [ ex:p ex:o ] .
+ex:d2 dct:title "\\u65e5\\u672c" .
+'''
+
+RDFXML = '''\
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:ex="http://example.org/">
+  <rdf:Description rdf:about="http://example.org/s">
+    <ex:p>one</ex:p>
+    <ex:p>two</ex:p>
+  </rdf:Description>
+  <rdf:Description rdf:about="http://example.org/t">
+    <ex:p>three
+'''
+
+
+def triples(n):
+    return [(URIRef(EX + 's'), URIRef(EX + 'p'), Literal(i))
+            for i in range(n)]
+
+
+def drain(q):
+    items = []
+    while not q.empty():
+        items.append(q.get())
+    return items
+
+
+class TestBatching(unittest.TestCase):
+
+    def test_batches_and_count(self):
+        batches = []
+        with CallbackSink(batches.append, batch_size=3) as sink:
+            for triple in triples(7):
+                sink.add(triple)
+            self.assertEqual([len(b) for b in batches], [3, 3])
+            self.assertEqual(sink.count, 6)
+        self.assertEqual([len(b) for b in batches], [3, 3, 1])
+        self.assertEqual(sink.count, 7)
+        self.assertEqual(sum(batches, []), triples(7))
+
+    def test_sink_interfaces(self):
+        batches = []
+        sink = CallbackSink(batches.append, batch_size=2)
+        s, p, o = triples(1)[0]
+        sink.triple(s, p, o)
+        sink.triples(triples(2))
+        sink.addN((s, p, o, None) for s, p, o in triples(1))
+        sink.close()
+        self.assertEqual([len(b) for b in batches], [2, 2])
+        self.assertEqual(sink.count, 4)
+
+    def test_empty(self):
+        batches = []
+        with CallbackSink(batches.append) as sink:
+            pass
+        self.assertEqual(batches, [])
+        self.assertEqual(sink.count, 0)
+
+    def test_parsers(self):
+        for format, data in (('turtle', TURTLE), ('nt', None),
+                             ('xml', None)):
+            graph = Graph().parse(data=TURTLE, format='turtle')
+            if data is None:
+                data = graph.serialize(format=format).decode('utf-8')
+            with self.subTest(format):
+                batches = []
+                with CallbackSink(batches.append, batch_size=4) as sink:
+                    parse_to_sink(sink, data=data, format=format)
+                self.assertTrue(all(len(b) <= 4 for b in batches))
+                self.assertEqual(sink.count, len(graph))
+                parsed = Graph()
+                for batch in batches:
+                    for triple in batch:
+                        parsed.add(triple)
+                self.assertTrue(isomorphic(parsed, graph))
+
+    def test_bindings(self):
+        with CallbackSink(lambda batch: None) as sink:
+            parse_to_sink(sink, data=TURTLE, format='turtle')
+        self.assertEqual(sink.namespaces['ex'], EX)
+        self.assertEqual(sink.namespaces['dct'], 'http://purl.org/dc/terms/')
+        sink.bind('ex', 'http://other.example/', override=False)
+        self.assertEqual(sink.namespaces['ex'], EX)
+        sink.bind('ex', 'http://other.example/')
+        self.assertEqual(sink.namespaces['ex'], 'http://other.example/')
+
+
+class TestQueueSink(unittest.TestCase):
+
+    def test_end_marker(self):
+        q = queue.Queue()
+        with QueueSink(q, batch_size=3) as sink:
+            for triple in triples(5):
+                sink.add(triple)
+        items = drain(q)
+        self.assertEqual([len(b) for b in items[:-1]], [3, 2])
+        self.assertIsNone(items[-1])
+
+    def test_error_is_not_the_end(self):
+        q = queue.Queue()
+        with self.assertRaises(ValueError):
+            with QueueSink(q, batch_size=3) as sink:
+                for triple in triples(5):
+                    sink.add(triple)
+                raise ValueError('truncated dump')
+        items = drain(q)
+        # the batch emitted before the error, then the error; no None
+        self.assertEqual(len(items), 2)
+        self.assertEqual(len(items[0]), 3)
+        self.assertIsInstance(items[1], SinkAborted)
+        self.assertIn('truncated dump', str(items[1]))
+        self.assertNotIn(None, items)
+
+    def test_parse_error(self):
+        q = queue.Queue()
+        with self.assertRaises(Exception):
+            with QueueSink(q, batch_size=1) as sink:
+                parse_to_sink(sink, data=RDFXML, format='xml')
+        items = drain(q)
+        self.assertIsInstance(items[-1], SinkAborted)
+        self.assertNotIn(None, items)
+
+
+class TestNTriplesSpool(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_back(self):
+        graph = Graph().parse(data=TURTLE, format='turtle')
+        path = os.path.join(self.directory, 'spool.nt')
+        with NTriplesSpool(path, batch_size=2) as spool:
+            parse_to_sink(spool, data=TURTLE, format='turtle')
+        self.assertTrue(spool.stream.closed)
+        spooled = Graph().parse(path, format='nt')
+        self.assertTrue(isomorphic(spooled, graph))
+        self.assertEqual(len(spooled), spool.count)
+
+    def test_appends(self):
+        path = os.path.join(self.directory, 'spool.nt')
+        for i in range(2):
+            with NTriplesSpool(path) as spool:
+                spool.add(triples(2)[i])
+        self.assertEqual(len(Graph().parse(path, format='nt')), 2)
+
+    def test_stream(self):
+        stream = io.BytesIO()
+        with NTriplesSpool(stream) as spool:
+            spool.triples(triples(3))
+        self.assertFalse(stream.closed)
+        lines = stream.getvalue().decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(len(Graph().parse(data=stream.getvalue(),
+                                           format='nt')), 3)
+
+    def test_abort(self):
+        path = os.path.join(self.directory, 'spool.nt')
+        with self.assertRaises(ValueError):
+            with NTriplesSpool(path, batch_size=2) as spool:
+                spool.triples(triples(3))
+                raise ValueError()
+        self.assertTrue(spool.stream.closed)
+        # only the batch emitted before the error
+        self.assertEqual(len(Graph().parse(path, format='nt')), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,211 @@
+"""
+Tests of the Turtle parser, in the manner of the W3C Turtle test suite
+(http://www.w3.org/2013/TurtleTests/): positive and negative syntax
+tests, evaluation tests against N-Triples, and a comparison with the N3
+parser, which parsed Turtle before.
+Run: python -m unittest rdflib.plugins.parsers.tests.test_turtle
+"""
+
+import unittest
+
+from rdflib import Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.plugins.parsers.notation3 import BadSyntax
+
+EX = 'http://example.org/'
+
+# documents that must parse
+POSITIVE = {
+    'iri': '<http://a.example/s> <http://a.example/p> <http://a.example/o> .',
+    'iri_escapes': '<http://a.example/\\u0073> <http://a.example/p> '
+                   '<http://a.example/\\U0000006F> .',
+    'prefix': '@prefix p: <http://a.example/> . p:s p:p p:o .',
+    'sparql_prefix': 'PREFIX p: <http://a.example/>\np:s p:p p:o .',
+    'sparql_prefix_case': 'pReFiX p: <http://a.example/>\np:s p:p p:o .',
+    'empty_prefix': '@prefix : <http://a.example/> . :s :p : .',
+    'base': '@base <http://a.example/> . <s> <p> <o> .',
+    'sparql_base': 'BASE <http://a.example/dir/>\n<s> <p> <../o> .',
+    'local_escapes': '@prefix p: <http://a.example/> . p:s p:p p:\\~o\\.x .',
+    'local_percent': '@prefix p: <http://a.example/> . p:s p:p p:o%20x .',
+    'local_colon': '@prefix p: <http://a.example/> . p:s p:p p:o:x .',
+    'local_digit': '@prefix p: <http://a.example/> . p:s p:p p:0 .',
+    'bnode_labels': '_:a <http://a.example/p> _:b.c .',
+    'anon': '[] <http://a.example/p> [] .',
+    'bnode_property_list': '[ <http://a.example/p> <http://a.example/o> ] .',
+    'nested_property_lists':
+        '<http://a.example/s> <http://a.example/p> '
+        '[ <http://a.example/q> [ <http://a.example/r> 1 ] ] .',
+    'collections': '(1 (2 3) ()) <http://a.example/p> () .',
+    'object_list': '<http://a.example/s> <http://a.example/p> 1, 2 , 3 .',
+    'predicate_list': '<http://a.example/s> <http://a.example/p> 1 ; '
+                      '<http://a.example/q> 2 ;; ; .',
+    'a': '<http://a.example/s> a <http://a.example/C> .',
+    'strings': '<http://a.example/s> <http://a.example/p> "a", \'b\', '
+               '"""c\n"d"" e""", \'\'\'e\n\'f\'\'\' .',
+    'string_escapes': '<http://a.example/s> <http://a.example/p> '
+                      '"\\t\\b\\n\\r\\f\\"\\\'\\\\\\u00E9" .',
+    'language': '<http://a.example/s> <http://a.example/p> "chat"@en-GB .',
+    'datatype': '<http://a.example/s> <http://a.example/p> '
+                '"1"^^<http://www.w3.org/2001/XMLSchema#integer> .',
+    'numbers': '<http://a.example/s> <http://a.example/p> '
+               '1, -2, +3, 4.5, .5, -6e7, 8.E-1 .',
+    'booleans': '<http://a.example/s> <http://a.example/p> true, false .',
+    'comments': '# comment\n<http://a.example/s> # comment\n'
+                '<http://a.example/p> <http://a.example/o> . # comment',
+    'whitespace': ' \t\r\n<http://a.example/s>\t<http://a.example/p>\r\n'
+                  '<http://a.example/o>\n.\n',
+    'empty': '',
+    'unicode_names': '@prefix r\u00e9s: <http://a.example/> . '
+                     'r\u00e9s:s r\u00e9s:p r\u00e9s:\u00e9t\u00e9 .',
+}
+
+# documents that must raise BadSyntax
+NEGATIVE = {
+    'missing_dot': '<http://a.example/s> <http://a.example/p> <http://a.example/o>',
+    'unbound_prefix': 'x:s <http://a.example/p> <http://a.example/o> .',
+    'collection_alone': '( 1 2 ) .',
+    'anon_alone': '[] .',
+    'anon_alone_with_space': '[ ] .',
+    'literal_subject': '"s" <http://a.example/p> <http://a.example/o> .',
+    'literal_predicate': '<http://a.example/s> "p" <http://a.example/o> .',
+    'bnode_predicate': '<http://a.example/s> _:p <http://a.example/o> .',
+    'a_subject': 'a <http://a.example/p> <http://a.example/o> .',
+    'keyword_object': '<http://a.example/s> <http://a.example/p> blah .',
+    'space_in_iri': '<http://a.example/s> <http://a.example/p> <http://a.example/o o> .',
+    'bad_string_escape': '<http://a.example/s> <http://a.example/p> "a\\q" .',
+    'newline_in_string': '<http://a.example/s> <http://a.example/p> "a\nb" .',
+    'unterminated_string': '<http://a.example/s> <http://a.example/p> "a .',
+    'unclosed_list': '<http://a.example/s> <http://a.example/p> ( 1 2 .',
+    'unclosed_property_list': '<http://a.example/s> <http://a.example/p> [ <http://a.example/q> 1 .',
+    'prefix_without_dot': '@prefix p: <http://a.example/> p:s p:p p:o .',
+    'sparql_prefix_with_dot': 'PREFIX p: <http://a.example/> .\np:s p:p p:o .',
+    'prefix_with_local': '@prefix p:x <http://a.example/> .',
+    'n3_formula': '{ <http://a.example/s> <http://a.example/p> <http://a.example/o> } '
+                  '<http://a.example/p> <http://a.example/o> .',
+    'n3_equals': '<http://a.example/s> = <http://a.example/o> .',
+    'n3_keywords': '@keywords a .',
+    'form_feed': '<http://a.example/s> <http://a.example/p>\x0c<http://a.example/o> .',
+    'vertical_tab': '<http://a.example/s>\x0b<http://a.example/p> <http://a.example/o> .',
+    'no_break_space': '<http://a.example/s>\u00a0<http://a.example/p> <http://a.example/o> .',
+    'line_separator': '<http://a.example/s> <http://a.example/p> <http://a.example/o>\u2028.',
+}
+
+# documents and the N-Triples of their graph
+EVALUATION = [
+    ('@prefix : <http://example.org/> . :s :p :o1, :o2 ; :q "x"@en .',
+     '<http://example.org/s> <http://example.org/p> <http://example.org/o1> .\n'
+     '<http://example.org/s> <http://example.org/p> <http://example.org/o2> .\n'
+     '<http://example.org/s> <http://example.org/q> "x"@en .\n'),
+    ('@base <http://example.org/a/b> . <c> <#p> <../d> .',
+     '<http://example.org/a/c> <http://example.org/a/b#p> <http://example.org/d> .\n'),
+    ('<http://example.org/s> <http://example.org/p> ( 1 ) .',
+     '<http://example.org/s> <http://example.org/p> _:l .\n'
+     '_:l <http://www.w3.org/1999/02/22-rdf-syntax-ns#first> '
+     '"1"^^<http://www.w3.org/2001/XMLSchema#integer> .\n'
+     '_:l <http://www.w3.org/1999/02/22-rdf-syntax-ns#rest> '
+     '<http://www.w3.org/1999/02/22-rdf-syntax-ns#nil> .\n'),
+    ('[ <http://example.org/p> [] ] <http://example.org/q> 2.0, 1e0, true .',
+     '_:a <http://example.org/p> _:b .\n'
+     '_:a <http://example.org/q> "2.0"^^<http://www.w3.org/2001/XMLSchema#decimal> .\n'
+     '_:a <http://example.org/q> "1e0"^^<http://www.w3.org/2001/XMLSchema#double> .\n'
+     '_:a <http://example.org/q> "true"^^<http://www.w3.org/2001/XMLSchema#boolean> .\n'),
+    ('<http://example.org/s> <http://example.org/p> """a\\u00E9\nb""" .',
+     '<http://example.org/s> <http://example.org/p> "a\\u00E9\\nb" .\n'),
+]
+
+# documents the N3 parser reads as Turtle too
+SHARED = [
+    '@prefix : <http://example.org/> .\n'
+    '@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .\n'
+    ':catalog a :Catalog ;\n'
+    '    :title "Catalog"@en, "Cat\\u00E1logo"@es ;\n'
+    '    :dataset [ a :Dataset ; :issued "2020-01-01"^^xsd:date ;\n'
+    '               :keyword "a", "b" ; :size 12, 1.5, 2e3 ;\n'
+    '               :distribution [ :url <http://example.org/d.csv> ] ] ;\n'
+    '    :themes ( :t1 :t2 [ :label "t3" ] ) ;\n'
+    '    :empty () .\n'
+    '_:x :knows _:y . _:y :knows _:x .\n'
+    ':s :p """long\nstring with "quotes\\"""" .\n',
+    '@base <http://example.org/base/> .\n'
+    '@prefix p: <ns#> .\n'
+    '<s> p:p <o>, <../up>, <#frag> ; p:q true, false .\n',
+]
+
+
+def parse(data, format='turtle'):
+    return Graph().parse(data=data, format=format)
+
+
+class TestTurtleSyntax(unittest.TestCase):
+
+    def test_positive(self):
+        for name, data in sorted(POSITIVE.items()):
+            with self.subTest(name):
+                parse(data)
+
+    def test_negative(self):
+        for name, data in sorted(NEGATIVE.items()):
+            with self.subTest(name):
+                self.assertRaises(BadSyntax, parse, data)
+
+    def test_error_position(self):
+        data = '<http://a.example/s> <http://a.example/p> 1 .\n' \
+               '<http://a.example/s> <http://a.example/p>\x0c2 .'
+        with self.assertRaises(BadSyntax) as raised:
+            parse(data)
+        self.assertEqual(raised.exception.lines, 1)
+        self.assertIn("character '\\x0c'", str(raised.exception))
+
+
+class TestTurtleEvaluation(unittest.TestCase):
+
+    def test_ntriples(self):
+        for data, expected in EVALUATION:
+            with self.subTest(data):
+                self.assertTrue(isomorphic(
+                    parse(data), parse(expected, format='nt')))
+
+    def test_n3_parser(self):
+        for data in SHARED:
+            with self.subTest(data):
+                self.assertTrue(isomorphic(
+                    parse(data), parse(data, format='n3')))
+
+    def test_values(self):
+        graph = parse(POSITIVE['numbers'])
+        self.assertEqual(sorted(o.toPython() for o in graph.objects()),
+                         [-60000000.0, -2, 0.5, 0.8, 1, 3, 4.5])
+        graph = parse(POSITIVE['local_escapes'])
+        self.assertEqual(list(graph.objects()),
+                         [URIRef('http://a.example/~o.x')])
+        graph = parse(POSITIVE['string_escapes'])
+        self.assertEqual(list(graph.objects()),
+                         [Literal('\t\b\n\r\f"\'\\\u00e9')])
+
+    def test_prefixes_bound(self):
+        graph = parse(POSITIVE['prefix'])
+        self.assertIn(('p', URIRef('http://a.example/')),
+                      list(graph.namespaces()))
+
+    def test_many_triples(self):
+        data = ''.join('<%ss> <%sp> %d .\n' % (EX, EX, i)
+                       for i in range(25000))
+        self.assertEqual(len(parse(data)), 25000)
+
+
+class TestTurtleErrors(unittest.TestCase):
+
+    def test_triples_before_error_are_kept(self):
+        # as with the N3 parser, the parse is not atomic
+        data = ''.join('<%ss> <%sp> %d .\n' % (EX, EX, i)
+                       for i in range(12000)) + '<%ss> <%sp> ] .\n' % (EX, EX)
+        for format in ('turtle', 'n3'):
+            with self.subTest(format):
+                graph = Graph()
+                self.assertRaises(BadSyntax, graph.parse, data=data,
+                                  format=format)
+                self.assertEqual(len(graph), 12000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,380 @@
+"""
+A parser for Turtle 1.1 documents.
+
+The N3 parser of rdflib (notation3.py) parses Turtle too, but it is a
+character by character parser of the whole of N3 (formulae, quantifiers,
+paths). This parser only reads Turtle: a single regular expression cuts
+the document into tokens, a recursive descent parser builds the triples,
+and they are added to the graph in batches. It is registered for the
+'turtle', 'ttl' and 'text/turtle' formats; N3 documents are still parsed
+by the 'n3' parser.
+
+A syntax error raises BadSyntax. As with the N3 parser, the parse is not
+atomic: the triples read before the error are in the graph.
+
+See http://www.w3.org/TR/turtle/
+"""
+
+import codecs
+import re
+
+from rdflib.parser import Parser
+from rdflib.term import BNode, _XSD_PFX
+from rdflib.termcache import default_cache
+from rdflib.plugins.parsers import ntriples
+from rdflib.plugins.parsers.notation3 import BadSyntax, join
+
+__all__ = ['TurtleParser']
+
+RDF_NS = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'
+
+# the kinds of tokens, which are the numbers of their groups in _token
+IRI, PNAME, BNODE, STRING_LONG2, STRING_LONG1, STRING2, STRING1, \
+    DOUBLE, DECIMAL, INTEGER, AT, WORD, PUNCT, ERROR, END = range(1, 16)
+
+_PN_CHARS = '\\w\\-\\u00B7\\u0300-\\u036F\\u203F-\\u2040'
+_PLX = '%[0-9A-Fa-f]{2}|\\\\[_~.\\-!$&\'()*+,;=/?#@%]'
+_PN_PREFIX = '(?:[^\\W\\d_](?:[%s.]*[%s])?)?' % (_PN_CHARS, _PN_CHARS)
+_PN_LOCAL = '(?:[\\w:]|%s)(?:(?:[%s:.]|%s)*(?:[%s:]|%s))?' % (
+    _PLX, _PN_CHARS, _PLX, _PN_CHARS, _PLX)
+
+_token = re.compile(
+    # white space (only these four characters) and comments
+    '(?:[ \\t\\r\\n]+|#[^\\r\\n]*)*(?:'
+    '<((?:[^\\x00-\\x20<>"{}|^`\\\\]|\\\\u[0-9A-Fa-f]{4}|'
+    '\\\\U[0-9A-Fa-f]{8})*)>|'
+    '(%s:(?:%s)?)|' % (_PN_PREFIX, _PN_LOCAL) +
+    '_:([\\w](?:[%s.]*[%s])?)|' % (_PN_CHARS, _PN_CHARS) +
+    '"""((?:(?:"|"")?(?:[^"\\\\]|\\\\.))*)"""|'
+    "'''((?:(?:'|'')?(?:[^'\\\\]|\\\\.))*)'''|"
+    '"((?:[^"\\\\\\n\\r]|\\\\.)*)"|'
+    "'((?:[^'\\\\\\n\\r]|\\\\.)*)'|"
+    '([+-]?(?:[0-9]+(?:\\.[0-9]*)?|\\.[0-9]+)[eE][+-]?[0-9]+)|'
+    '([+-]?[0-9]*\\.[0-9]+)|'
+    '([+-]?[0-9]+)|'
+    '@([a-zA-Z]+(?:-[a-zA-Z0-9]+)*)|'
+    '([A-Za-z]+)|'
+    '([.;,\\[\\]()]|\\^\\^)|'
+    # any other character, including other white space, is an error
+    '([\\s\\S])|'
+    # the end of the document, matched so that the white space and
+    # comments before it are not given back to the other tokens
+    '(\\Z))')
+
+_absolute = re.compile('[A-Za-z][A-Za-z0-9+.-]*:').match
+_escape = re.compile(
+    '\\\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))', re.S)
+_local_escape = re.compile('\\\\(.)')
+
+_string_escapes = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f',
+                   '"': '"', "'": "'", '\\': '\\'}
+
+_DATATYPES = {DOUBLE: _XSD_PFX + 'double',
+              DECIMAL: _XSD_PFX + 'decimal',
+              INTEGER: _XSD_PFX + 'integer'}
+
+_DESCRIPTIONS = {IRI: 'IRI', PNAME: 'prefixed name', BNODE: 'blank node',
+                 AT: 'language tag or directive', WORD: 'keyword',
+                 ERROR: 'character', END: 'end of document'}
+
+
+def _unescape_char(match):
+    code = match.group(1) or match.group(2)
+    if code is not None:
+        return chr(int(code, 16))
+    try:
+        return _string_escapes[match.group(3)]
+    except KeyError:
+        raise ValueError("invalid escape \\%s" % match.group(3))
+
+
+class _Reader(object):
+    """recursive descent parser of a document, see TurtleParser"""
+
+    def __init__(self, text, graph, base):
+        self.text = text
+        self.graph = graph
+        self.base = base
+        self.prefixes = {}
+        self.bnodes = {}
+        self.batch = []
+        self.tokens = _token.finditer(text)
+        uriref = default_cache.uriref
+        self.rdf_type = uriref(RDF_NS + 'type')
+        self.rdf_first = uriref(RDF_NS + 'first')
+        self.rdf_rest = uriref(RDF_NS + 'rest')
+        self.rdf_nil = uriref(RDF_NS + 'nil')
+
+    def error(self, why, pos=None):
+        if pos is None:
+            pos = self.pos
+        raise BadSyntax(self.base, self.text.count('\n', 0, pos),
+                        self.text, pos, why)
+
+    def advance(self):
+        """read the next token into kind, value and pos"""
+        match = next(self.tokens, None)
+        if match is None:
+            self.kind = END
+            self.value = None
+            self.pos = len(self.text)
+        else:
+            self.kind = kind = match.lastindex
+            self.value = match.group(kind)
+            self.pos = match.start(kind)
+
+    def expect(self, punct):
+        if self.kind != PUNCT or self.value != punct:
+            self.unexpected("'%s'" % punct)
+        self.advance()
+
+    def unexpected(self, expected):
+        if self.kind in (PUNCT, WORD):
+            found = "'%s'" % self.value
+        elif self.kind == ERROR:
+            found = 'character %r' % self.value
+        else:
+            found = _DESCRIPTIONS.get(self.kind, 'literal')
+        self.error("expected %s, found %s" % (expected, found))
+
+    def add(self, s, p, o):
+        batch = self.batch
+        batch.append((s, p, o, self.graph))
+        if len(batch) >= ntriples.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            batch, self.batch = self.batch, []
+            self.graph.addN(batch)
+
+    # the grammar
+
+    def parse(self):
+        try:
+            self.statements()
+        finally:
+            # the triples read before an error are kept, see the module
+            # documentation
+            self.flush()
+
+    def statements(self):
+        self.advance()
+        while self.kind != END:
+            kind, value = self.kind, self.value
+            if kind == AT and value in ('prefix', 'base'):
+                self.advance()
+                self.directive(value)
+                self.expect('.')
+            elif kind == WORD and value.lower() in ('prefix', 'base'):
+                self.advance()
+                self.directive(value.lower())
+            else:
+                self.triples()
+                self.expect('.')
+
+    def directive(self, name):
+        if name == 'prefix':
+            if self.kind != PNAME:
+                self.unexpected('prefix')
+            prefix, _, local = self.value.partition(':')
+            if local:
+                self.unexpected('prefix')
+            self.advance()
+            if self.kind != IRI:
+                self.unexpected('IRI')
+            self.prefixes[prefix] = self.resolve(self.value)
+        else:
+            if self.kind != IRI:
+                self.unexpected('IRI')
+            self.base = self.resolve(self.value)
+        self.advance()
+
+    def triples(self):
+        if self.kind == PUNCT and self.value == '[':
+            self.advance()
+            subject = BNode()
+            if self.kind == PUNCT and self.value == ']':
+                # [] is a subject, it must have predicates
+                self.advance()
+            else:
+                self.predicate_object_list(subject)
+                self.expect(']')
+                # a non-empty [ ... ] can be a statement by itself
+                if self.kind == PUNCT and self.value == '.':
+                    return
+        else:
+            subject = self.subject()
+        self.predicate_object_list(subject)
+
+    def predicate_object_list(self, subject):
+        self.object_list(subject, self.verb())
+        while self.kind == PUNCT and self.value == ';':
+            self.advance()
+            if self.kind == PUNCT and self.value in '.];':
+                continue
+            self.object_list(subject, self.verb())
+
+    def object_list(self, subject, predicate):
+        self.add(subject, predicate, self.object())
+        while self.kind == PUNCT and self.value == ',':
+            self.advance()
+            self.add(subject, predicate, self.object())
+
+    def subject(self):
+        kind = self.kind
+        if kind == IRI or kind == PNAME or kind == BNODE:
+            return self.node()
+        if kind == PUNCT and self.value == '(':
+            return self.collection()
+        self.unexpected('subject')
+
+    def verb(self):
+        kind = self.kind
+        if kind == IRI or kind == PNAME:
+            return self.node()
+        if kind == WORD and self.value == 'a':
+            self.advance()
+            return self.rdf_type
+        self.unexpected('predicate')
+
+    def object(self):
+        kind = self.kind
+        if kind <= BNODE:
+            return self.node()
+        if kind <= STRING1:
+            return self.literal()
+        if kind <= INTEGER:
+            node = default_cache.literal(self.value,
+                                         datatype=self.datatype(kind))
+            self.advance()
+            return node
+        if kind == PUNCT:
+            if self.value == '[':
+                return self.blank_node_property_list()
+            if self.value == '(':
+                return self.collection()
+        elif kind == WORD and self.value in ('true', 'false'):
+            node = default_cache.literal(
+                self.value, datatype=_XSD_PFX + 'boolean')
+            self.advance()
+            return node
+        self.unexpected('object')
+
+    def datatype(self, kind):
+        return default_cache.uriref(_DATATYPES[kind])
+
+    def node(self):
+        """the IRI, prefixed name or labelled blank node token"""
+        kind, value = self.kind, self.value
+        if kind == IRI:
+            node = default_cache.uriref(self.resolve(value))
+        elif kind == PNAME:
+            prefix, _, local = value.partition(':')
+            try:
+                namespace = self.prefixes[prefix]
+            except KeyError:
+                self.error("prefix '%s' is not bound" % prefix)
+            if '\\' in local:
+                local = _local_escape.sub('\\1', local)
+            node = default_cache.uriref(namespace + local)
+        else:
+            try:
+                node = self.bnodes[value]
+            except KeyError:
+                node = self.bnodes[value] = BNode()
+        self.advance()
+        return node
+
+    def resolve(self, iri):
+        """the absolute IRI of the content of an IRI token"""
+        if '\\' in iri:
+            iri = self.unescape(iri)
+        if self.base and not _absolute(iri):
+            try:
+                iri = join(self.base, iri)
+            except ValueError as e:
+                self.error(str(e))
+        return iri
+
+    def unescape(self, value):
+        try:
+            return _escape.sub(_unescape_char, value)
+        except ValueError as e:
+            self.error(str(e))
+
+    def literal(self):
+        value = self.value
+        if '\\' in value:
+            value = self.unescape(value)
+        self.advance()
+        if self.kind == AT:
+            node = default_cache.literal(value, lang=self.value)
+            self.advance()
+        elif self.kind == PUNCT and self.value == '^^':
+            self.advance()
+            if self.kind != IRI and self.kind != PNAME:
+                self.unexpected('datatype IRI')
+            node = default_cache.literal(value, datatype=self.node())
+        else:
+            node = default_cache.literal(value)
+        return node
+
+    def blank_node_property_list(self):
+        self.advance()
+        node = BNode()
+        if self.kind == PUNCT and self.value == ']':
+            self.advance()
+            return node
+        self.predicate_object_list(node)
+        self.expect(']')
+        return node
+
+    def collection(self):
+        self.advance()
+        items = []
+        while not (self.kind == PUNCT and self.value == ')'):
+            if self.kind == END:
+                self.unexpected("')'")
+            items.append(self.object())
+        self.advance()
+        if not items:
+            return self.rdf_nil
+        head = node = BNode()
+        for i, item in enumerate(items):
+            self.add(node, self.rdf_first, item)
+            rest = BNode() if i + 1 < len(items) else self.rdf_nil
+            self.add(node, self.rdf_rest, rest)
+            node = rest
+        return head
+
+
+class TurtleParser(Parser):
+
+    """
+    An RDFLib parser for Turtle, see the module documentation.
+
+    The parser only adds triples to, and binds namespaces in, the graph,
+    so it also parses into the sinks of rdflib.plugins.parsers.sinks.
+    """
+
+    def __init__(self):
+        pass
+
+    def parse(self, source, graph, encoding="utf-8"):
+        if encoding not in [None, "utf-8"]:
+            raise Exception(
+                "Turtle files are always utf-8 encoded, I was passed: %s"
+                % encoding)
+        text = source.getByteStream().read()
+        if not isinstance(text, str):
+            text = text.decode('utf-8')
+        if text.startswith(codecs.BOM_UTF8.decode('utf-8')):
+            text = text[1:]
+
+        base = graph.absolutize(
+            source.getPublicId() or source.getSystemId() or "")
+        reader = _Reader(text, graph, base)
+        reader.parse()
+        for prefix, namespace in reader.prefixes.items():
+            graph.bind(prefix, namespace)
@@ -2,9 +2,9 @@ import warnings
 
 from rdflib.term import Literal
 from rdflib.serializer import Serializer
-from rdflib.py3compat import b
 
-from rdflib.plugins.serializers.nt import _quoteLiteral
+from rdflib.plugins.serializers.nt import _quoteLiteral, _term_encoder, \
+    _write_lines
 
 __all__ = ['NQuadsSerializer']
 
@@ -19,17 +19,21 @@ class NQuadsSerializer(Serializer):
 
         super(NQuadsSerializer, self).__init__(store)
 
-    def serialize(self, stream, base=None, encoding=None, **args):
+    def serialize(self, stream, base=None, encoding=None, gzip=False,
+                  **args):
         if base is not None:
             warnings.warn("NQuadsSerializer does not support base.")
         if encoding is not None:
             warnings.warn("NQuadsSerializer does not use custom encoding.")
         encoding = self.encoding
-        for context in self.store.contexts():
-            for triple in context:
-                stream.write(_nq_row(
-                    triple, context.identifier).encode(encoding, "replace"))
-        stream.write(b("\n"))
+        term = _term_encoder(encoding, "replace")
+
+        def lines():
+            for context in self.store.contexts():
+                c = term(context.identifier)
+                for s, p, o in context:
+                    yield b' '.join((term(s), term(p), term(o), c, b'.\n'))
+        _write_lines(stream, lines(), gzip)
 
 
 def _nq_row(triple, context):
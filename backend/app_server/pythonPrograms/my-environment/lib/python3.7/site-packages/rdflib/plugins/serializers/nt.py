@@ -2,7 +2,21 @@
 N-Triples RDF graph serializer for RDFLib.
 See <http://www.w3.org/TR/rdf-testcases/#ntriples> for details about the
 format.
+
+The nodes are encoded once (a bounded cache keeps the bytes of the nodes
+met recently), and the lines are written in large batches. With
+``gzip=True`` the output is gzip compressed::
+
+    g.serialize('catalog.nt.gz', format='nt', gzip=True)
+
+A store without contexts that has its own encoding of the nodes can
+provide ``ntriples_lines(ascii)``, returning the N-Triples lines of all
+its triples as bytes (escaped to ASCII if ascii is true): the graph is
+then serialized without creating its nodes. The MappedStore does so.
 """
+from itertools import islice
+from gzip import GzipFile
+
 from rdflib.term import Literal
 from rdflib.serializer import Serializer
 from rdflib.py3compat import b
@@ -12,6 +26,11 @@ import codecs
 
 __all__ = ['NTSerializer']
 
+# number of lines written at once
+BATCH_SIZE = 10000
+# number of encoded nodes kept while serializing
+TERM_CACHE = 65536
+
 
 class NTSerializer(Serializer):
     """
@@ -22,15 +41,23 @@ class NTSerializer(Serializer):
         Serializer.__init__(self, store)
         self.encoding = 'ascii' # n-triples are ascii encoded
 
-    def serialize(self, stream, base=None, encoding=None, **args):
+    def serialize(self, stream, base=None, encoding=None, gzip=False,
+                  **args):
         if base is not None:
             warnings.warn("NTSerializer does not support base.")
         if encoding is not None:
             warnings.warn("NTSerializer does not use custom encoding.")
         encoding = self.encoding
-        for triple in self.store:
-            stream.write(_nt_row(triple).encode(self.encoding, "_rdflib_nt_escape"))
-        stream.write(b("\n"))
+        store = self.store.store
+        ntriples_lines = getattr(store, 'ntriples_lines', None)
+        if ntriples_lines is not None and not store.context_aware:
+            # the graph is the whole store
+            lines = ntriples_lines(encoding == 'ascii')
+        else:
+            term = _term_encoder(encoding, "_rdflib_nt_escape")
+            lines = (b' '.join((term(s), term(p), term(o), b'.\n'))
+                     for s, p, o in self.store)
+        _write_lines(stream, lines, gzip)
 
 
 class NT11Serializer(NTSerializer):
@@ -44,6 +71,42 @@ class NT11Serializer(NTSerializer):
         Serializer.__init__(self, store) # default to utf-8
 
 
+def _term_encoder(encoding, errors):
+    """return a function encoding nodes as in N-Triples, through a cache"""
+    cache = {}
+
+    def term(node):
+        try:
+            return cache[node]
+        except KeyError:
+            if len(cache) >= TERM_CACHE:
+                cache.clear()
+            if isinstance(node, Literal):
+                text = _quoteLiteral(node)
+            else:
+                text = node.n3()
+            data = cache[node] = text.encode(encoding, errors)
+            return data
+    return term
+
+
+def _write_lines(stream, lines, gzip=False):
+    """write the lines (bytes) in batches, followed by an empty line, gzip
+    compressed if asked"""
+    if gzip:
+        stream = GzipFile(fileobj=stream, mode='wb')
+    lines = iter(lines)
+    while True:
+        batch = list(islice(lines, BATCH_SIZE))
+        if not batch:
+            break
+        stream.write(b''.join(batch))
+    stream.write(b("\n"))
+    if gzip:
+        # only ends the compressed stream, not the file
+        stream.close()
+
+
 def _nt_row(triple):
     if isinstance(triple[2], Literal):
         return "%s %s %s .\n" % (
@@ -1,18 +1,39 @@
 """
 Turtle RDF graph serializer for RDFLib.
 See <http://www.w3.org/TeamSubmission/turtle/> for syntax specification.
+
+The serializer walks the whole graph first, to order the subjects, count
+the references to the blank nodes (to nest them) and find the prefixes.
+With ``streaming=True`` it writes the triples as they are scanned
+instead, in bounded memory::
+
+    g.serialize('report.ttl', format='turtle', streaming=True)
+
+The prefixes are then those bound in the graph, written first (and no
+prefix is generated), the triples of consecutive subjects are written as
+one statement (with the objects in the order of the scan), and the blank
+nodes are written as labels. The stores that
+scan their triples in subject order (CompactMemory, MappedStore) thus
+give one statement per subject; with other stores a subject may be split
+over several statements, which is the same graph.
 """
 
 from collections import defaultdict
+from itertools import groupby
 
 from rdflib.compat import cmp_to_key
-from rdflib.term import BNode, Literal, URIRef
+from rdflib.term import BNode, Literal, URIRef, _is_valid_uri
 from rdflib.exceptions import Error
 from rdflib.serializer import Serializer
-from rdflib.namespace import RDF, RDFS
+from rdflib.namespace import RDF, RDFS, split_uri
 
 __all__ = ['RecursiveSerializer', 'TurtleSerializer']
 
+# number of statements written at once when streaming
+BATCH_SIZE = 1000
+# number of node labels kept while streaming
+TERM_CACHE = 65536
+
 def _object_comparator(a,b):
     """
     for nice clean output we sort the objects of triples,
@@ -210,7 +231,7 @@ class TurtleSerializer(RecursiveSerializer):
         self._ns_rewrite = {}
 
     def serialize(self, stream, base=None, encoding=None,
-                  spacious=None, **args):
+                  spacious=None, streaming=False, **args):
         self.reset()
         self.stream = stream
         self.base = base
@@ -218,6 +239,13 @@ class TurtleSerializer(RecursiveSerializer):
         if spacious is not None:
             self._spacious = spacious
 
+        if streaming:
+            self.startDocument()
+            self.streamStatements()
+            self.endDocument()
+            stream.write("\n".encode('ascii'))
+            return
+
         self.preprocess()
         subjects_list = self.orderSubjects()
 
@@ -276,6 +304,87 @@ class TurtleSerializer(RecursiveSerializer):
 
         return '%s:%s' % (prefix, local)
 
+    def streamStatements(self):
+        """write the triples grouped by subject as they are scanned, see
+        the module documentation"""
+        prefixes = {}
+        for prefix, namespace in sorted(self.namespaces.items(),
+                                        reverse=True):
+            # split_uri returns strings, which do not hash as URIRefs
+            prefixes[str(namespace)] = prefix
+        keywords = self.keywords
+        nil = RDF.nil
+        labels = {}
+        datatypes = {}
+
+        def qname(uri):
+            if not _is_valid_uri(uri):
+                return None
+            try:
+                namespace, local = split_uri(uri)
+            except Exception:
+                # is the uri a namespace in itself?
+                namespace, local = uri, ''
+            prefix = prefixes.get(namespace)
+            if prefix is None or local.endswith('.'):
+                return None
+            return '%s:%s' % (prefix, local)
+
+        def datatype(uri):
+            try:
+                return datatypes[uri]
+            except KeyError:
+                if len(datatypes) >= TERM_CACHE:
+                    datatypes.clear()
+                text = datatypes[uri] = qname(uri)
+                return text
+
+        def label(node):
+            # literals are seldom repeated, and slow to hash
+            if isinstance(node, Literal):
+                return node._literal_n3(use_plain=True,
+                                        qname_callback=datatype)
+            try:
+                return labels[node]
+            except KeyError:
+                if len(labels) >= TERM_CACHE:
+                    labels.clear()
+                if node == nil:
+                    text = '()'
+                else:
+                    uri = self.relativize(node)
+                    text = qname(uri) or uri.n3()
+                labels[node] = text
+                return text
+
+        first = self.predicateOrder
+        predicate_separator = ' ;\n' + self.indentString
+        object_separator = ',\n' + self.indentString * 2
+        batch = []
+        triples = self.store.triples((None, None, None))
+        for subject, group in groupby(triples, key=lambda t: t[0]):
+            properties = defaultdict(list)
+            for s, p, o in group:
+                properties[p].append(o)
+            # the objects are left in the order of the scan, comparing
+            # literals is slow
+            predicates = [p for p in first if p in properties]
+            predicates.extend(sorted(p for p in properties if p not in first))
+            parts = ['\n', label(subject), ' ']
+            for i, predicate in enumerate(predicates):
+                if i:
+                    parts.append(predicate_separator)
+                parts.append(keywords.get(predicate) or label(predicate))
+                parts.append(' ')
+                parts.append(object_separator.join(
+                    label(o) for o in properties[predicate]))
+            parts.append(' .\n')
+            batch.append(''.join(parts))
+            if len(batch) >= BATCH_SIZE:
+                self.write(''.join(batch))
+                batch = []
+        self.write(''.join(batch))
+
     def startDocument(self):
         self._started = True
         ns_list = sorted(self.namespaces.items())
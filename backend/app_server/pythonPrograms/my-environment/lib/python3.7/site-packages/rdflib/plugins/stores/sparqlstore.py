@@ -11,13 +11,21 @@ LIMIT = 'LIMIT'
 OFFSET = 'OFFSET'
 ORDERBY = 'ORDER BY'
 
+# Default bounds of the INSERT DATA requests of SPARQLUpdateStore.bulk_add
+BULK_MAX_TRIPLES = 10000
+BULK_MAX_BYTES = 4 * 1024 * 1024
+
 import re
 import collections
 import warnings
 import contextlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from SPARQLWrapper import SPARQLWrapper, XML, POST, GET, URLENCODED, POSTDIRECTLY
+    from SPARQLWrapper import POOLED, ConnectionPool
+    from SPARQLWrapper.ConnectionPool import DEFAULT_POOL_SIZE
 except ImportError:
     raise Exception(
         "SPARQLWrapper not found! SPARQL Store will not work." +
@@ -29,8 +37,10 @@ from rdflib.plugins.stores.regexmatching import NATIVE_REGEX
 from rdflib.store import Store
 from rdflib.query import Result
 from rdflib import Variable, Namespace, BNode, URIRef, Literal
-from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID, ConjunctiveGraph
+from rdflib.plugins.sparql import CUSTOM_EVALS
 from rdflib.term import Node
+from rdflib.termcache import default_cache
 
 class NSSPARQLWrapper(SPARQLWrapper):
     nsBindings = {}
@@ -84,17 +94,17 @@ def _node_from_result(node):
     if node.tag == '{%s}bnode' % SPARQL_NS:
         return BNode(node.text)
     elif node.tag == '{%s}uri' % SPARQL_NS:
-        return URIRef(node.text)
+        return default_cache.uriref(node.text)
     elif node.tag == '{%s}literal' % SPARQL_NS:
         value = node.text if node.text is not None else ''
         if 'datatype' in node.attrib:
-            dt = URIRef(node.attrib['datatype'])
-            return Literal(value, datatype=dt)
+            dt = default_cache.uriref(node.attrib['datatype'])
+            return default_cache.literal(value, datatype=dt)
         elif '{http://www.w3.org/XML/1998/namespace}lang' in node.attrib:
-            return Literal(value, lang=node.attrib[
+            return default_cache.literal(value, lang=node.attrib[
                 "{http://www.w3.org/XML/1998/namespace}lang"])
         else:
-            return Literal(value)
+            return default_cache.literal(value)
     else:
         raise Exception('Unknown answer type')
 
@@ -153,6 +163,48 @@ def _traverse_sparql_result_dom(
             yield __locproc(values), vars_
 
 
+def _iter_sparql_result_xml(
+        source, as_dictionary=False, node_from_result=_node_from_result):
+    """
+    Returns a generator over tuples of results, like
+    _traverse_sparql_result_dom, but reading the XML document
+    incrementally from source: every result element is dropped once
+    it has been converted, so memory does not grow with the number of
+    results and the first results are returned before the whole
+    response has been received.
+    """
+    head_tag = '{%s}head' % SPARQL_NS
+    variable_tag = '{%s}variable' % SPARQL_NS
+    results_tag = '{%s}results' % SPARQL_NS
+    result_tag = '{%s}result' % SPARQL_NS
+    vars_ = []
+    results = None
+    for event, elem in etree.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if elem.tag == results_tag:
+                results = elem
+            continue
+        if elem.tag == result_tag:
+            curr_bind = {}
+            values = []
+            for binding in elem:
+                term = node_from_result(binding[0])
+                values.append(term)
+                curr_bind[Variable(binding.attrib["name"])] = term
+            if results is not None:
+                results.remove(elem)
+            else:
+                elem.clear()
+            if as_dictionary:
+                yield curr_bind, vars_
+            elif len(values) == 1:
+                yield values[0], vars_
+            else:
+                yield tuple(values), vars_
+        elif elem.tag == head_tag:
+            vars_ = [Variable(v.attrib["name"]) for v in elem.iter(variable_tag)]
+
+
 def TraverseSPARQLResultDOM(doc, asDictionary=False):
     warnings.warn(
         "Call to deprecated function TraverseSPARQLResultDOM, use "
@@ -212,6 +264,19 @@ class SPARQLStore(NSSPARQLWrapper, Store):
     >>> store = SPARQLStore('http://dbpedia.org/sparql',
     ...                     node_to_sparql=my_bnode_ext)
 
+    Remote graphs can be iterated in pages of page_size triples, so that
+    endpoints capping the number of results (e.g. Virtuoso's
+    ResultSetMaxRows) return complete answers. With prefetch=True the
+    next page is requested on a worker thread while the current one is
+    being consumed:
+
+    >>> store = SPARQLStore('http://dbpedia.org/sparql',
+    ...                     page_size=10000, prefetch=True)
+
+    When rdflib's own SPARQL engine runs over this store (e.g. prepared
+    queries or tools like pySHACL), every basic graph pattern is sent to
+    the endpoint as a single query, unless evaluate_bgp=False.
+
     """
     formula_aware = False
     transaction_aware = False
@@ -224,6 +289,7 @@ class SPARQLStore(NSSPARQLWrapper, Store):
                  node_to_sparql=_node_to_sparql,
                  node_from_result=_node_from_result,
                  default_query_method=GET,
+                 page_size=None, prefetch=False, evaluate_bgp=True,
                  **sparqlwrapper_kwargs):
         """
         """
@@ -245,6 +311,9 @@ class SPARQLStore(NSSPARQLWrapper, Store):
         self.graph_aware = context_aware
         self._timeout = None
         self.query_method = default_query_method
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.evaluate_bgp = evaluate_bgp
 
     # Database Management Methods
     def create(self, configuration):
@@ -376,6 +445,16 @@ class SPARQLStore(NSSPARQLWrapper, Store):
         nts = self.node_to_sparql
         query = "SELECT %s WHERE { %s %s %s }" % (v, nts(s), nts(p), nts(o))
 
+        if self.page_size and vars and not (hasattr(context, LIMIT) or
+                                            hasattr(context, OFFSET) or
+                                            hasattr(context, ORDERBY)):
+            for rt in self._paged_results(query + ' %s %s' % (ORDERBY, v),
+                                          context):
+                yield (rt.get(s, s),
+                       rt.get(p, p),
+                       rt.get(o, o)), None
+            return
+
         # The ORDER BY is necessary
         if hasattr(context, LIMIT) or hasattr(context, OFFSET) \
                 or hasattr(context, ORDERBY):
@@ -406,17 +485,93 @@ class SPARQLStore(NSSPARQLWrapper, Store):
         self.timeout = self._timeout
         self.setQuery(query)
 
+        # the response stays open while the triples are consumed
         with contextlib.closing(SPARQLWrapper.query(self).response) as res:
-            doc = etree.parse(res)
+            for rt, vars in _iter_sparql_result_xml(
+                    res,
+                    as_dictionary=True,
+                    node_from_result=self.node_from_result):
+                yield (rt.get(s, s),
+                       rt.get(p, p),
+                       rt.get(o, o)), None
 
-        # ElementTree.dump(doc)
-        for rt, vars in _traverse_sparql_result_dom(
-                doc,
-                as_dictionary=True,
-                node_from_result=self.node_from_result):
-            yield (rt.get(s, s),
-                   rt.get(p, p),
-                   rt.get(o, o)), None
+    def _page_request(self, query, context):
+        """
+        Sets up the wrapper for query and returns its request, which can
+        be sent from another thread with _fetch_page
+        """
+        self.resetQuery()
+        if self._is_contextual(context):
+            self.addParameter("default-graph-uri", context.identifier)
+        self.timeout = self._timeout
+        self.setQuery(query)
+        return self._createRequest()
+
+    def _fetch_page(self, request):
+        with contextlib.closing(self._openRequest(request)) as res:
+            return [rt for rt, vars in _iter_sparql_result_xml(
+                res, as_dictionary=True,
+                node_from_result=self.node_from_result)]
+
+    def _select(self, query, context):
+        with contextlib.closing(self._openRequest(
+                self._page_request(query, context))) as res:
+            for rt, vars in _iter_sparql_result_xml(
+                    res, as_dictionary=True,
+                    node_from_result=self.node_from_result):
+                yield rt
+
+    def _evaluate_bgp(self, triples, variables, context):
+        """
+        Returns a generator over the solutions (dictionaries from the
+        variables to their values) of a basic graph pattern, evaluated
+        remotely as a single query.
+        """
+        nts = self.node_to_sparql
+        projection = ' '.join(var.n3() for var in variables)
+        query = "SELECT %s WHERE { %s }" % (projection, ' . '.join(
+            '%s %s %s' % (nts(s), nts(p), nts(o)) for s, p, o in triples))
+        if self.page_size:
+            return self._paged_results(
+                query + ' %s %s' % (ORDERBY, projection), context)
+        return self._select(query, context)
+
+    def _paged_results(self, query, context):
+        """
+        Returns a generator over the results of an ordered query, issued
+        in pages of page_size results (LIMIT/OFFSET); with prefetch, the
+        next page is fetched on a worker thread while the results of the
+        current one are consumed.
+        """
+        size = self.page_size
+        executor = ThreadPoolExecutor(1) if self.prefetch else None
+        pending = None
+        offset = 0
+        try:
+            while True:
+                if pending is not None:
+                    page = pending.result()
+                    pending = None
+                else:
+                    page = self._fetch_page(self._page_request(
+                        '%s LIMIT %d OFFSET %d' % (query, size, offset),
+                        context))
+                offset += size
+                # a short page is the last one
+                if len(page) == size and executor is not None:
+                    pending = executor.submit(
+                        self._fetch_page, self._page_request(
+                            '%s LIMIT %d OFFSET %d' % (query, size, offset),
+                            context))
+                for rt in page:
+                    yield rt
+                if len(page) < size:
+                    return
+        finally:
+            if pending is not None:
+                pending.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False)
 
     def triples_choices(self, xxx_todo_changeme3, context=None):
         """
@@ -442,15 +597,13 @@ class SPARQLStore(NSSPARQLWrapper, Store):
             self.setQuery(q)
 
             with contextlib.closing(SPARQLWrapper.query(self).response) as res:
-                doc = etree.parse(res)
-
-            rt, vars = next(iter(
-                _traverse_sparql_result_dom(
-                    doc,
-                    as_dictionary=True,
-                    node_from_result=self.node_from_result
+                rt, vars = next(
+                    _iter_sparql_result_xml(
+                        res,
+                        as_dictionary=True,
+                        node_from_result=self.node_from_result
+                    )
                 )
-            ))
             return int(rt.get(Variable("c")))
 
     def contexts(self, triple=None):
@@ -479,14 +632,15 @@ class SPARQLStore(NSSPARQLWrapper, Store):
         else:
             self.setQuery('SELECT ?name WHERE { GRAPH ?name {} }')
 
-        with contextlib.closing(SPARQLWrapper.query(self).response) as res:
-            doc = etree.parse(res)
+        res = SPARQLWrapper.query(self).response
+        return self._contexts(res)
 
-        return (
-            rt.get(Variable("name"))
-            for rt, vars in _traverse_sparql_result_dom(
-                doc, as_dictionary=True, node_from_result=self.node_from_result)
-        )
+    def _contexts(self, res):
+        with contextlib.closing(res):
+            for rt, vars in _iter_sparql_result_xml(
+                    res, as_dictionary=True,
+                    node_from_result=self.node_from_result):
+                yield rt.get(Variable("name"))
 
     # Namespace persistence interface implementation
     def bind(self, prefix, namespace):
@@ -630,6 +784,11 @@ class SPARQLUpdateStore(SPARQLStore):
             self.commit()
         return SPARQLStore.__len__(self, *args, **kwargs)
 
+    def _evaluate_bgp(self, *args, **kwargs):
+        if not self.autocommit:
+            self.commit()
+        return SPARQLStore._evaluate_bgp(self, *args, **kwargs)
+
     def open(self, configuration, create=False):
         """
         sets the endpoint URLs for this SPARQLStore
@@ -753,21 +912,151 @@ class SPARQLUpdateStore(SPARQLStore):
     def setTimeout(self, timeout):
         self._timeout = int(timeout)
 
-    def _do_update(self, update):
+    def _update_request(self, update):
         self.resetQuery()
         self.setQuery(update)
         self.setMethod(POST)
         self.timeout = self._timeout
         self.setRequestMethod(URLENCODED if self.postAsEncoded else POSTDIRECTLY)
+        return self._createRequest()
 
-        result = SPARQLWrapper.query(self)
-
+    def _send_update(self, request):
         # we must read (and discard) the whole response
         # otherwise the network socket buffer will at some point be "full"
         # and we will block
-        with contextlib.closing(result.response) as res:
+        with contextlib.closing(self._openRequest(request, False)) as res:
             res.read()
 
+    def _do_update(self, update):
+        self._send_update(self._update_request(update))
+
+    def _insert_data_chunks(self, quads, max_triples, max_bytes):
+        """
+        Returns a generator over (INSERT DATA update, number of triples)
+        tuples, grouping consecutive quads of the same context in GRAPH
+        blocks; every update has at most max_triples triples and, unless a
+        single triple is larger, max_bytes bytes of UTF-8 encoded triples.
+        """
+        nts = self.node_to_sparql
+        blocks = []
+        lines = []
+        graph = None
+        count = size = 0
+        for subject, predicate, obj, context in quads:
+            if not self._is_contextual(context):
+                context_graph = None
+            else:
+                context_graph = nts(context.identifier)
+            line = "%s %s %s ." % (nts(subject), nts(predicate), nts(obj))
+            length = len(line.encode('utf-8')) + 1
+            if count and (count >= max_triples or
+                          size + length > max_bytes):
+                blocks.append((graph, lines))
+                yield self._insert_data(blocks), count
+                blocks, lines, count, size = [], [], 0, 0
+            if context_graph != graph and lines:
+                blocks.append((graph, lines))
+                lines = []
+            graph = context_graph
+            lines.append(line)
+            count += 1
+            size += length
+        if count:
+            blocks.append((graph, lines))
+            yield self._insert_data(blocks), count
+
+    def _insert_data(self, blocks):
+        data = []
+        for graph, lines in blocks:
+            if graph is None:
+                data.append('\n'.join(lines))
+            else:
+                data.append("GRAPH %s {\n%s\n}" % (graph, '\n'.join(lines)))
+        return "INSERT DATA {\n%s\n}" % '\n'.join(data)
+
+    def bulk_add(self, quads, max_triples=BULK_MAX_TRIPLES,
+                 max_bytes=BULK_MAX_BYTES, workers=1, progress=None):
+        """
+        Loads an iterable of (s, p, o, context) quads with INSERT DATA
+        requests of bounded size, bypassing the transaction (pending edits
+        are committed first). Unlike addN, the quads are not held in
+        memory: they are consumed as the requests are sent.
+
+        - max_triples, max_bytes: bounds of each request. Endpoints often
+          reject large requests, and smaller ones keep the memory of both
+          sides flat.
+        - workers: number of requests sent in parallel. With more than
+          one, the store uses the POOLED transport of SPARQLWrapper while
+          loading, so the workers reuse keep-alive connections (the
+          connection pool of the store, or a new one of at least workers
+          connections).
+        - progress: optional callable, called with the statistics below
+          after every request.
+
+        Returns a dictionary of statistics: 'triples', 'requests', 'bytes'
+        (of the updates), 'seconds' and 'triples_per_second'.
+        """
+        if not self.endpoint:
+            raise Exception("UpdateEndpoint is not set - call 'open'")
+        self.commit()
+
+        stats = {'triples': 0, 'requests': 0, 'bytes': 0,
+                 'seconds': 0.0, 'triples_per_second': 0.0}
+        start = time.time()
+
+        def done(count, length):
+            stats['triples'] += count
+            stats['requests'] += 1
+            stats['bytes'] += length
+            stats['seconds'] = time.time() - start
+            if stats['seconds'] > 0:
+                stats['triples_per_second'] = \
+                    stats['triples'] / stats['seconds']
+            if progress is not None:
+                progress(dict(stats))
+
+        chunks = self._insert_data_chunks(quads, max_triples, max_bytes)
+        if workers <= 1:
+            for update, count in chunks:
+                self._do_update(update)
+                done(count, len(update.encode('utf-8')))
+            return stats
+
+        transport = self.transport
+        if transport != POOLED:
+            if self.connectionPool is None:
+                self.connectionPool = ConnectionPool(
+                    maxsize=max(workers, DEFAULT_POOL_SIZE))
+            self.transport = POOLED
+        try:
+            return self._bulk_send(chunks, workers, done, stats)
+        finally:
+            self.transport = transport
+
+    def _bulk_send(self, chunks, workers, done, stats):
+        """sends the updates of bulk_add with workers threads"""
+        # at most 2 * workers requests are built and waiting, so the
+        # memory does not depend on the number of quads
+        pending = collections.deque()
+        with ThreadPoolExecutor(workers) as executor:
+            try:
+                for update, count in chunks:
+                    if len(pending) >= 2 * workers:
+                        future, c, length = pending.popleft()
+                        future.result()
+                        done(c, length)
+                    pending.append((executor.submit(
+                        self._send_update, self._update_request(update)),
+                        count, len(update.encode('utf-8'))))
+                while pending:
+                    future, c, length = pending.popleft()
+                    future.result()
+                    done(c, length)
+            finally:
+                for future, c, length in pending:
+                    future.cancel()
+        return stats
+
     def update(self, query,
                initNs={},
                initBindings={},
@@ -903,3 +1192,61 @@ class SPARQLUpdateStore(SPARQLStore):
         else:
             self.update(
                 "DROP GRAPH %s" % self.node_to_sparql(graph.identifier))
+
+
+def _bgp_eval(ctx, part):
+    """
+    Custom evaluation function (see rdflib.plugins.sparql.CUSTOM_EVALS)
+    sending a whole basic graph pattern over a SPARQLStore to the endpoint
+    as one query, instead of one query per triple pattern and binding of
+    the previous patterns. Anything else, and patterns the endpoint cannot
+    be asked for (e.g. with values that are blank nodes), is left to the
+    local evaluation.
+    """
+    if part.name != 'BGP' or not part.triples:
+        raise NotImplementedError()
+    store = getattr(ctx.graph, 'store', None)
+    if not isinstance(store, SPARQLStore) or not store.evaluate_bgp:
+        raise NotImplementedError()
+
+    # bound variables are replaced by their values; unbound blank nodes
+    # of the pattern are labels, so they become variables
+    variables = {}
+    triples = []
+    for triple in part.triples:
+        terms = []
+        for term in triple:
+            value = ctx[term]
+            if value is None:
+                if term not in variables:
+                    variables[term] = term if isinstance(term, Variable) \
+                        else Variable('__b%d' % len(variables))
+                value = variables[term]
+            terms.append(value)
+        triples.append(tuple(terms))
+    if not variables:
+        raise NotImplementedError()
+    try:
+        for triple in triples:
+            for term in triple:
+                store.node_to_sparql(term)
+    except Exception:
+        raise NotImplementedError()
+
+    context = None if isinstance(ctx.graph, ConjunctiveGraph) else ctx.graph
+    names = dict((var, term) for term, var in list(variables.items()))
+    return _bgp_solutions(
+        ctx, store._evaluate_bgp(triples, list(variables.values()), context),
+        names)
+
+
+def _bgp_solutions(ctx, results, names):
+    for rt in results:
+        c = ctx.push()
+        for var, value in list(rt.items()):
+            c[names[var]] = value
+        yield c.solution()
+
+
+CUSTOM_EVALS['sparqlstore_bgp'] = _bgp_eval
+
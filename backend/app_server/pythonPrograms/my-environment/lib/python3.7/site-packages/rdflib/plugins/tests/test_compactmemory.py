@@ -0,0 +1,154 @@
+"""
+Tests of the CompactMemory store, compared with IOMemory: adds, removes
+and re-adds on both sides of a merge of the buffers into the sorted
+permutations, and triple patterns answered by every permutation.
+Run: python -m unittest rdflib.plugins.tests.test_compactmemory
+"""
+
+import itertools
+import random
+import unittest
+from unittest import mock
+
+from rdflib import ConjunctiveGraph, Graph, Literal, Namespace
+from rdflib.plugins import compactmemory
+from rdflib.plugins.compactmemory import CompactMemory
+
+EX = Namespace('http://example.org/')
+
+NODES = [EX['n%d' % i] for i in range(5)]
+PREDICATES = [EX['p%d' % i] for i in range(3)]
+OBJECTS = NODES[:3] + [Literal('v'), Literal(1), Literal('v', lang='en')]
+GRAPHS = [EX.g0, EX.g1, EX.g2]
+
+# (READ_MERGE, WRITE_MERGE): never merge before reads, merge before every
+# read, merge on (almost) every write
+THRESHOLDS = [(10 ** 9, 10 ** 9), (0, 10 ** 9), (10 ** 9, 1), (2, 3)]
+
+
+def patterns():
+    """patterns using every permutation: SPOC, POSC and OSPC"""
+    s, p, o = NODES[0], PREDICATES[0], OBJECTS[0]
+    for bound in itertools.product((False, True), repeat=3):
+        yield (s if bound[0] else None, p if bound[1] else None,
+               o if bound[2] else None)
+    # nodes unknown to the store
+    yield (EX.unknown, None, None)
+    yield (None, None, Literal('unknown'))
+
+
+def state(graph):
+    """the triples of a ConjunctiveGraph, with their contexts, matched by
+    every pattern in the union and in every context, and the lengths"""
+    store = graph.store
+    result = {}
+    contexts = [None] + [graph.get_context(g) for g in GRAPHS]
+    for context in contexts:
+        name = context and context.identifier
+        for pattern in itertools.chain(patterns(), [
+                (s, p, o) for s in NODES[:2] for p in PREDICATES[:2]
+                for o in OBJECTS]):
+            result[name, pattern] = sorted(
+                (triple, sorted(c.identifier for c in found))
+                for triple, found in store.triples(pattern, context))
+    # last, len() merges the buffers
+    for context in contexts:
+        result[context and context.identifier, 'len'] = \
+            len(store) if context is None else len(context)
+    result['contexts'] = sorted(c.identifier for c in graph.contexts())
+    return result
+
+
+class TestCompactMemory(unittest.TestCase):
+
+    def graphs(self):
+        return ConjunctiveGraph('CompactMemory'), ConjunctiveGraph('IOMemory')
+
+    def assertSame(self, compact, reference, message=''):
+        self.assertEqual(state(compact), state(reference), message)
+
+    def test_random_changes(self):
+        for read_merge, write_merge in THRESHOLDS:
+            with mock.patch.object(compactmemory, 'READ_MERGE', read_merge), \
+                    mock.patch.object(compactmemory, 'WRITE_MERGE',
+                                      write_merge):
+                rng = random.Random(read_merge * 7 + write_merge)
+                compact, reference = self.graphs()
+                for step in range(150):
+                    context = rng.choice(GRAPHS)
+                    triple = (rng.choice(NODES), rng.choice(PREDICATES),
+                              rng.choice(OBJECTS))
+                    action = rng.random()
+                    for graph in (compact, reference):
+                        if action < 0.5:
+                            graph.get_context(context).add(triple)
+                        elif action < 0.7:
+                            graph.addN([triple + (graph.get_context(c),)
+                                        for c in GRAPHS[:2]])
+                        elif action < 0.9:
+                            graph.get_context(context).remove(
+                                (triple[0], None, triple[2]))
+                        else:
+                            graph.remove((triple[0], None, None))
+                    if step % 10 == 0:
+                        self.assertSame(compact, reference, (
+                            read_merge, write_merge, step))
+                self.assertSame(compact, reference)
+
+    def test_readd_across_merge(self):
+        quad = (EX.s, EX.p, EX.o)
+        with mock.patch.object(compactmemory, 'READ_MERGE', 10 ** 9), \
+                mock.patch.object(compactmemory, 'WRITE_MERGE', 10 ** 9):
+            graph = Graph('CompactMemory')
+            graph.add(quad)
+            # merged into the permutations
+            self.assertEqual(len(graph), 1)
+            graph.remove(quad)
+            # removed in the buffer, the merged quad is hidden
+            self.assertEqual(list(graph), [])
+            graph.add(quad)
+            self.assertEqual(list(graph), [quad])
+            graph.remove(quad)
+            graph.add(quad)
+            graph.add(quad)
+            self.assertEqual(len(graph), 1)
+            graph.remove(quad)
+            self.assertEqual(len(graph), 0)
+            self.assertEqual(list(graph.triples((EX.s, None, None))), [])
+
+    def test_first_and_last_rows(self):
+        # the prefixes at both ends of a permutation, around the boundary
+        # of the range scans
+        graph = Graph('CompactMemory')
+        for i in range(10):
+            graph.add((EX['s%d' % i], EX.p, Literal(i)))
+        for i in (0, 9):
+            s = EX['s%d' % i]
+            self.assertEqual(list(graph.triples((s, None, None))),
+                             [(s, EX.p, Literal(i))])
+            self.assertEqual(list(graph.triples((None, None, Literal(i)))),
+                             [(s, EX.p, Literal(i))])
+        self.assertEqual(len(list(graph.triples((None, EX.p, None)))), 10)
+
+    def test_contexts(self):
+        graph = ConjunctiveGraph('CompactMemory')
+        triple = (EX.s, EX.p, EX.o)
+        for g in GRAPHS:
+            graph.get_context(g).add(triple)
+        self.assertEqual(sorted(c.identifier for c in graph.contexts(triple)),
+                         GRAPHS)
+        self.assertEqual(len(graph), 1)
+        graph.remove_context(graph.get_context(EX.g0))
+        self.assertEqual(len(graph.get_context(EX.g0)), 0)
+        self.assertEqual(len(graph.get_context(EX.g1)), 1)
+        graph.store.remove_graph(graph.get_context(EX.g1))
+        self.assertNotIn(EX.g1, [c.identifier for c in graph.contexts()])
+
+    def test_quoted(self):
+        store = CompactMemory()
+        self.assertRaises(NotImplementedError, store.add,
+                          (EX.s, EX.p, EX.o), Graph(), True)
+
+
+if __name__ == "__main__":
+    unittest.main()
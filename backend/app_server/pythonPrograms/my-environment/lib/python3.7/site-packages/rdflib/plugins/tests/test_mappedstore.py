@@ -0,0 +1,208 @@
+"""
+Tests of the MappedStore: building from a graph and from N-Triples,
+reopening, triple pattern lookups, open scans across close(), and the
+N-Triples lines made from the encoded nodes.
+Run: python -m unittest rdflib.plugins.tests.test_mappedstore
+"""
+
+import gc
+import io
+import itertools
+import os
+import shutil
+import tempfile
+import unittest
+
+from rdflib import BNode, Graph, Literal, Namespace, URIRef, XSD
+from rdflib.compare import isomorphic
+from rdflib.plugins.mappedstore import MappedStore, build, build_ntriples
+
+EX = Namespace('http://example.org/')
+
+LITERALS = [
+    Literal('plain'),
+    Literal(''),
+    Literal('chat', lang='fr'),
+    Literal('colour', lang='en-GB'),
+    Literal('1', datatype=XSD.integer),
+    Literal('01', datatype=XSD.integer),
+    Literal('2020-01-01', datatype=XSD.date),
+    Literal('x', datatype=EX.custom),
+    Literal('line\nbreak\rreturn\ttab'),
+    Literal('"quoted" and back\\slash'),
+    Literal('café 日本 \U0001F600'),
+    Literal('café', lang='es'),
+    Literal('été', datatype=EX.custom),
+]
+
+
+def catalog():
+    graph = Graph()
+    graph.bind('ex', EX)
+    graph.add((EX.catalog, EX.title, Literal('Catalog')))
+    for i in range(30):
+        dataset = EX['dataset%d' % i]
+        graph.add((EX.catalog, EX.dataset, dataset))
+        graph.add((dataset, EX.title, LITERALS[i % len(LITERALS)]))
+        graph.add((dataset, EX.theme, EX['theme%d' % (i % 4)]))
+        graph.add((dataset, EX.size, Literal(i)))
+        distribution = BNode('d%d' % i)
+        graph.add((dataset, EX.distribution, distribution))
+        graph.add((distribution, EX.url, URIRef('http://example.org/f/é%d' % i)))
+    for literal in LITERALS:
+        graph.add((EX.literals, EX.value, literal))
+    return graph
+
+
+class TestMappedStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.graph = catalog()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open(self, name):
+        graph = Graph('MappedStore')
+        graph.open(os.path.join(self.directory, name))
+        self.addCleanup(graph.close)
+        return graph
+
+    def built(self):
+        build(os.path.join(self.directory, 'store'), self.graph,
+              self.graph.namespaces())
+        return self.open('store')
+
+    def test_build_from_graph(self):
+        mapped = self.built()
+        self.assertEqual(len(mapped), len(self.graph))
+        self.assertTrue(isomorphic(mapped, self.graph))
+        self.assertEqual(mapped.store.namespace('ex'), URIRef(EX))
+
+    def test_build_from_ntriples(self):
+        data = self.graph.serialize(format='nt')
+        path = os.path.join(self.directory, 'data.nt')
+        with open(path, 'wb') as f:
+            f.write(data)
+        build_ntriples(os.path.join(self.directory, 'file'), path)
+        build_ntriples(os.path.join(self.directory, 'stream'),
+                       io.BytesIO(data))
+        for name in ('file', 'stream'):
+            with self.subTest(name):
+                self.assertTrue(isomorphic(self.open(name), self.graph))
+
+    def test_duplicates_and_empty(self):
+        path = os.path.join(self.directory, 'store')
+        triple = (EX.s, EX.p, EX.o)
+        build(path, [triple, triple])
+        self.assertEqual(list(self.open('store')), [triple])
+        build(os.path.join(self.directory, 'empty'), [])
+        empty = self.open('empty')
+        self.assertEqual(len(empty), 0)
+        self.assertEqual(list(empty.triples((EX.s, None, None))), [])
+
+    def test_reopen(self):
+        self.built()
+        store = MappedStore()
+        path = os.path.join(self.directory, 'store')
+        for i in range(3):
+            store.open(path)
+            self.assertEqual(len(list(store.triples((None, None, None)))),
+                             len(self.graph))
+            store.close()
+        self.assertFalse(store.is_open())
+        self.assertEqual(MappedStore().open(
+            os.path.join(self.directory, 'missing')), -1)
+
+    def test_patterns(self):
+        mapped = self.built()
+        nodes = set(itertools.chain.from_iterable(self.graph))
+        subjects = sorted(set(self.graph.subjects()))[:8] + [EX.unknown]
+        predicates = sorted(set(self.graph.predicates())) + [EX.unknown]
+        objects = sorted(set(self.graph.objects()))[:20] + [EX.unknown]
+        self.assertTrue(set(objects[:-1]) <= nodes)
+        for pattern in itertools.product([None] + subjects,
+                                         [None] + predicates,
+                                         [None] + objects[::3]):
+            with self.subTest(pattern):
+                self.assertEqual(sorted(mapped.triples(pattern)),
+                                 sorted(self.graph.triples(pattern)))
+        for literal in LITERALS:
+            with self.subTest(literal):
+                self.assertEqual(
+                    sorted(mapped.subjects(EX.value, literal)), [EX.literals])
+        self.assertEqual(
+            len(list(mapped.triples((EX.literals, None, None)))),
+            len(list(self.graph.triples((EX.literals, None, None)))))
+
+    def test_read_only(self):
+        mapped = self.built()
+        self.assertRaises(TypeError, mapped.add, (EX.s, EX.p, EX.o))
+        self.assertRaises(TypeError, mapped.remove, (None, None, None))
+
+    def test_close_with_open_scans(self):
+        self.built()
+        store = MappedStore()
+        store.open(os.path.join(self.directory, 'store'))
+        triples = store.triples((None, EX.title, None))
+        next(triples)
+        lines = store.ntriples_lines()
+        next(lines)
+        store.close()
+        # the scans go on over the files they started on
+        self.assertEqual(len(list(triples)) + 1, len(list(
+            self.graph.triples((None, EX.title, None)))))
+        self.assertEqual(len(list(lines)) + 1, len(self.graph))
+        # a scan left unfinished is released when it is collected
+        store.open(os.path.join(self.directory, 'store'))
+        other = store.triples((None, None, None))
+        next(other)
+        store.close()
+        del other
+        gc.collect()
+        # and a new scan after a reopen is unaffected
+        store.open(os.path.join(self.directory, 'store'))
+        self.assertEqual(len(list(store.triples((None, None, None)))),
+                         len(self.graph))
+        store.close()
+
+
+class TestNTriplesLines(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.graph = catalog()
+        build(self.directory, self.graph)
+        self.mapped = Graph('MappedStore')
+        self.mapped.open(self.directory)
+
+    def tearDown(self):
+        self.mapped.close()
+        shutil.rmtree(self.directory)
+
+    def assertSameLines(self, format):
+        memory = Graph()
+        for triple in self.graph:
+            memory.add(triple)
+        expected = memory.serialize(format=format).splitlines()
+        lines = self.mapped.serialize(format=format).splitlines()
+        self.assertEqual(sorted(lines), sorted(expected))
+
+    def test_nt(self):
+        # ASCII, with the non-ASCII characters escaped
+        self.assertSameLines('nt')
+
+    def test_nt11(self):
+        self.assertSameLines('nt11')
+
+    def test_lines_read_back(self):
+        lines = list(self.mapped.store.ntriples_lines())
+        self.assertEqual(len(lines), len(self.graph))
+        self.assertTrue(all(line.endswith(b' .\n') for line in lines))
+        parsed = Graph().parse(data=b''.join(lines), format='nt')
+        self.assertTrue(isomorphic(parsed, self.graph))
+
+
+if __name__ == "__main__":
+    unittest.main()
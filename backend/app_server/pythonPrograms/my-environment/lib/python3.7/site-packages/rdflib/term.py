@@ -100,6 +100,14 @@ def _is_valid_unicode(value):
         return False
     return True
 
+# hash of the fully qualified name of every Identifier subclass, see
+# Identifier.__hash__
+_TYPE_HASHES = {}
+
+# the value of a Literal whose lexical form is not cast yet, see
+# Literal.value
+_UNCAST = object()
+
 class Node(object):
     """
     A Node in the Graph.
@@ -201,8 +209,13 @@ class Identifier(Node, str):  # allow Identifiers to be Nodes in the Graph
 
     def __hash__(self):
         t = type(self)
-        fqn = t.__module__ + '.' + t.__name__
-        return hash(fqn) ^ hash(str(self))
+        try:
+            type_hash = _TYPE_HASHES[t]
+        except KeyError:
+            fqn = t.__module__ + '.' + t.__name__
+            type_hash = _TYPE_HASHES[t] = hash(fqn)
+        # str.__hash__ is hash(str(self)), without copying the string
+        return type_hash ^ str.__hash__(self)
 
 
 class URIRef(Identifier):
@@ -578,17 +591,25 @@ class Literal(Identifier):
                 value = _castLexicalToPython(lexical_or_value, datatype)
             else:
                 datatype = lexical_or_value.datatype
-                value = lexical_or_value.value
+                value = lexical_or_value._value
 
         elif isinstance(lexical_or_value, str):
                 # passed a string
-                # try parsing lexical form of datatyped literal
-                value = _castLexicalToPython(lexical_or_value, datatype)
+                convFunc = _toPythonMapping.get(datatype, False)
+                if convFunc is None or convFunc and (
+                        not normalize or
+                        _is_canonical(lexical_or_value, datatype)):
+                    # the lexical form is kept as it is, so casting it can
+                    # wait until the value is used
+                    value = _UNCAST
+                else:
+                    # try parsing lexical form of datatyped literal
+                    value = _castLexicalToPython(lexical_or_value, datatype)
 
-                if value is not None and normalize:
-                    _value, _datatype = _castPythonToLiteral(value)
-                    if _value is not None and _is_valid_unicode(_value):
-                        lexical_or_value = _value
+                    if value is not None and normalize:
+                        _value, _datatype = _castPythonToLiteral(value)
+                        if _value is not None and _is_valid_unicode(_value):
+                            lexical_or_value = _value
 
         else:
             # passed some python object
@@ -636,7 +657,11 @@ class Literal(Identifier):
 
     @property
     def value(self):
-        return self._value
+        value = self._value
+        if value is _UNCAST:
+            value = self._value = _castLexicalToPython(str(self),
+                                                       self._datatype)
+        return value
 
     @property
     def language(self):
@@ -656,6 +681,7 @@ class Literal(Identifier):
         _, d = arg
         self._language = d["language"]
         self._datatype = d["datatype"]
+        self._value = _UNCAST
 
     @py3compat.format_doctest_out
     def __add__(self, val):
@@ -1520,6 +1546,35 @@ _toPythonMapping = {}
 
 _toPythonMapping.update(XSDToPython)
 
+_DATE_REGEX = '[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01])'
+_integer_match = compile('(?:0|-?[1-9][0-9]*)\\Z').match
+
+# the lexical forms that normalizing leaves unchanged (the canonical forms,
+# and some of the invalid ones), for which the cast is deferred: anything
+# else may be rewritten and is cast when the Literal is created (the
+# datatypes without a conversion function are always deferred)
+_canonicalLexical = dict((datatype, _integer_match)
+                         for datatype, conv in XSDToPython.items()
+                         if conv is int)
+_canonicalLexical.update({
+    _XSD_BOOLEAN: compile('(?:true|false)\\Z').match,
+    # str(Decimal) switches to exponents below 1e-6
+    _XSD_DECIMAL: compile(
+        '-?(?:[1-9][0-9]*(?:\\.[0-9]+)?|0(?:\\.0{0,5}[1-9][0-9]*)?)\\Z').match,
+    _XSD_DATE: compile(_DATE_REGEX + '\\Z').match,
+    # no fractional seconds, and isoformat() writes Z and -00:00 as +00:00
+    _XSD_DATETIME: compile(
+        _DATE_REGEX + 'T(?:[01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]'
+        '(?:[+-](?:[01][0-9]|2[0-3]):[0-5][0-9](?<!-00:00))?\\Z').match,
+})
+
+
+def _is_canonical(lexical, datatype):
+    """whether normalizing leaves the lexical form unchanged"""
+    match = _canonicalLexical.get(datatype)
+    return match is not None and match(lexical) is not None
+
+
 def _castLexicalToPython(lexical, datatype):
     """
     Map a lexical form to the value-space for the given datatype
@@ -1561,6 +1616,7 @@ def bind(datatype, pythontype, constructor=None, lexicalizer=None):
     if constructor == None:
         constructor = pythontype
     _toPythonMapping[datatype] = constructor
+    _canonicalLexical.pop(datatype, None)
     _PythonToXSD.append((pythontype, (lexicalizer, datatype)))
 
 
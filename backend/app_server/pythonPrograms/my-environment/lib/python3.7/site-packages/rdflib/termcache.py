@@ -0,0 +1,96 @@
+"""
+A bounded cache of interned nodes, shared by the parsers and stores.
+
+Parsers create a node for every occurrence of a term, so a large document
+creates millions of equal but distinct URIRefs and Literals (and casts
+the lexical form of every typed literal). Creating nodes through a
+TermCache returns the same instance for a term used again, which saves
+the construction and lets the duplicates be freed immediately.
+
+The cache keeps two generations of at most size/2 entries: new and used
+entries go to the young one, and when it is full the old one is dropped
+and the young one becomes old. Frequent terms thus stay cached, and
+memory is bounded whatever the size of the document::
+
+    >>> from rdflib.termcache import default_cache
+    >>> a = default_cache.uriref('http://www.w3.org/ns/dcat#Distribution')
+    >>> a is default_cache.uriref('http://www.w3.org/ns/dcat#Distribution')
+    True
+
+"""
+
+from rdflib.term import URIRef, Literal
+
+__all__ = ['TermCache', 'default_cache']
+
+# default maximum number of cached nodes
+CACHE_SIZE = 65536
+
+
+class TermCache(object):
+    """\
+    A bounded cache of nodes, see the module documentation. It is safe to
+    share between threads: a race may only create a node twice.
+    """
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.clear()
+
+    def clear(self):
+        self.__young = {}
+        self.__old = {}
+
+    def __store(self, key, node):
+        """cache node in the young generation"""
+        if len(self.__young) >= self.size // 2:
+            self.__old = self.__young
+            self.__young = {}
+        self.__young[key] = node
+        return node
+
+    # the young generation is looked up inline, as these methods are
+    # called for every term parsed
+
+    def uriref(self, value):
+        """return URIRef(value)"""
+        try:
+            return self.__young[value]
+        except KeyError:
+            node = self.__old.get(value)
+            if node is None:
+                node = URIRef(value)
+            return self.__store(value, node)
+
+    def literal(self, lexical, lang=None, datatype=None):
+        """return Literal(lexical, lang, datatype); only literals built from
+        strings are cached (True and 1 are equal keys)"""
+        if type(lexical) is not str:
+            return Literal(lexical, lang, datatype)
+        key = (lexical, lang, datatype)
+        try:
+            return self.__young[key]
+        except KeyError:
+            node = self.__old.get(key)
+            if node is None:
+                node = Literal(lexical, lang, datatype)
+            return self.__store(key, node)
+
+    def intern(self, node):
+        """return the cached node equal to node, caching it if there is
+        none"""
+        # the keys of uriref() and literal()
+        if type(node) is URIRef:
+            key = str(node)
+        elif type(node) is Literal:
+            key = (str(node), node.language, node.datatype)
+        else:
+            key = node
+        try:
+            return self.__young[key]
+        except KeyError:
+            return self.__store(key, self.__old.get(key, node))
+
+
+# the cache used by the parsers
+default_cache = TermCache()
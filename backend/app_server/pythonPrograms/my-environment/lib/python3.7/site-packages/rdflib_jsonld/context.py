@@ -4,8 +4,20 @@ Implementation of the JSON-LD Context structure. See:
 
     http://json-ld.org/
 
+The documents of remote contexts are fetched once and kept by
+``context_cache``, which can also keep them in a directory, and be
+preloaded from a directory, so that a worker without network access can
+parse documents referring to them::
+
+    from rdflib_jsonld.context import context_cache
+    context_cache.directory = '/var/cache/jsonld-contexts'
+    context_cache.preload('/etc/jsonld-contexts')
+
 """
-from collections import namedtuple
+import json
+import os
+from collections import namedtuple, OrderedDict
+from urllib.parse import quote, unquote, urldefrag
 from rdflib.namespace import RDF
 
 from .keys import (BASE, CONTAINER, CONTEXT, GRAPH, ID, INDEX, LANG, LIST,
@@ -16,6 +28,9 @@ from .util import source_to_json, urljoin, urlsplit, split_iri, norm_url
 
 NODE_KEYS = set([LANG, ID, TYPE, VALUE, LIST, SET, REV, GRAPH])
 
+# number of processed contexts kept by a ContextCache
+PROCESSED_SIZE = 256
+
 class Defined(int): pass
 UNDEF = Defined(0)
 
@@ -31,6 +46,7 @@ class Context(object):
         self._alias = {}
         self._lookup = {}
         self._prefixes = {}
+        self._subcontexts = {}
         self.active = False
         if source:
             self.load(source)
@@ -50,6 +66,13 @@ class Context(object):
         self._basedomain = '%s://%s' % urlsplit(base)[0:2] if base else None
 
     def subcontext(self, source):
+        # the same local context is usually repeated on many nodes, so the
+        # processed ones are kept (until this context is loaded into)
+        key = source if isinstance(source, str) else json.dumps(
+                source, sort_keys=True)
+        ctx = self._subcontexts.get(key)
+        if ctx is not None:
+            return ctx
         # IMPROVE: to optimize, implement SubContext with parent fallback support
         ctx = Context()
         ctx.language = self.language
@@ -61,6 +84,7 @@ class Context(object):
         ctx._lookup = self._lookup.copy()
         ctx._prefixes = self._prefixes.copy()
         ctx.load(source)
+        self._subcontexts[key] = ctx
         return ctx
 
     def get_id(self, obj):
@@ -187,11 +211,36 @@ class Context(object):
 
     def load(self, source, base=None):
         self.active = True
+        self._subcontexts = {}
+        # what an empty context becomes only depends on the source and the
+        # bases, so it is processed once
+        key = None
+        if not (self.terms or self._alias or self.vocab or self.language):
+            key = (json.dumps(source, sort_keys=True), base, self._base)
+            processed = context_cache.processed(key)
+            if processed is not None:
+                self._copy(processed)
+                return
         sources = []
         source = source if isinstance(source, list) else [source]
         self._prep_sources(base, source, sources)
         for source_url, source in sources:
             self._read_source(source, source_url)
+        if key is not None:
+            processed = Context()
+            processed._copy(self)
+            context_cache.add_processed(key, processed)
+
+    def _copy(self, other):
+        """take the definitions and the base of other"""
+        self.language = other.language
+        self.vocab = other.vocab
+        self._base = other._base
+        self._basedomain = other._basedomain
+        self.terms = other.terms.copy()
+        self._alias = other._alias.copy()
+        self._lookup = other._lookup.copy()
+        self._prefixes = other._prefixes.copy()
 
     def _prep_sources(self, base, inputs, sources, referenced_contexts=None,
             in_source_url=None):
@@ -202,7 +251,7 @@ class Context(object):
                 if source_url in referenced_contexts:
                     raise errors.RECURSIVE_CONTEXT_INCLUSION
                 referenced_contexts.add(source_url)
-                source = source_to_json(source_url)
+                source = context_cache.document(source_url)
                 if CONTEXT not in source:
                     raise errors.INVALID_REMOTE_CONTEXT
             else:
@@ -295,3 +344,107 @@ class Context(object):
 Term = namedtuple('Term',
         'id, name, type, container, language, reverse')
 Term.__new__.__defaults__ = (UNDEF, UNDEF, UNDEF, False)
+
+
+class ContextCache(object):
+    """
+    Keeps the documents of remote contexts, keyed by URL: in memory, and in
+    directory if it is set, so that every context is fetched once (and
+    stays available offline). A directory written by a cache can be given
+    to preload() by other processes.
+
+    Also keeps the most recently used contexts processed from a source
+    (see Context.load), so that parsing the documents of a catalog
+    processes their context once. A source may refer to documents by URL,
+    so the processed contexts are forgotten whenever a document changes:
+    documents must be changed with add(), preload() or clear().
+    """
+
+    def __init__(self, directory=None, processed_size=PROCESSED_SIZE):
+        self.directory = directory
+        self.processed_size = processed_size
+        self.documents = {}
+        self._processed = OrderedDict()
+
+    def document(self, url):
+        """the JSON document of url, fetched if it is not cached"""
+        url = urldefrag(url)[0]
+        try:
+            return self.documents[url]
+        except KeyError:
+            pass
+        document = None
+        if self.directory:
+            path = os.path.join(self.directory, _file_name(url))
+            if os.path.exists(path):
+                document = _read_json(path)
+        if document is None:
+            document = source_to_json(url)
+            if self.directory:
+                self._write(url, document)
+        self.documents[url] = document
+        return document
+
+    def add(self, url, document):
+        """cache the document of url (in directory too, if it is set)"""
+        url = urldefrag(url)[0]
+        self._set(url, document)
+        if self.directory:
+            self._write(url, document)
+
+    def preload(self, directory):
+        """cache the documents of a directory, named by their quoted URL as
+        in the directory of a cache"""
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if not name.startswith('.') and not name.endswith('.tmp') \
+                    and os.path.isfile(path):
+                self._set(unquote(name), _read_json(path))
+
+    def _set(self, url, document):
+        if url in self.documents and self.documents[url] != document:
+            # the contexts processed from the old document are stale
+            self._processed.clear()
+        self.documents[url] = document
+
+    def _write(self, url, document):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        path = os.path.join(self.directory, _file_name(url))
+        # written aside and renamed, as other processes may read it
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(document, f)
+        os.replace(tmp, path)
+
+    def processed(self, key):
+        try:
+            context = self._processed[key]
+        except KeyError:
+            return None
+        self._processed.move_to_end(key)
+        return context
+
+    def add_processed(self, key, context):
+        if len(self._processed) >= self.processed_size:
+            # forget the least recently used context
+            self._processed.popitem(last=False)
+        self._processed[key] = context
+
+    def clear(self):
+        """forget the documents kept in memory and the processed contexts"""
+        self.documents.clear()
+        self._processed.clear()
+
+
+def _file_name(url):
+    return quote(url, safe='')
+
+
+def _read_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# the cache of the contexts of all the parsers
+context_cache = ContextCache()
@@ -30,18 +30,32 @@ Example usage::
     ...     Literal("Someone's Homepage", lang='en'))]
     True
 
+Large documents can be parsed with ``stream=True``: the node objects of a
+top-level array, or of the ``@graph`` array of a top-level object (the
+usual shape of catalog exports), are then read and added one at a time,
+and the triples are added to the store in batches::
+
+    g = Graph().parse('catalog.jsonld', format='json-ld', stream=True)
+
+The result is the same as without streaming: the nodes of a top-level
+``@graph`` go to the context named by the ``@id`` of the object, or by a
+blank node if it has none. If the ``@id`` comes after the ``@graph``, the
+triples already added are moved to its context, which holds them all in
+memory at once. A ``@graph`` preceded by members other than ``@context``
+and ``@id`` is read whole.
+
 """
-# NOTE: This code reads the entire JSON object into memory before parsing, but
-# we should consider streaming the input to deal with arbitrarily large graphs.
 
 import warnings
 from rdflib.graph import ConjunctiveGraph
 from rdflib.parser import Parser, URLInputSource
 from rdflib.namespace import RDF, XSD
 from rdflib.term import URIRef, BNode, Literal
+from rdflib.termcache import default_cache
 
 from .context import Context, Term, UNDEF
-from .util import source_to_json, VOCAB_DELIMS, context_from_urlinputsource
+from .util import (source_to_json, VOCAB_DELIMS, context_from_urlinputsource,
+        JSONStream)
 from .keys import CONTEXT, GRAPH, ID, INDEX, LANG, LIST, REV, SET, TYPE, VALUE, VOCAB
 
 __all__ = ['JsonLDParser', 'to_rdf']
@@ -51,6 +65,9 @@ TYPE_TERM = Term(str(RDF.type), TYPE, VOCAB)
 
 ALLOW_LISTS_OF_LISTS = True # NOTE: Not allowed in JSON-LD 1.0
 
+# number of triples added to the store at once when streaming
+BATCH_SIZE = 10000
+
 
 class JsonLDParser(Parser):
     def __init__(self):
@@ -70,9 +87,21 @@ class JsonLDParser(Parser):
             context_data = context_from_urlinputsource(source)
         produce_generalized_rdf = kwargs.get('produce_generalized_rdf', False)
 
-        data = source_to_json(source)
         conj_sink = ConjunctiveGraph(
             store=sink.store, identifier=sink.identifier)
+        if kwargs.get('stream'):
+            context = Context(base=base)
+            if context_data:
+                context.load(context_data)
+            parser = Parser(generalized_rdf=produce_generalized_rdf)
+            stream = source.getByteStream()
+            try:
+                parser.parse_stream(stream, context, conj_sink)
+            finally:
+                stream.close()
+            return
+
+        data = source_to_json(source)
         to_rdf(data, conj_sink, base, context_data)
 
 
@@ -109,17 +138,85 @@ class Parser(object):
             if not isinstance(resources, list):
                 resources = [resources]
 
-        if context.vocab:
-            graph.bind(None, context.vocab)
-        for name, term in list(context.terms.items()):
-            if term.id and term.id.endswith(VOCAB_DELIMS):
-                graph.bind(name, term.id)
+        self._bind_prefixes(graph, context)
 
         for node in resources:
             self._add_to_graph(graph, graph, context, node, topcontext)
 
         return graph
 
+    def parse_stream(self, stream, context, graph):
+        """
+        Parse a JSON-LD document from a byte stream, adding the nodes of a
+        top-level array, or of the @graph of a top-level object preceded
+        only by @context and @id, one at a time (see the module
+        documentation). Other documents are read whole and parsed as by
+        parse().
+        """
+        reader = JSONStream(stream)
+        if reader.peek() == '[':
+            self._bind_prefixes(graph, context)
+            batched = _BatchedGraph(graph, graph.default_context)
+            for node in reader.items():
+                self._add_to_graph(batched, batched, context, node)
+            batched.flush()
+            return graph
+
+        data = {}
+        streamed = False
+        for key in reader.keys():
+            if key == GRAPH and set(data) <= set([CONTEXT, ID]) \
+                    and not streamed and reader.peek() == '[':
+                if data.get(CONTEXT):
+                    context.load(data[CONTEXT], context.base)
+                self._bind_prefixes(graph, context)
+                id_val = data.pop(ID, None)
+                named = isinstance(id_val, str)
+                subj = self._to_rdf_id(context, id_val) if named else BNode()
+                # an object with an invalid @id adds nothing
+                if subj is None:
+                    for node in reader.items():
+                        pass
+                else:
+                    batched = _BatchedGraph(graph, graph.get_context(subj))
+                    for node in reader.items():
+                        self._add_to_graph(batched, batched, context, node)
+                    batched.flush()
+                streamed = True
+            else:
+                data[key] = reader.value()
+        if not streamed:
+            return self.parse(data, context, graph)
+
+        # other members after the @graph
+        data.pop(CONTEXT, None)
+        id_val = context.get_id(data)
+        if isinstance(id_val, str) and not named:
+            # the @graph went to a context named by a blank node
+            nodes = graph.get_context(subj)
+            subj = self._to_rdf_id(context, id_val)
+            if subj is not None:
+                target = graph.get_context(subj)
+                graph.addN((s, p, o, target) for s, p, o in list(nodes))
+            if graph.store.graph_aware:
+                graph.store.remove_graph(nodes)
+            else:
+                graph.remove_context(nodes)
+        if subj is None:
+            return graph
+        data.pop(context.get_key(ID), None)
+        data.pop(ID, None)
+        data[ID] = '_:%s' % subj if isinstance(subj, BNode) else str(subj)
+        self._add_to_graph(graph, graph, context, data, True)
+        return graph
+
+    def _bind_prefixes(self, graph, context):
+        if context.vocab:
+            graph.bind(None, context.vocab)
+        for name, term in list(context.terms.items()):
+            if term.id and term.id.endswith(VOCAB_DELIMS):
+                graph.bind(name, term.id)
+
 
     def _add_to_graph(self, dataset, graph, context, node, topcontext=False):
         if not isinstance(node, dict) or context.get_value(node):
@@ -222,7 +319,7 @@ class Parser(object):
                 return
             pred = BNode(bid)
         else:
-            pred = URIRef(pred_uri)
+            pred = default_cache.uriref(pred_uri)
         for obj_node in obj_nodes:
             obj = self._to_object(dataset, graph, context, term, obj_node)
             if obj is None:
@@ -242,7 +339,7 @@ class Parser(object):
             value, lang = node
             if value is None:
                 return
-            return Literal(value, lang=lang)
+            return default_cache.literal(value, lang=lang)
 
         if isinstance(node, dict):
             node_list = context.get_list(node)
@@ -261,7 +358,7 @@ class Parser(object):
                     lang = term.language
                 else:
                     lang = context.language
-                return Literal(node, lang=lang)
+                return default_cache.literal(node, lang=lang)
             else:
                 if term.type == ID:
                     node = {ID: context.resolve(node)}
@@ -278,11 +375,12 @@ class Parser(object):
                 return None
             datatype = not lang and context.get_type(node) or None
             if lang:
-                return Literal(value, lang=lang)
+                return default_cache.literal(value, lang=lang)
             elif datatype:
-                return Literal(value, datatype=context.expand(datatype))
+                return default_cache.literal(
+                    value, datatype=context.expand(datatype))
             else:
-                return Literal(value)
+                return default_cache.literal(value)
         else:
             return self._add_to_graph(dataset, graph, context, node)
 
@@ -295,7 +393,7 @@ class Parser(object):
             uri = context.resolve(id_val)
             if not self.generalized_rdf and ':' not in uri:
                 return None
-            return URIRef(uri)
+            return default_cache.uriref(uri)
 
 
     def _get_bnodeid(self, ref):
@@ -326,3 +424,34 @@ class Parser(object):
             return first_subj
         else:
             return RDF.nil
+
+
+class _BatchedGraph(object):
+    """
+    Stands for a ConjunctiveGraph in Parser, adding the triples of one of
+    its contexts to the store in batches. Other named graphs are added to
+    as usual.
+    """
+
+    def __init__(self, graph, context, batch_size=BATCH_SIZE):
+        self.graph = graph
+        self.context = context
+        self.batch_size = batch_size
+        self.batch = []
+
+    def add(self, triple):
+        batch = self.batch
+        batch.append(triple + (self.context,))
+        if len(batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            batch, self.batch = self.batch, []
+            self.graph.addN(batch)
+
+    def get_context(self, identifier):
+        return self.graph.get_context(identifier)
+
+    def bind(self, prefix, namespace):
+        self.graph.bind(prefix, namespace)
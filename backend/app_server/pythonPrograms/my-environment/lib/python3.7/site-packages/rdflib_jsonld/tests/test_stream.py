@@ -0,0 +1,79 @@
+"""
+Tests that parsing JSON-LD with stream=True gives the same graphs as
+parsing the whole document.
+Run: python -m unittest rdflib_jsonld.tests.test_stream
+"""
+
+import json
+import unittest
+
+from rdflib import BNode, ConjunctiveGraph, Graph, URIRef
+from rdflib.compare import isomorphic
+
+CONTEXT = {'ex': 'http://example.org/', 'name': 'ex:name',
+           'knows': {'@id': 'ex:knows', '@type': '@id'}}
+NODES = [{'@id': 'ex:a', 'name': 'A', 'knows': 'ex:b'},
+         {'@id': '_:x', 'name': 'X'}]
+
+DOCUMENTS = {
+    'array': [{'@context': CONTEXT, '@id': 'ex:a', 'name': 'A'}],
+    'graph': {'@context': CONTEXT, '@graph': NODES},
+    'graph_without_context': {
+        '@graph': [{'@id': 'http://example.org/a',
+                    'http://example.org/name': 'A'}]},
+    'id_before_graph': {'@context': CONTEXT, '@id': 'ex:g', '@graph': NODES},
+    'id_after_graph': {'@context': CONTEXT, '@graph': NODES, '@id': 'ex:g'},
+    'id_and_members_after_graph': {
+        '@context': CONTEXT, '@graph': NODES, '@id': 'ex:g', 'name': 'G'},
+    'bnode_id_after_graph': {
+        '@context': CONTEXT, '@graph': NODES, '@id': '_:g', 'name': 'G'},
+    'members_after_graph': {'@context': CONTEXT, '@graph': NODES,
+                            'name': 'G'},
+    'members_before_graph': {'@context': CONTEXT, 'name': 'G',
+                             '@graph': NODES},
+}
+
+
+def parse(graph, data, stream):
+    graph.parse(data=data, format='json-ld', stream=stream)
+    contexts = {}
+    for context in ConjunctiveGraph(graph.store).contexts():
+        # blank node names differ between two parses
+        name = 'bnode' if isinstance(context.identifier, BNode) \
+            else str(context.identifier)
+        merged = contexts.setdefault(name, Graph())
+        for triple in context:
+            merged.add(triple)
+    return len(graph), contexts
+
+
+class TestStream(unittest.TestCase):
+
+    def test_same_graphs(self):
+        for name, document in sorted(DOCUMENTS.items()):
+            data = json.dumps(document)
+            for graph_class in (Graph, ConjunctiveGraph):
+                with self.subTest(name, graph=graph_class.__name__):
+                    size, contexts = parse(graph_class(), data, False)
+                    stream_size, stream_contexts = parse(
+                        graph_class(), data, True)
+                    self.assertEqual(size, stream_size)
+                    self.assertEqual(sorted(contexts),
+                                     sorted(stream_contexts))
+                    for context in contexts:
+                        self.assertTrue(isomorphic(
+                            contexts[context], stream_contexts[context]))
+
+    def test_named_graph(self):
+        data = json.dumps(DOCUMENTS['id_after_graph'])
+        graph = ConjunctiveGraph()
+        graph.parse(data=data, format='json-ld', stream=True)
+        self.assertEqual(
+            [str(c.identifier) for c in graph.contexts()],
+            ['http://example.org/g'])
+        self.assertEqual(
+            len(graph.get_context(URIRef('http://example.org/g'))), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
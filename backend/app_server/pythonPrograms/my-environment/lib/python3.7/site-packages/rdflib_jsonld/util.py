@@ -4,6 +4,8 @@ try:
 except ImportError:
     import simplejson as json
 
+import codecs
+
 from rdflib.py3compat import PY3, format_doctest_out
 
 from os import sep
@@ -32,6 +34,99 @@ def source_to_json(source):
         stream.close()
 
 
+class JSONStream(object):
+    """
+    Reads a JSON document from a byte stream a value at a time, so that the
+    members of a large object or array are decoded one by one and never
+    all held in memory. Only enough of the stream to decode the next value
+    is read.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._decode = codecs.getincrementaldecoder('utf-8-sig')().decode
+        self._raw_decode = json.JSONDecoder().raw_decode
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """read more of the stream (at least as much as is buffered, so
+        that a large value is decoded in a few attempts)"""
+        data = self.stream.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not data:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + self._decode(data, self.eof)
+        self.pos = 0
+
+    def peek(self):
+        """skip white space and return the next character ('' at the end of
+        the document)"""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            self.pos = pos
+            if pos < len(buf) or self.eof:
+                return buf[pos:pos + 1]
+            self._fill()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError("Expecting %r at char %d of the buffer"
+                             % (char, self.pos))
+        self.pos += 1
+
+    def value(self):
+        """decode the next value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._raw_decode(self.buf, self.pos)
+            except ValueError:
+                if self.eof:
+                    raise
+            else:
+                # a number may go on in the rest of the stream
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            self._fill()
+
+    def items(self):
+        """iterate over the values of the next array"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ']':
+                self.pos += 1
+                return
+            self.expect(',')
+
+    def keys(self):
+        """iterate over the keys of the next object; the value of every key
+        must be read (with value() or items()) before the next key"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                self.expect('"')
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self.peek() == '}':
+                self.pos += 1
+                return
+            self.expect(',')
+
+
 VOCAB_DELIMS = ('#', '/', ':')
 
 def split_iri(iri):